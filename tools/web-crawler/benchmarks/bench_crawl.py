@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+抓取基准测试
+在本地合成站点上运行 CrawlerTask 的内容抓取和导航结构生成，
+统计每秒页面数、单页延迟 p50/p99、进程峰值内存和每条结果的字节数，可与保存的基线对比
+
+用法: python benchmarks/bench_crawl.py [--pages 500] [--fanout 5] [--concurrency 4] [--fetch auto|http|browser]
+                                      [--variant default|tuned] [--save-baseline 文件] [--baseline 文件] [--tolerance 0.1]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_site import SyntheticSite, describe, serve
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# 指标 -> 是否越大越好，用于与基线对比
+METRICS = {
+    'pages_per_second': True,
+    'latency_p50_ms': False,
+    'latency_p99_ms': False,
+    'navigation_ms': False,
+    'peak_rss_mb': False,
+    'bytes_per_result': False,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """最近秩百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+class RssSampler:
+    """后台采样本进程及子进程（浏览器）的 RSS 峰值；未安装 psutil 时只统计本进程"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        if PSUTIL_AVAILABLE:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if PSUTIL_AVAILABLE:
+            self._thread.join()
+        else:
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        process = psutil.Process()
+        while not self._stop.wait(self.interval):
+            rss = 0
+            for member in [process] + process.children(recursive=True):
+                try:
+                    rss += member.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.peak = max(self.peak, rss)
+
+
+# default 与 Web 界面提交的任务配置一致，走服务器默认的前沿、检查点和去重路径；
+# tuned 显式使用内存前沿、关闭检查点并开启近似重复检测
+VARIANTS = ('default', 'tuned')
+
+
+def task_config(start_url: str, args: argparse.Namespace) -> Dict:
+    """与 Web 界面默认值一致的任务配置"""
+    config = {
+        'start_url': start_url,
+        'crawl_strategy': 'bfs',
+        'max_depth': args.max_depth,
+        'max_pages': args.max_pages,
+        'concurrency': args.concurrency,
+        'fetch_mode': args.fetch,
+        'cache_mode': 'BYPASS',
+        'word_threshold': 10,
+        'wait_for': None,
+        'browser_type': 'chromium',
+        'headless': True,
+        'viewport': {'width': 1280, 'height': 720},
+        'filters': {
+            'exclude_external': True,
+            'exclude_social': True,
+            'exclude_images': True,
+            'process_iframes': False,
+        },
+    }
+    if args.variant == 'tuned':
+        config.update({
+            'near_duplicates': {'max_distance': 3},
+            'checkpoint': False,
+            'frontier': 'memory',
+        })
+    return config
+
+
+def run_once(server, config: Dict) -> Dict:
+    """执行一次抓取，返回本次的指标"""
+    task = server.CrawlerTask(f'bench-{time.monotonic_ns()}', config)
+    latencies: List[float] = []
+    crawl_page = task._crawl_page
+
+    async def timed_crawl_page(url: str, depth: int):
+        start = time.perf_counter()
+        try:
+            return await crawl_page(url, depth)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    task._crawl_page = timed_crawl_page
+
+    async def phases():
+        task._configure_rate_limit()
+        start = time.perf_counter()
+        await task.crawl_all_content()
+        crawled = time.perf_counter()
+        task.generate_navigation_structure()
+        return crawled - start, time.perf_counter() - crawled
+
+    with RssSampler() as rss:
+        crawl_seconds, navigation_seconds = asyncio.run_coroutine_threadsafe(phases(), server.crawler_loop).result()
+
+    results = [dict(result) for result in task.results]
+    result_bytes = sum(len(json.dumps(result, ensure_ascii=False).encode('utf-8')) for result in results)
+    return {
+        'pages': len(results),
+        'failed': task.stats['failed'],
+        'duplicates': task.stats['duplicates'],
+        'navigation_items': len(task.navigation),
+        'crawl_seconds': crawl_seconds,
+        'pages_per_second': len(results) / crawl_seconds if crawl_seconds else 0.0,
+        'latency_p50_ms': percentile(latencies, 0.5),
+        'latency_p99_ms': percentile(latencies, 0.99),
+        'navigation_ms': navigation_seconds * 1000,
+        'peak_rss_mb': rss.peak / 1024 / 1024,
+        'bytes_per_result': result_bytes / len(results) if results else 0.0,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """打印与基线的对比，返回超出容差的退化指标"""
+    regressions = []
+    print(f'\n{"指标":<20}{"基线":>12}{"本次":>12}{"变化":>9}')
+    for name, higher_is_better in METRICS.items():
+        before, after = baseline['metrics'].get(name), current[name]
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        mark = ''
+        if worse > tolerance:
+            regressions.append(name)
+            mark = '  ❌'
+        print(f'{name:<20}{before:>12.1f}{after:>12.1f}{change:>+8.0%}{mark}')
+    if baseline.get('site') != current.get('site'):
+        print('⚠️  基线使用的合成站点参数不同，对比结果仅供参考')
+    if baseline.get('variant', 'tuned') != current.get('variant'):
+        print('⚠️  基线使用的任务配置不同，对比结果仅供参考')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成站点抓取基准测试')
+    parser.add_argument('--pages', type=int, default=500, help='合成站点页面数')
+    parser.add_argument('--fanout', type=int, default=5, help='每个页面的子页面数')
+    parser.add_argument('--body-words', type=int, default=400, help='每个页面正文词数')
+    parser.add_argument('--slow-delay', type=float, default=0.3, help='慢页面延迟秒数')
+    parser.add_argument('--no-traps', action='store_true', help='不生成日历陷阱')
+    parser.add_argument('--concurrency', type=int, default=4, help='任务并发页数')
+    parser.add_argument('--fetch', choices=['auto', 'http', 'browser'], default='auto', help='抓取引擎')
+    parser.add_argument('--max-depth', type=int, default=5, help='最大抓取深度')
+    parser.add_argument('--max-pages', type=int, default=1000, help='最大页面数')
+    parser.add_argument('--variant', choices=VARIANTS, default='default', help='任务配置：服务器默认路径或调优配置')
+    parser.add_argument('--runs', type=int, default=1, help='运行次数，取每秒页面数最高的一次')
+    parser.add_argument('--save-baseline', type=Path, help='把本次结果保存为基线')
+    parser.add_argument('--baseline', type=Path, help='与保存的基线对比')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='允许的退化比例，超出时返回非零')
+    args = parser.parse_args()
+
+    missing = [name for name in ('flask', 'flask_socketio', 'crawl4ai') if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f'❌ 缺少依赖: {", ".join(missing)}，请运行 pip install -r requirements.txt')
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 任务数据写入临时目录，每次运行互不影响
+        for variable, name in (
+            ('CRAWLER_BLOB_DIR', 'blobs'),
+            ('CRAWLER_FRONTIER_DIR', 'frontier'),
+            ('CRAWLER_TASK_SPILL_DIR', 'tasks'),
+            ('CRAWLER_VALIDATOR_DB', 'validators.db'),
+        ):
+            os.environ[variable] = str(Path(tmp) / name)
+        os.environ.setdefault('CRAWLER_GLOBAL_CONCURRENCY', str(max(16, args.concurrency)))
+        # 本地站点不需要限速；任务的 rate_limit 只能收紧共享限速器，因此通过默认速率放开
+        os.environ.setdefault('CRAWLER_HOST_RATE', '10000')
+        os.environ.setdefault('CRAWLER_HOST_BURST', '1000')
+        from src.web import server
+
+        site = SyntheticSite(
+            pages=args.pages,
+            fanout=args.fanout,
+            body_words=args.body_words,
+            slow_delay=args.slow_delay,
+            traps=not args.no_traps,
+        )
+        best: Optional[Dict] = None
+        with serve(site) as base_url:
+            print(f'合成站点: {base_url}  {describe(site)}')
+            for run in range(args.runs):
+                metrics = run_once(server, task_config(base_url, args))
+                print(
+                    f'第 {run + 1} 次: {metrics["pages"]} 页, 失败 {metrics["failed"]}, '
+                    f'近似重复 {metrics["duplicates"]}, {metrics["pages_per_second"]:.1f} 页/秒'
+                )
+                if best is None or metrics['pages_per_second'] > best['pages_per_second']:
+                    best = metrics
+        server.stop_browser_pool()
+
+    best['site'] = describe(site)
+    best['variant'] = args.variant
+    best['requests'] = dict(site.requests)
+    print(f'\n站点请求: {best["requests"]}')
+    print(f'每秒页面数: {best["pages_per_second"]:.1f}')
+    print(f'单页延迟: p50 {best["latency_p50_ms"]:.0f} ms, p99 {best["latency_p99_ms"]:.0f} ms')
+    print(f'导航结构生成: {best["navigation_ms"]:.1f} ms（{best["navigation_items"]} 项）')
+    print(f'峰值内存: {best["peak_rss_mb"]:.0f} MB{"" if PSUTIL_AVAILABLE else "（仅本进程，安装 psutil 可包含浏览器）"}')
+    print(f'每条结果: {best["bytes_per_result"]:,.0f} 字节')
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(
+            json.dumps({
+                'python': sys.version.split()[0],
+                'site': best['site'],
+                'variant': best['variant'],
+                'requests': best['requests'],
+                'metrics': {name: value for name, value in best.items() if name not in ('site', 'variant', 'requests')},
+            }, indent=2),
+            encoding='utf-8'
+        )
+        print(f'\n基线已保存: {args.save_baseline}')
+
+    if args.baseline:
+        regressions = compare(best, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        if regressions:
+            print(f'\n❌ 超出容差 {args.tolerance:.0%} 的退化: {", ".join(regressions)}')
+            sys.exit(1)
+        print(f'\n✅ 各项指标均在容差 {args.tolerance:.0%} 以内')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+抓取前沿基准测试
+比较内存前沿和磁盘前沿在不同规模下的内存峰值和入队/出队吞吐
+
+用法: python benchmarks/bench_frontier.py [最大URL数量]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.disk_frontier import DiskFrontier
+from src.utils.frontier import CrawlFrontier
+
+
+def fill_and_drain(frontier, count: int):
+    for index in range(count):
+        frontier.add(f'https://www.example.com/docs/section-{index % 97}/page-{index}', depth=1)
+    while frontier.pop() is not None:
+        pass
+
+
+def run(make_frontier, count: int):
+    """全部入队后全部出队，返回 (内存峰值字节数, 每URL耗时微秒)
+
+    内存和耗时分两次测量，tracemalloc 会显著拖慢执行
+    """
+    frontier = make_frontier()
+    tracemalloc.start()
+    fill_and_drain(frontier, count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    frontier = make_frontier()
+    start = time.perf_counter()
+    fill_and_drain(frontier, count)
+    elapsed = time.perf_counter() - start
+    return peak, elapsed / count * 1e6
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sizes = [size for size in (10_000, 50_000, 200_000, 1_000_000) if size <= limit] or [limit]
+
+    print(f'{"URL数量":>10}{"前沿":>8}{"内存峰值 MB":>14}{"µs/URL":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            factories = (
+                ('memory', lambda: CrawlFrontier(max_pages=size, max_depth=5)),
+                ('disk', lambda: DiskFrontier(
+                    Path(tmp) / f'{size}-{time.monotonic_ns()}.db', max_pages=size, max_depth=5
+                )),
+            )
+            for name, make_frontier in factories:
+                peak, cost = run(make_frontier, size)
+                print(f'{size:>10,}{name:>8}{peak / 1024 / 1024:>14.1f}{cost:>10.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+页面记录基准测试
+比较原来的结果字典与 PageRecord 的每条记录内存占用，以及单词统计的耗时和峰值内存
+
+用法: python benchmarks/bench_page_record.py [页面数量]
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.page_record import PageRecord, count_words
+
+BASE = 'https://docs.example.com'
+WORDS = ['crawler', 'page', 'content', 'navigation', 'guide', 'api', 'config', 'result', 'task', 'link']
+
+
+def fresh(text: str) -> str:
+    """复制字符串：真实抓取中每个页面的字符串都是重新解析出来的"""
+    return (text + ' ')[:-1]
+
+
+def generate_result(index: int, rng: random.Random, site_pages: int = 2000):
+    """生成形如 crawl4ai 抓取结果的对象，页面约 20KB，导航中有 80 个站内链接"""
+    paragraphs = ' '.join(
+        '<p>' + ' '.join(rng.choice(WORDS) for _ in range(40)) + '</p>' for _ in range(60)
+    )
+    links = [
+        {
+            'href': fresh(f'{BASE}/docs/page-{rng.randrange(site_pages)}'),
+            'text': fresh(f'Page {i}'),
+            'title': '',
+            'base_domain': fresh('docs.example.com'),
+        }
+        for i in range(80)
+    ]
+    return SimpleNamespace(
+        url=f'{BASE}/docs/page-{index}',
+        metadata={'title': f'Page {index}', 'description': 'Example documentation page'},
+        cleaned_html=f'<div class="content">{paragraphs}</div>',
+        extracted_content=None,
+        links={'internal': links, 'external': []},
+        success=True,
+    )
+
+
+def process_as_dict(result) -> dict:
+    """原来的 _process_crawl_result"""
+    processed = {
+        'url': result.url,
+        'title': result.metadata.get('title', ''),
+        'description': result.metadata.get('description', ''),
+        'content': result.cleaned_html[:5000] if result.cleaned_html else '',
+        'word_count': len(result.cleaned_html.split()) if result.cleaned_html else 0,
+        'timestamp': datetime.now().isoformat(),
+        'success': result.success
+    }
+    if hasattr(result, 'links') and result.links:
+        processed['links'] = result.links.get('internal', [])[:50]
+    return processed
+
+
+def measure_records(process, count: int) -> float:
+    """处理 count 个页面后保留的结果，每条记录的字节数（抓取结果本身处理后即释放）"""
+    rng = random.Random(42)
+    tracemalloc.start()
+    records = []
+    for index in range(count):
+        records.append(process(generate_result(index, rng)))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / count
+
+
+def measure_word_count(count, text: str):
+    """单词统计的耗时（毫秒）和峰值内存（KB）"""
+    start = time.perf_counter()
+    words = count(text)
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    count(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return words, elapsed, peak / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    dict_bytes = measure_records(process_as_dict, count)
+    record_bytes = measure_records(PageRecord.from_crawl_result, count)
+
+    print(f'页面数量: {count:,}')
+    print(f'{"结果表示":<16}{"字节/页面":>12}{"十万页面估算":>14}')
+    for name, per_page in (('dict', dict_bytes), ('PageRecord', record_bytes)):
+        print(f'{name:<16}{per_page:>12,.0f}{per_page * 100_000 / 1024 / 1024:>11,.0f} MB')
+
+    sample = generate_result(0, random.Random(1))
+    record = PageRecord.from_crawl_result(sample)
+    start = time.perf_counter()
+    for _ in range(1000):
+        json.dumps(dict(record), ensure_ascii=False)
+    print(f'API 边界转换 JSON: {(time.perf_counter() - start) * 1000:.1f} µs/条')
+
+    large_page = sample.cleaned_html * 100
+    print(f'单词统计（{len(large_page) / 1024 / 1024:.1f} MB 页面）:')
+    for name, counter in (('str.split', lambda text: len(text.split())), ('count_words', count_words)):
+        words, elapsed, peak = measure_word_count(counter, large_page)
+        print(f'  {name:<12}{words:>10,} 词 {elapsed:>8.1f} ms  峰值 {peak:>10,.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+启动时间基准测试
+用 python -X importtime 运行各启动入口，统计导入耗时、进程总耗时和导入最慢的模块，
+并检查启动时是否加载了应当延迟导入的重量级依赖
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--top 10] [--budget-ms 毫秒]
+"""
+
+import argparse
+import importlib.util
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# 启动入口：名称 -> 命令行参数
+TARGETS = {
+    'main --help': ['main.py', '--help'],
+    'import src': ['-c', 'import src'],
+    'import src.crawler': ['-c', 'import src.crawler'],
+    'import src.web.server': ['-c', 'import src.web.server'],
+}
+
+# 启动时不应加载的重量级依赖，只在第一次抓取时导入
+LAZY_MODULES = ('crawl4ai', 'playwright', 'aiohttp', 'lxml', 'bs4')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """解析 -X importtime 输出，返回 (模块, 自身微秒, 累计微秒, 缩进层级)"""
+    modules = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return modules
+
+
+def measure(args: List[str], runs: int) -> Dict:
+    """运行入口多次，取进程耗时和导入耗时的中位数，最慢模块取自最后一次运行"""
+    wall, imports, modules = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', *args],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        wall.append((time.perf_counter() - start) * 1000)
+        modules = parse_importtime(process.stderr)
+        imports.append(sum(self_us for _, self_us, _, _ in modules) / 1000)
+    return {
+        'ok': process.returncode == 0,
+        'wall_ms': statistics.median(wall),
+        'import_ms': statistics.median(imports),
+        'modules': modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动时间基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='每个入口运行次数')
+    parser.add_argument('--top', type=int, default=10, help='列出导入最慢的模块数')
+    parser.add_argument('--budget-ms', type=float, help='main --help 的进程耗时上限，超出时返回非零')
+    args = parser.parse_args()
+
+    print(f'Python {sys.version.split()[0]}，每个入口运行 {args.runs} 次')
+    print(f'{"入口":<24}{"进程耗时":>10}{"导入耗时":>10}{"模块数":>8}  延迟依赖')
+    results = {}
+    for name, target in TARGETS.items():
+        if name == 'import src.web.server' and importlib.util.find_spec('flask') is None:
+            print(f'{name:<24}{"跳过（flask 未安装）":>20}')
+            continue
+        result = results[name] = measure(target, args.runs)
+        loaded = sorted({module.split('.')[0] for module, *_ in result['modules']} & set(LAZY_MODULES))
+        status = '' if result['ok'] else '  (退出码非零)'
+        print(
+            f'{name:<24}{result["wall_ms"]:>8.1f}ms{result["import_ms"]:>8.1f}ms'
+            f'{len(result["modules"]):>8}  {", ".join(loaded) or "-"}{status}'
+        )
+
+    for name, result in results.items():
+        slowest = sorted(result['modules'], key=lambda item: item[2], reverse=True)
+        top_level = [item for item in slowest if item[3] == 0][:args.top]
+        print(f'\n{name} 导入最慢的顶层模块（累计）:')
+        for module, self_us, cumulative_us, _ in top_level:
+            print(f'  {module:<40}{cumulative_us / 1000:>8.1f} ms  自身 {self_us / 1000:>6.1f} ms')
+
+    if args.budget_ms is not None:
+        wall_ms = results['main --help']['wall_ms']
+        if wall_ms > args.budget_ms:
+            print(f'\n❌ main --help 耗时 {wall_ms:.1f} ms，超出上限 {args.budget_ms:.1f} ms')
+            sys.exit(1)
+        print(f'\n✅ main --help 耗时 {wall_ms:.1f} ms，未超出上限 {args.budget_ms:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+URL 去重基准测试
+比较字符串集合、指纹 set 和 FingerprintSet 的每URL内存占用与查询耗时
+
+用法: python benchmarks/bench_url_dedup.py [URL数量]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.urls import FingerprintSet, UrlCanonicalizer, url_fingerprint
+
+
+def generate_urls(count: int, seed: int = 42):
+    """生成形如真实站点的URL"""
+    rng = random.Random(seed)
+    sections = ['docs', 'blog', 'api', 'guide', 'reference', 'changelog']
+    urls = []
+    for index in range(count):
+        section = rng.choice(sections)
+        urls.append(
+            f'https://www.example{index % 50}.com/{section}/{rng.getrandbits(32):08x}/'
+            f'page-{index}?lang=zh&utm_source=feed'
+        )
+    return urls
+
+
+def measure_memory(build):
+    """构建容器并返回 (容器, 新分配的字节数)"""
+    tracemalloc.start()
+    container = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, current
+
+
+def measure_lookup(container, keys, rounds: int = 3) -> float:
+    """每次查询的平均耗时（纳秒）"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for key in keys:
+            key in container
+        best = min(best, time.perf_counter() - start)
+    return best / len(keys) * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    urls = generate_urls(count)
+    canonicalizer = UrlCanonicalizer()
+
+    start = time.perf_counter()
+    canonical = [canonicalizer.canonicalize(url) for url in urls]
+    canonicalize_ns = (time.perf_counter() - start) / count * 1e9
+
+    start = time.perf_counter()
+    fingerprints = [url_fingerprint(url) for url in canonical]
+    fingerprint_ns = (time.perf_counter() - start) / count * 1e9
+
+    # 字符串本身也计入内存：真实前沿中每个URL都要保存一份
+    string_set, string_bytes = measure_memory(lambda: {(url + ' ')[:-1] for url in canonical})
+    int_set, int_bytes = measure_memory(lambda: {fp + 0 for fp in fingerprints})
+
+    def build_compact():
+        compact = FingerprintSet()
+        for fp in fingerprints:
+            compact.add(fp)
+        return compact
+
+    compact_set, compact_bytes = measure_memory(build_compact)
+
+    print(f'URL数量: {count:,}')
+    print(f'规范化: {canonicalize_ns:,.0f} ns/URL，指纹: {fingerprint_ns:,.0f} ns/URL')
+    print(f'{"结构":<22}{"字节/URL":>12}{"查询 ns":>12}{"百万URL估算":>14}')
+    rows = [
+        ('set[str]', string_set, string_bytes, canonical),
+        ('set[int] 指纹', int_set, int_bytes, fingerprints),
+        ('FingerprintSet', compact_set, compact_bytes, fingerprints),
+    ]
+    for name, container, nbytes, keys in rows:
+        per_url = nbytes / count
+        lookup = measure_lookup(container, keys[:50_000])
+        print(f'{name:<22}{per_url:>12.1f}{lookup:>12.0f}{per_url:>11.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+合成测试站点
+按固定随机种子生成的本地站点，供抓取基准测试使用：
+- 页面按 fanout 组成树，每个页面带相同的多级导航菜单和约 body_words 个词的正文
+- 部分页面带近似重复的分页链接（/dup/），以及只差片段、跟踪参数、末尾斜杠的同一URL
+- 日历陷阱（/calendar/）每页链接到下一天，无限延伸
+- 慢页面（/slow/）延迟响应，失败页面（/fail/、/gone/）返回 500/404
+
+用法: python benchmarks/synthetic_site.py [页面数量] [端口]
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+VOCABULARY = [f'word{i}' for i in range(3000)]
+
+
+class SyntheticSite:
+    """合成站点的页面内容，只依赖参数和随机种子，多次生成完全一致"""
+
+    def __init__(
+        self,
+        pages: int = 500,
+        fanout: int = 5,
+        sections: int = 8,
+        body_words: int = 400,
+        duplicate_ratio: float = 0.05,
+        slow_ratio: float = 0.02,
+        slow_delay: float = 0.3,
+        fail_ratio: float = 0.02,
+        traps: bool = True,
+        seed: int = 1,
+    ):
+        self.pages = pages
+        self.fanout = fanout
+        self.sections = sections
+        self.body_words = body_words
+        self.slow_delay = slow_delay
+        self.traps = traps
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self.duplicates = {index for index in range(1, pages) if rng.random() < duplicate_ratio}
+        self.slow = {index for index in range(1, pages) if rng.random() < slow_ratio}
+        self.failing = {index for index in range(1, pages) if rng.random() < fail_ratio}
+        self.requests: Counter = Counter()  # 按页面类型统计的请求数
+        self._lock = threading.Lock()
+
+    def path(self, index: int) -> str:
+        if index == 0:
+            return '/'
+        if index in self.slow:
+            return f'/slow/{index}'
+        if index in self.failing:
+            return f'/fail/{index}' if index % 2 else f'/gone/{index}'
+        return f'/docs/s{index % self.sections}/p{index}'
+
+    def children(self, index: int) -> List[int]:
+        first = index * self.fanout + 1
+        return list(range(first, min(first + self.fanout, self.pages)))
+
+    def navigation(self) -> str:
+        """所有页面共用的两级导航菜单"""
+        items = []
+        for section, top in enumerate(self.children(0)):
+            sub = ''.join(
+                f'<li><a href="{self.path(child)}">第 {section + 1} 节 - {child}</a></li>'
+                for child in self.children(top)
+            )
+            items.append(f'<li><a href="{self.path(top)}">第 {section + 1} 节</a><ul>{sub}</ul></li>')
+        return f'<nav class="main-nav"><ul>{"".join(items)}</ul></nav>'
+
+    def body(self, index: int) -> str:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        words = [rng.choice(VOCABULARY) for _ in range(self.body_words)]
+        return ''.join(f'<p>{" ".join(words[start:start + 40])}</p>' for start in range(0, len(words), 40))
+
+    def render(self, path: str) -> Tuple[int, Optional[str], str, float]:
+        """返回 (状态码, HTML, 页面类型, 延迟秒数)"""
+        parts = [part for part in path.split('/') if part]
+        if path == '/':
+            return 200, self.page(0), 'page', 0.0
+        if len(parts) == 3 and parts[0] == 'docs' and parts[2][1:].isdigit():
+            index = int(parts[2][1:])
+            if 0 < index < self.pages and self.path(index) == path:
+                return 200, self.page(index), 'page', 0.0
+        if len(parts) == 2 and parts[1].isdigit():
+            index = int(parts[1])
+            kind = parts[0]
+            if kind == 'slow' and index in self.slow:
+                return 200, self.page(index), 'slow', self.slow_delay
+            if kind == 'fail' and index in self.failing:
+                return 500, None, 'fail', 0.0
+            if kind == 'dup' and index in self.duplicates:
+                return 200, self.page(index, listing_page=2), 'duplicate', 0.0
+            if kind == 'calendar' and self.traps:
+                return 200, self.calendar(parts[1]), 'trap', 0.0
+        return 404, None, 'missing', 0.0
+
+    def page(self, index: int, listing_page: int = 1) -> str:
+        links = [f'<a href="{self.path(child)}">页面 {child}</a>' for child in self.children(index)]
+        if index in self.duplicates and listing_page == 1:
+            base = self.path(index)
+            links += [
+                f'<a href="/dup/{index}">下一页</a>',
+                f'<a href="{base}#top">回到顶部</a>',
+                f'<a href="{base}/">本页</a>',
+                f'<a href="{base}?utm_source=synthetic">分享</a>',
+            ]
+        if index == 0 and self.traps:
+            links.append(f'<a href="/calendar/{date(2024, 1, 1).strftime("%Y%m%d")}">日历</a>')
+        return (
+            f'<html><head><title>页面 {index}</title>'
+            f'<meta name="description" content="合成页面 {index}"></head><body>'
+            f'{self.navigation()}<main><h1>页面 {index}</h1>{self.body(index)}'
+            f'<div class="links">{" ".join(links)}</div></main>'
+            f'<footer>第 {listing_page} 页</footer></body></html>'
+        )
+
+    def calendar(self, day: str) -> str:
+        try:
+            current = date(int(day[:4]), int(day[4:6]), int(day[6:8]))
+        except ValueError:
+            current = date(2024, 1, 1)
+        following = (current + timedelta(days=1)).strftime('%Y%m%d')
+        return (
+            f'<html><head><title>日历 {current}</title></head><body>{self.navigation()}'
+            f'<main><h1>{current}</h1><a href="/calendar/{following}">下一天</a></main></body></html>'
+        )
+
+    def record(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+
+def _handler(site: SyntheticSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, html, kind, delay = site.render(urlsplit(self.path).path)
+            site.record(kind)
+            if delay:
+                time.sleep(delay)
+            body = (html or f'<html><body>{status}</body></html>').encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+@contextmanager
+def serve(site: SyntheticSite, host: str = '127.0.0.1', port: int = 0) -> Iterator[str]:
+    """在后台线程中运行站点，返回站点根URL"""
+    server = ThreadingHTTPServer((host, port), _handler(site))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://{host}:{server.server_address[1]}/'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def describe(site: SyntheticSite) -> Dict:
+    return {
+        'pages': site.pages,
+        'fanout': site.fanout,
+        'duplicates': len(site.duplicates),
+        'slow': len(site.slow),
+        'failing': len(site.failing),
+        'traps': site.traps,
+        'seed': site.seed,
+    }
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8800
+    site = SyntheticSite(pages=pages)
+    with serve(site, port=port) as base_url:
+        print(f'合成站点: {base_url}  {describe(site)}')
+        print('按 Ctrl+C 停止')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(f'\n请求统计: {dict(site.requests)}')
+
+
+if __name__ == '__main__':
+    main()
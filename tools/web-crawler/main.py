@@ -7,36 +7,51 @@ Usage:
     python main.py web                           # 启动Web界面
     python main.py cli <url>                     # 命令行模式
     python main.py cli <url> --output <dir>     # 指定输出目录
+    python main.py cli <url> --output -         # 结果逐行输出到标准输出
 """
 
 import sys
-import os
 import argparse
-import subprocess
-from pathlib import Path
-from typing import Optional
+import importlib.util
+from contextlib import redirect_stdout
+from typing import Optional, TextIO
 
 __version__ = "2.1.0"
 
 
-def check_dependencies():
-    """检查依赖是否安装"""
-    required_packages = [
+# 各启动模式需要的依赖，命令行模式不加载 Web 服务
+REQUIRED_PACKAGES = {
+    'web': [
         ('crawl4ai', 'crawl4ai'),
         ('beautifulsoup4', 'bs4'),
         ('flask', 'flask'),
         ('flask-cors', 'flask_cors'),
         ('flask-socketio', 'flask_socketio')
+    ],
+    'cli': [
+        ('beautifulsoup4', 'bs4')
+    ],
+}
+
+# 命令行模式按抓取引擎追加的依赖：--fetch http 只用 aiohttp，不需要 crawl4ai 和浏览器
+FETCH_PACKAGES = {
+    'auto': [('crawl4ai', 'crawl4ai')],
+    'browser': [('crawl4ai', 'crawl4ai')],
+    'http': [('aiohttp', 'aiohttp')],
+}
+
+
+def check_dependencies(mode: str = 'web', fetch_mode: str = 'auto'):
+    """检查依赖是否安装
+
+    只查找模块而不导入，启动时不加载 crawl4ai、Flask 等依赖，它们在第一次使用时才导入。
+    """
+    packages = REQUIRED_PACKAGES[mode] + (FETCH_PACKAGES[fetch_mode] if mode == 'cli' else [])
+    missing_packages = [
+        package_name for package_name, import_name in packages
+        if importlib.util.find_spec(import_name) is None
     ]
     
-    missing_packages = []
-    
-    for package_name, import_name in required_packages:
-        try:
-            __import__(import_name)
-        except ImportError:
-            missing_packages.append(package_name)
-    
     if missing_packages:
         print("❌ 缺少以下依赖包:")
         for package in missing_packages:
@@ -49,14 +64,14 @@ def check_dependencies():
     return True
 
 
-def display_startup_info():
+def display_startup_info(mode: str = 'web', fetch_mode: str = 'auto'):
     """显示启动信息"""
     print(f"🚀 智能网站爬虫工具 v{__version__}")
     print("=" * 50)
     
     # 检查依赖
     print("\n📦 检查依赖...")
-    deps_ok = check_dependencies()
+    deps_ok = check_dependencies(mode, fetch_mode)
     
     if not deps_ok:
         return False
@@ -77,50 +92,70 @@ def display_startup_info():
 
 
 def start_web_server():
-    """启动Web服务器"""
+    """在当前进程中启动Web服务器"""
     print("🌐 启动Web服务器...")
     
-    # 检查Web启动脚本 - 先检查新结构，再检查旧结构
-    web_start_script = Path("src/web/start.py")
-    if not web_start_script.exists():
-        web_start_script = Path("web/start.py")
+    from src.web.start import start_server
     
-    if not web_start_script.exists():
-        print("❌ Web服务器启动脚本不存在")
-        print("   请确保项目结构完整")
-        return False
-    
-    try:
-        # 使用subprocess运行Web服务器
-        print(f"📂 使用启动脚本: {web_start_script}")
-        
-        # 切换到web目录并运行
-        import os
-        current_dir = os.getcwd()
-        web_dir = web_start_script.parent
-        
-        os.chdir(web_dir)
-        result = subprocess.run([
-            sys.executable, "start.py"
-        ], capture_output=False)
-        
-        os.chdir(current_dir)
-        return result.returncode == 0
-        
-    except Exception as e:
-        print(f"❌ Web服务器启动失败: {e}")
-        return False
+    start_server()
+    return True
+
 
+def start_command_line(
+    url: str,
+    output_dir: Optional[str] = None,
+    concurrency: int = 4,
+    max_depth: int = 3,
+    max_pages: int = 50,
+    rate: Optional[float] = None,
+    fetch_mode: str = 'auto',
+    near_duplicates: bool = False,
+    results: Optional[TextIO] = None,
+):
+    """启动命令行版本
 
-def start_command_line(url: str, output_dir: Optional[str] = None):
-    """启动命令行版本"""
+    output_dir 为 "-" 时结果逐行写到 results（默认标准输出）。
+    """
+    import asyncio
+    from src.crawler import WebsiteCrawler
+    
+    output_dir = output_dir or 'crawl_results'
     print(f"💻 启动命令行版本...")
     print(f"🌐 目标URL: {url}")
+    print(f"⚙️  并发: {concurrency}, 最大深度: {max_depth}, 最大页面数: {max_pages}, 抓取引擎: {fetch_mode}")
+    
+    config = {'fetch_mode': fetch_mode, 'near_duplicates': near_duplicates}
+    if rate:
+        config['rate_limit'] = {'rate': rate, 'burst': max(concurrency, 1)}
+    crawler = WebsiteCrawler(
+        url,
+        output_dir,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        config=config
+    )
+    print(f"📂 输出: {crawler.results_path or '标准输出'}")
+    
+    try:
+        summary = asyncio.run(crawler.crawl(results))
+    except KeyboardInterrupt:
+        print("\n⚠️  抓取已中断")
+        return False
+    except Exception as e:
+        print(f"❌ 抓取失败: {e}")
+        return False
     
-    print("⚠️  命令行版本正在开发中...")
-    print("   请使用Web界面版本：python main.py web")
+    print("\n📊 抓取统计:")
+    print(f"   页面: {summary['crawled']}  失败: {summary['failed']}  发现URL: {summary['discovered']}")
+    print(f"   耗时: {summary['elapsed']:.1f}s  吞吐: {summary['pages_per_second']:.2f} 页/秒")
+    print(f"   输出: {summary['bytes'] / 1024:.1f} KB")
+    print(f"   HTTP: {summary['fetch']['http_pages']} 页  浏览器: {summary['fetch']['browser_pages']} 页"
+          f"  近似重复: {summary['duplicates']}")
+    if summary['failures']:
+        print(f"   失败原因: {summary['failures']}")
     
-    return False
+    return summary['crawled'] > 0
 
 
 def main():
@@ -131,7 +166,8 @@ def main():
         epilog="""
 使用示例:
   python main.py web                           # 启动Web界面
-  python main.py cli https://example.com      # 命令行模式（开发中）
+  python main.py cli https://example.com      # 命令行模式，结果写入 crawl_results/results.jsonl
+  python main.py cli https://example.com -o - -c 8 -n 500 | jq .url
         """
     )
     
@@ -149,7 +185,47 @@ def main():
     
     parser.add_argument(
         '--output', '-o',
-        help='输出目录 (仅命令行模式)'
+        help='输出目录，"-" 表示输出到标准输出 (仅命令行模式)'
+    )
+    
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=4,
+        help='并发抓取页数 (仅命令行模式，默认 4)'
+    )
+    
+    parser.add_argument(
+        '--depth', '-d',
+        type=int,
+        default=3,
+        help='最大抓取深度 (仅命令行模式，默认 3)'
+    )
+    
+    parser.add_argument(
+        '--max-pages', '-n',
+        type=int,
+        default=50,
+        help='最大页面数 (仅命令行模式，默认 50)'
+    )
+    
+    parser.add_argument(
+        '--fetch',
+        choices=['auto', 'http', 'browser'],
+        default='auto',
+        help='抓取引擎: auto (静态页面用 HTTP，需要渲染时用浏览器)、http 或 browser (仅命令行模式)'
+    )
+    
+    parser.add_argument(
+        '--near-duplicates',
+        action='store_true',
+        help='跳过近似重复页面的后处理，只记录 duplicate_of (仅命令行模式)'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        help='目标主机每秒请求数 (仅命令行模式，默认 2)'
     )
     
     parser.add_argument(
@@ -160,8 +236,19 @@ def main():
     
     args = parser.parse_args()
     
+    # 结果输出到标准输出时，提示信息改为输出到标准错误
+    results = sys.stdout
+    if args.mode == 'cli' and args.output == '-':
+        with redirect_stdout(sys.stderr):
+            run(parser, args, results)
+    else:
+        run(parser, args, results)
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace, results: TextIO):
+    """按启动模式运行"""
     # 显示启动信息
-    if not display_startup_info():
+    if not display_startup_info(args.mode, args.fetch):
         print("\n❌ 依赖检查失败，请先安装必要的依赖包")
         sys.exit(1)
     
@@ -176,7 +263,17 @@ def main():
             sys.exit(1)
         
         print("\n💻 启动命令行模式...")
-        success = start_command_line(args.url, args.output)
+        success = start_command_line(
+            args.url,
+            args.output,
+            concurrency=args.concurrency,
+            max_depth=args.depth,
+            max_pages=args.max_pages,
+            rate=args.rate,
+            fetch_mode=args.fetch,
+            near_duplicates=args.near_duplicates,
+            results=results if args.output == '-' else None
+        )
     else:
         parser.print_help()
         sys.exit(1)
@@ -3,15 +3,27 @@
 基于 Crawl4AI 的网站内容抓取和导航分析工具
 """
 
+import importlib
+
 __version__ = "2.1.0"
 __author__ = "AITOOLBOX"
 __email__ = "support@aitoolbox.com"
 __description__ = "基于 Crawl4AI 的智能网站爬虫工具，支持增强导航栏提取"
 
-from .crawler import WebsiteCrawler
-from .navigation import EnhancedNavigationExtractor
+# 导出对象按需导入，导入子模块时不会连带加载爬虫和浏览器依赖
+_LAZY_EXPORTS = {
+    "WebsiteCrawler": ".crawler",
+    "EnhancedNavigationExtractor": ".navigation",
+}
 
 __all__ = [
     "WebsiteCrawler",
     "EnhancedNavigationExtractor",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
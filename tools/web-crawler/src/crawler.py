@@ -0,0 +1,202 @@
+"""
+命令行爬虫
+不加载 Web 服务，直接用抓取前沿、流式管线和与 Web 服务共用的单页面抓取流程驱动抓取，
+每个页面抓取完成后立即以一行 JSON 写入结果文件或标准输出
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO, Union
+
+from .utils.blob_store import BlobStore
+from .utils.fetch_engine import FetchRouter, HttpFetcher
+from .utils.frontier import CrawlFrontier
+from .utils.link_filter import LinkFilter
+from .utils.metrics import CrawlMetrics
+from .utils.near_duplicates import NearDuplicateIndex
+from .utils.page_crawler import PageCrawler, navigation_extraction_strategy
+from .utils.page_record import PageRecord
+from .utils.pipeline import CrawlPipeline
+from .utils.rate_limiter import HostRateLimiter, host_of
+from .utils.urls import UrlCanonicalizer
+
+# 只用 HTTP 抓取时不需要 crawl4ai
+CRAWL4AI_AVAILABLE = importlib.util.find_spec('crawl4ai') is not None
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILE = 'results.jsonl'
+STDOUT = '-'  # 输出目录为 "-" 时结果写到标准输出
+
+
+def _default_crawler_factory():
+    """创建 crawl4ai 爬虫，只在开始抓取时导入浏览器依赖"""
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
+    return AsyncWebCrawler(config=BrowserConfig(headless=True, viewport_width=1280, viewport_height=720))
+
+
+def _default_run_config():
+    from crawl4ai import CacheMode, CrawlerRunConfig
+    return CrawlerRunConfig(
+        cache_mode=CacheMode.BYPASS,
+        extraction_strategy=navigation_extraction_strategy(),
+        exclude_external_links=True
+    )
+
+
+class WebsiteCrawler:
+    """无界面的网站爬虫
+
+    与 Web 服务使用同一套抓取组件：URL 规范化去重的前沿和 PageCrawler 单页面抓取流程
+    （按主机限速、HTTP 优先的抓取引擎、近似重复检测、紧凑页面记录和批量链接过滤）；
+    浏览器在第一个需要渲染的页面出现时才启动，未安装 crawl4ai 时只用 HTTP 抓取。
+    输出目录下的 results.jsonl 每行一个页面，按完成顺序写入；完整正文保存在 blobs/ 内容存储中，
+    输出到标准输出时记录中保存截断后的正文。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        output_dir: Union[str, Path] = 'crawl_results',
+        max_depth: int = 3,
+        max_pages: int = 50,
+        concurrency: int = 4,
+        strategy: str = 'bfs',
+        config: Optional[Dict] = None,
+        crawler_factory: Optional[Callable] = None,
+        run_config=None,
+    ):
+        self.base_url = base_url
+        self.output_dir = Path(output_dir)
+        self.to_stdout = str(output_dir) == STDOUT
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.strategy = strategy
+        self.config = config or {}
+        self._crawler_factory = crawler_factory or (_default_crawler_factory if CRAWL4AI_AVAILABLE else None)
+        self._run_config = run_config
+
+        self.link_filter = LinkFilter.from_config(self.config, base_url)
+        self.fetch_router = FetchRouter.from_config(self.config)
+        self.rate_limiter = HostRateLimiter(respect_robots=self.config.get('respect_robots', True))
+        rate_limit = self.config.get('rate_limit')
+        if rate_limit:
+            self.rate_limiter.configure_host(host_of(base_url), rate=rate_limit.get('rate'), burst=rate_limit.get('burst'))
+
+        self.metrics = CrawlMetrics()
+
+        self.stats = {'crawled': 0, 'failed': 0, 'duplicates': 0, 'discovered': 0, 'bytes': 0, 'elapsed': 0.0}
+        self._crawler = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._fetcher: Optional[HttpFetcher] = None
+        self._store: Optional[BlobStore] = None
+        self._out: Optional[TextIO] = None
+        self._page_crawler: Optional[PageCrawler] = None
+
+    @property
+    def results_path(self) -> Optional[Path]:
+        return None if self.to_stdout else self.output_dir / RESULTS_FILE
+
+    async def crawl(self, out: Optional[TextIO] = None) -> Dict:
+        """抓取站点并流式写出结果，返回吞吐统计
+
+        out 为空时写入输出目录下的 results.jsonl（输出目录为 "-" 时写到标准输出）。
+        """
+        if out is None and not self.to_stdout:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.results_path, 'w', encoding='utf-8') as file:
+                return await self.crawl(file)
+
+        self._out = out or sys.stdout
+        if not self.to_stdout:
+            self._store = BlobStore(self.output_dir / 'blobs')
+        self._browser_lock = asyncio.Lock()
+        if self.fetch_router.mode != 'browser':
+            self._fetcher = HttpFetcher(self.base_url, self.fetch_router, limit_per_host=self.concurrency)
+        page_crawler = self._page_crawler = PageCrawler(
+            self.rate_limiter,
+            self.fetch_router,
+            self.link_filter,
+            on_page=self._record_page,
+            on_failure=self._record_failure,
+            browser=self._browser if self._crawler_factory else None,
+            run_config=self._run_config,
+            fetcher=self._fetcher,
+            store=self._store,
+            near_duplicates=NearDuplicateIndex.from_config(self.config.get('near_duplicates')),
+            on_duplicate=self._record_duplicate,
+            metrics=self.metrics,
+        )
+
+        frontier = CrawlFrontier(
+            strategy=self.strategy,
+            max_depth=self.max_depth,
+            max_pages=self.max_pages,
+            canonicalizer=UrlCanonicalizer.from_config(self.config.get('url_rules')),
+        )
+        frontier.add(self.base_url)
+
+        started = time.perf_counter()
+        try:
+            await CrawlPipeline(frontier, page_crawler.crawl, concurrency=self.concurrency).run()
+        finally:
+            if self._fetcher is not None:
+                await self._fetcher.close()
+                self._fetcher = None
+            if self._crawler is not None:
+                await self._crawler.close()
+                self._crawler = None
+            self._out.flush()
+
+        self.stats['discovered'] = len(frontier.seen)
+        self.stats['elapsed'] = time.perf_counter() - started
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """抓取统计：页面数、失败数、写出字节数、耗时和每秒页面数"""
+        elapsed = self.stats['elapsed']
+        return dict(
+            self.stats,
+            pages_per_second=self.stats['crawled'] / elapsed if elapsed else 0.0,
+            link_filter=self.link_filter.stats(),
+            fetch=self.fetch_router.stats(),
+            **self.metrics.summary(),
+        )
+
+    @asynccontextmanager
+    async def _browser(self):
+        """第一次需要浏览器渲染时才启动浏览器，之后所有页面共用"""
+        async with self._browser_lock:
+            if self._crawler is None:
+                if self._run_config is None:
+                    self._run_config = self._page_crawler.run_config = _default_run_config()
+                crawler = self._crawler_factory()
+                await crawler.start()
+                self._crawler = crawler
+        yield self._crawler
+
+    def _record_page(self, url: str, record: PageRecord, links: List[str]):
+        self._write(record)
+
+    def _record_duplicate(self, url: str, record: PageRecord, original: str):
+        self.stats['duplicates'] += 1
+        self._write(record)
+
+    def _record_failure(self, url: str, depth: int, message: str, error: Optional[BaseException]):
+        logger.warning(f"{'抓取出错' if error else '抓取失败'}: {url} - {message}")
+        self.stats['failed'] += 1
+
+    def _write(self, record: PageRecord):
+        line = json.dumps(record.to_dict(), ensure_ascii=False) + '\n'
+        self._out.write(line)
+        if self.to_stdout:
+            self._out.flush()  # 下游管道按行实时读取
+        self.stats['crawled'] += 1
+        self.stats['bytes'] += len(line.encode('utf-8'))
@@ -0,0 +1,310 @@
+"""
+增强导航提取器
+单遍流式解析 HTML，按导航选择器定位导航区域，提取其中的链接并保留菜单层级
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# lxml 可选：已安装时使用 lxml 的 target 解析器，否则使用标准库的 html.parser
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# 导航区域选择器，支持 tag、.class、#id 和 [attr] / [attr='value'] 组成的简单选择器
+DEFAULT_NAV_SELECTORS = [
+    'nav',
+    "[role='navigation']",
+    '.nav',
+    '.navigation',
+    '.navbar',
+    '.menu',
+    '.sidebar',
+    '.nav-menu',
+    '.main-nav',
+    '.site-nav',
+    '.primary-nav',
+    '.header-nav',
+    '.top-nav',
+    '.side-nav',
+    '.navigation-menu',
+    '.breadcrumb',
+    '.toc',
+]
+
+LIST_TAGS = frozenset(('ul', 'ol'))
+SKIP_SCHEMES = ('javascript:', 'mailto:', 'tel:', 'data:')
+
+_SELECTOR_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:[.#][\w-]+|\[[^\]]+\])*)$')
+_SELECTOR_PART = re.compile(r'([.#])([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*["\']?([^"\'\]]*)["\']?)?\s*\]')
+_MARKDOWN_LINK = re.compile(r'\[([^\]\n]+)\]\(([^)\s]+)[^)\n]*\)')
+
+
+class _Selector:
+    """编译后的简单选择器"""
+
+    __slots__ = ('tag', 'classes', 'id', 'attrs')
+
+    def __init__(self, selector: str):
+        match = _SELECTOR_PATTERN.match(selector.strip())
+        if not match:
+            raise ValueError(f'不支持的导航选择器: {selector}')
+        self.tag = match.group(1).lower() if match.group(1) else None
+        self.classes = []
+        self.id = None
+        self.attrs = []
+        for prefix, name, attr, value in _SELECTOR_PART.findall(match.group(2)):
+            if prefix == '.':
+                self.classes.append(name)
+            elif prefix == '#':
+                self.id = name
+            else:
+                self.attrs.append((attr.lower(), value or None))
+
+    def matches(self, tag: str, attrs: Dict[str, str], classes: List[str]) -> bool:
+        if self.tag and self.tag != tag:
+            return False
+        if self.id and attrs.get('id') != self.id:
+            return False
+        if any(name not in classes for name in self.classes):
+            return False
+        for attr, value in self.attrs:
+            if attr not in attrs or (value is not None and attrs[attr] != value):
+                return False
+        return True
+
+
+class _NavigationCollector:
+    """解析事件的接收者，与 lxml 的 parser target 接口一致，标签名为小写"""
+
+    def __init__(self, extractor: 'EnhancedNavigationExtractor', page_url: str):
+        self.extractor = extractor
+        self.page_url = page_url
+        parts = urlsplit(page_url)
+        self.scheme = parts.scheme
+        self.origin = f'{parts.scheme}://{parts.netloc}'
+
+        self.region_tag = None   # 当前导航区域的标签
+        self.region_nesting = 0  # 导航区域内同名标签的嵌套层数
+        self.found_region = False
+        self.list_depth = 0
+
+        self.anchor_href = None
+        self.anchor_title = None
+        self.anchor_text: List[str] = []
+        self.anchor_in_region = False
+
+        self.region_links: List[Dict] = []
+        self.other_links: List[Dict] = []
+        self.seen = set()
+
+    def start(self, tag, attrib):
+        if self.region_tag is None:
+            if self.extractor.is_nav_region(tag, attrib):
+                self.region_tag = tag
+                self.region_nesting = 1
+                self.found_region = True
+                self.list_depth = 0
+        elif tag == self.region_tag:
+            self.region_nesting += 1
+
+        if tag in LIST_TAGS:
+            self.list_depth += 1
+        elif tag == 'a':
+            self.anchor_href = attrib.get('href')
+            self.anchor_title = attrib.get('title') or attrib.get('aria-label')
+            self.anchor_text = []
+            self.anchor_in_region = self.region_tag is not None
+
+    def end(self, tag):
+        if tag == 'a':
+            if self.anchor_href is not None:
+                self._finish_anchor()
+        elif tag in LIST_TAGS:
+            self.list_depth = max(0, self.list_depth - 1)
+
+        if self.region_tag is not None and tag == self.region_tag:
+            self.region_nesting -= 1
+            if self.region_nesting == 0:
+                self.region_tag = None
+                self.list_depth = 0
+
+    def data(self, text):
+        if self.anchor_href is not None:
+            self.anchor_text.append(text)
+
+    def close(self) -> List[Dict]:
+        if self.anchor_href is not None:
+            self._finish_anchor()
+        # 没有匹配到导航区域时，输入本身就是导航片段
+        return self.region_links if self.found_region else self.other_links
+
+    def _finish_anchor(self):
+        href, self.anchor_href = self.anchor_href, None
+        title = ' '.join(''.join(self.anchor_text).split()) or (self.anchor_title or '').strip()
+        if not title:
+            return
+        url = self.extractor.resolve(href, self.page_url, self.origin, self.scheme)
+        if url is None or url in self.seen:
+            return
+        self.seen.add(url)
+        target = self.region_links if self.anchor_in_region else self.other_links
+        target.append({
+            'title': title,
+            'url': url,
+            'type': 'navigation',
+            'level': max(0, self.list_depth - 1),
+        })
+
+
+class _HtmlParserFeeder(HTMLParser):
+    """未安装 lxml 时用标准库 html.parser 解析，向 target 发送与 lxml 相同的 start/end/data 事件
+
+    注释、script/style 内容和属性值中的 > 由 html.parser 处理，属性值和文本中的字符引用已解码。
+    """
+
+    def __init__(self, target: _NavigationCollector):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        target = self.target
+        if tag == 'a' and target.anchor_href is not None:
+            target.end('a')  # 与 lxml 一致：新的链接开始时结束未闭合的链接
+        target.start(tag, {name: value or '' for name, value in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+class EnhancedNavigationExtractor:
+    """增强导航提取器
+
+    - 单遍解析：lxml 可用时使用 lxml 的 target 解析器，否则使用标准库 html.parser，两者产生相同的事件
+    - 只提取导航区域内的链接；输入中没有导航区域时视为导航片段，提取全部链接
+    - 链接文本包含嵌套标签中的文本，例如 <a><span>文档</span></a>
+    - level 为链接所在列表的嵌套层级，extract() 按层级组织为树
+    - 只保留与 base_url 同一主机的 http(s) 链接，去掉 #片段
+    """
+
+    def __init__(self, base_url: str, nav_selectors: Optional[List[str]] = None):
+        self.base_url = base_url
+        self.nav_selectors = list(nav_selectors or DEFAULT_NAV_SELECTORS)
+        self.host = urlsplit(base_url).netloc.lower()
+
+        self._tag_selectors = set()
+        self._class_selectors = set()
+        self._compound_selectors: List[_Selector] = []
+        for selector in self.nav_selectors:
+            compiled = _Selector(selector)
+            if compiled.tag and not (compiled.classes or compiled.id or compiled.attrs):
+                self._tag_selectors.add(compiled.tag)
+            elif len(compiled.classes) == 1 and not (compiled.tag or compiled.id or compiled.attrs):
+                self._class_selectors.add(compiled.classes[0])
+            else:
+                self._compound_selectors.append(compiled)
+
+    def extract_links(self, content: str, page_url: Optional[str] = None) -> List[Dict]:
+        """提取导航链接，按文档顺序返回，每项带 level 层级"""
+        page_url = page_url or self.base_url
+        if not content:
+            return []
+        if '<' not in content:
+            return self._extract_markdown_links(content, page_url)
+
+        collector = self._collect(content, page_url)
+        return collector.region_links if collector.found_region else collector.other_links
+
+    def extract_page_links(self, content: str, page_url: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+        """一次解析整个页面，返回 (导航区域内的链接, 导航区域外的站内链接)，链接不重复"""
+        if not content:
+            return [], []
+        collector = self._collect(content, page_url or self.base_url)
+        return (collector.region_links if collector.found_region else []), collector.other_links
+
+    def extract(self, content: str, page_url: Optional[str] = None) -> List[Dict]:
+        """提取导航树，每项的 children 为下一层级的链接"""
+        roots: List[Dict] = []
+        stack: List[Dict] = []
+        for link in self.extract_links(content, page_url):
+            node = dict(link, children=[])
+            while stack and stack[-1]['level'] >= node['level']:
+                stack.pop()
+            (stack[-1]['children'] if stack else roots).append(node)
+            stack.append(node)
+        return roots
+
+    def is_nav_region(self, tag: str, attrs) -> bool:
+        """元素是否匹配任一导航选择器"""
+        if tag in self._tag_selectors:
+            return True
+        classes = (attrs.get('class') or '').split()
+        if self._class_selectors and not self._class_selectors.isdisjoint(classes):
+            return True
+        if self._compound_selectors:
+            attrs = {name.lower(): value for name, value in attrs.items()}
+            return any(selector.matches(tag, attrs, classes) for selector in self._compound_selectors)
+        return False
+
+    def resolve(self, href: Optional[str], page_url: str, origin: str, scheme: str) -> Optional[str]:
+        """解析链接为绝对URL，外部链接和非 http(s) 链接返回 None"""
+        href = (href or '').strip()
+        if not href or href[0] == '#' or href.lower().startswith(SKIP_SCHEMES):
+            return None
+
+        # 常见形式直接拼接，只有相对路径才调用 urljoin
+        if href.startswith(('http://', 'https://')):
+            url = href
+        elif href.startswith('//'):
+            url = f'{scheme}:{href}'
+        elif href[0] == '/':
+            url = origin + href
+        else:
+            url = urljoin(page_url, href)
+
+        url = url.split('#', 1)[0]
+        parts = url.split('/', 3)
+        if len(parts) < 3 or parts[0] not in ('http:', 'https:') or parts[2].lower() != self.host:
+            return None
+        return url
+
+    def _collect(self, content: str, page_url: str) -> _NavigationCollector:
+        collector = _NavigationCollector(self, page_url)
+        if LXML_AVAILABLE:
+            parser = etree.HTMLParser(target=collector)
+            parser.feed(content)
+            parser.close()
+        else:
+            parser = _HtmlParserFeeder(collector)
+            parser.feed(content)
+            parser.close()
+            collector.close()
+        return collector
+
+    def _extract_markdown_links(self, content: str, page_url: str) -> List[Dict]:
+        """Markdown 列表中的链接，缩进每两个空格为一级"""
+        parts = urlsplit(page_url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        links = []
+        seen = set()
+        for line in content.splitlines():
+            indent = len(line) - len(line.lstrip(' '))
+            for title, href in _MARKDOWN_LINK.findall(line):
+                url = self.resolve(href, page_url, origin, parts.scheme)
+                title = title.strip()
+                if url is None or not title or url in seen:
+                    continue
+                seen.add(url)
+                links.append({'title': title, 'url': url, 'type': 'navigation', 'level': indent // 2})
+        return links
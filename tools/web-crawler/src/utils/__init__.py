@@ -3,8 +3,22 @@
 包含项目中使用的各种工具函数和类
 """
 
-from .integration import IntegrationManager
+import importlib
+
+# 导出对象按需导入，避免导入单个工具模块时加载全部依赖
+_LAZY_EXPORTS = {
+    "IntegrationManager": ".integration",
+    "BrowserPool": ".browser_pool",
+}
 
 __all__ = [
     "IntegrationManager",
-] 
\ No newline at end of file
+    "BrowserPool",
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,179 @@
+"""
+内容寻址存储
+页面正文、Markdown、截图和 PDF 按内容的 SHA-256 保存为压缩文件，结果中只保留引用，
+相同内容在任务内和任务间只保存一份，读取时按块解压，可直接流式输出；
+不再被任何记录引用的内容由 gc() 删除
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Set, Union
+
+# zstandard 可选：已安装时使用 zstd 压缩，否则使用 gzip
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+CHUNK_SIZE = 64 * 1024
+
+# 新写入或刚被复用的内容在这段时间内不回收：抓取中的页面先保存正文，之后才登记结果
+GC_MIN_AGE_SECONDS = 3600
+
+# 文件后缀对应的存储格式，读取时按顺序查找
+SUFFIXES = ('.zst', '.gz', '')
+
+_KEY = re.compile(r'[0-9a-f]{64}')
+
+
+def body_keys(records: Iterable[Mapping]) -> Iterator[str]:
+    """记录（PageRecord 或其 JSON 字典）引用的内容 key"""
+    for record in records:
+        bodies = record.get('bodies')
+        if bodies:
+            for ref in bodies.values():
+                yield ref['key']
+
+
+class BlobStore:
+    """本地内容寻址存储
+
+    文件保存在 root/<前两位>/<sha256><后缀> 下，写入时先写临时文件再重命名，
+    已存在的内容直接返回引用并更新修改时间。已压缩的格式（PNG 截图等）可以 compress=False 原样保存。
+    """
+
+    def __init__(self, root, level: Optional[int] = None):
+        self.root = Path(root)
+        self.codec = 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        self.level = level if level is not None else (3 if ZSTD_AVAILABLE else 6)
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.dedup_hits = 0
+        self.stored_bytes = 0  # 本进程写入的压缩后字节数
+        self.raw_bytes = 0     # 本进程写入的原始字节数
+        self.collected = 0        # gc() 删除的文件数
+        self.collected_bytes = 0  # gc() 删除的压缩后字节数
+
+    def put(self, data: Union[str, bytes], compress: bool = True) -> Dict:
+        """保存内容，返回引用 {'key': sha256, 'size': 原始字节数}"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        key = hashlib.sha256(data).hexdigest()
+        ref = {'key': key, 'size': len(data)}
+
+        existing = self._find(key)
+        if existing is not None:
+            try:
+                os.utime(existing)  # 复用的内容重新计时，不被并发的 gc() 当作无引用内容删除
+            except OSError:
+                pass
+            with self._lock:
+                self.dedup_hits += 1
+            return ref
+
+        suffix = ('.zst' if ZSTD_AVAILABLE else '.gz') if compress else ''
+        payload = self._compress(data) if compress else data
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            self.stored_bytes += len(payload)
+            self.raw_bytes += len(data)
+        return ref
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def get(self, key: str) -> bytes:
+        """读取完整内容"""
+        return b''.join(self.iter_chunks(key))
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """按块读取并解压内容，内容不存在时抛出 KeyError"""
+        path = self._find(key)
+        if path is None:
+            raise KeyError(key)
+        with open(path, 'rb') as raw:
+            if path.suffix == '.zst':
+                if not ZSTD_AVAILABLE:
+                    raise RuntimeError('读取 zstd 内容需要安装 zstandard')
+                stream = zstandard.ZstdDecompressor().stream_reader(raw)
+            elif path.suffix == '.gz':
+                stream = gzip.GzipFile(fileobj=raw)
+            else:
+                stream = raw
+            with stream:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def gc(self, live_keys: Set[str], min_age_seconds: float = GC_MIN_AGE_SECONDS) -> int:
+        """删除不在 live_keys 中、且超过 min_age_seconds 未写入或复用的内容，返回删除的文件数
+
+        同时清理写入中断遗留的临时文件。
+        """
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - min_age_seconds
+        removed = 0
+        removed_bytes = 0
+        for path in self.root.glob('??/*'):
+            name = path.name
+            if not name.endswith('.tmp'):
+                key = name.split('.', 1)[0]
+                if not _KEY.fullmatch(key) or key in live_keys:
+                    continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime >= cutoff:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            removed_bytes += stat.st_size
+        with self._lock:
+            self.collected += removed
+            self.collected_bytes += removed_bytes
+        return removed
+
+    def stats(self) -> Dict:
+        return {
+            'codec': self.codec,
+            'writes': self.writes,
+            'dedup_hits': self.dedup_hits,
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'collected': self.collected,
+            'collected_bytes': self.collected_bytes,
+        }
+
+    def _compress(self, data: bytes) -> bytes:
+        if ZSTD_AVAILABLE:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f'{key}{suffix}'
+
+    def _find(self, key: str) -> Optional[Path]:
+        if not _KEY.fullmatch(key):
+            return None
+        for suffix in SUFFIXES:
+            path = self._path(key, suffix)
+            if path.exists():
+                return path
+        return None
@@ -0,0 +1,355 @@
+"""
+浏览器池
+在服务器进程内复用预热的 AsyncWebCrawler 实例，避免每个任务、每个阶段重复启动浏览器
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 未开启定期健康检查时，浏览器进程内存的缓存时间（秒）
+DEFAULT_MEMORY_SAMPLE_INTERVAL = 30.0
+
+# 决定两个 BrowserConfig 能否共用同一个浏览器进程的字段
+COMPATIBILITY_FIELDS = (
+    'browser_type',
+    'headless',
+    'viewport_width',
+    'viewport_height',
+    'user_agent',
+    'proxy',
+    'text_mode',
+    'light_mode',
+    'extra_args',
+)
+
+
+def browser_config_key(browser_config) -> Tuple:
+    """计算浏览器配置的兼容性键，键相同的配置可以共享浏览器"""
+    return tuple(
+        (field, repr(getattr(browser_config, field, None)))
+        for field in COMPATIBILITY_FIELDS
+    )
+
+
+def _default_crawler_factory(browser_config):
+    """默认使用 crawl4ai 创建浏览器实例"""
+    from crawl4ai import AsyncWebCrawler
+    return AsyncWebCrawler(config=browser_config)
+
+
+class PooledBrowser:
+    """池中的单个浏览器实例"""
+
+    def __init__(self, key: Tuple, crawler):
+        self.key = key
+        self.crawler = crawler
+        self.pages = 0
+        self.active = 0
+        self.retiring = False
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class BrowserLease:
+    """浏览器租约，租用期间通过 crawler 访问浏览器"""
+
+    def __init__(self, browser: PooledBrowser, max_pages: int):
+        self._browser = browser
+        self._max_pages = max_pages
+        self.pages = 0
+
+    @property
+    def crawler(self):
+        return self._browser.crawler
+
+    def record_pages(self, count: int = 1):
+        """记录本次租约抓取的页面数，浏览器累计页面数达到上限时立即标记回收
+
+        标记后新的租约不再分配到该浏览器，最后一个租约结束时关闭。
+        """
+        self.pages += count
+        browser = self._browser
+        browser.pages += count
+        if browser.pages >= self._max_pages:
+            browser.retiring = True
+
+
+class BrowserPool:
+    """共享浏览器池
+
+    - 兼容配置的阶段和任务共享同一浏览器（一个浏览器可同时被多个租约使用）
+    - 定期健康检查，剔除已断开的浏览器；租约结束时也检查，租用期间崩溃的浏览器不再分配
+    - 浏览器累计抓取 max_pages_per_browser 个页面后回收重建
+    - 浏览器进程总内存超过 max_memory_mb 时优先回收空闲浏览器，并暂停新建；
+      内存按健康检查间隔采样一次，stats() 和扩容判断读取缓存值
+    """
+
+    def __init__(
+        self,
+        max_browsers: int = 4,
+        max_pages_per_browser: int = 500,
+        max_memory_mb: Optional[int] = None,
+        health_check_interval: float = 30.0,
+        crawler_factory: Optional[Callable] = None,
+    ):
+        self.max_browsers = max_browsers
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_memory_mb = max_memory_mb
+        self.health_check_interval = health_check_interval
+        self._crawler_factory = crawler_factory or _default_crawler_factory
+
+        self._browsers: List[PooledBrowser] = []
+        self._launching = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+        self.launched = 0
+        self.recycled = 0
+        self.unhealthy = 0
+        self._memory_mb: Optional[float] = None
+        self._memory_sampled_at: Optional[float] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # 延迟创建，保证绑定到浏览器池实际运行的事件循环
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def start(self, prewarm_configs: Optional[List] = None):
+        """启动浏览器池，预热给定配置的浏览器并开始健康检查"""
+        for browser_config in prewarm_configs or []:
+            async with self.condition:
+                if len(self._browsers) + self._launching >= self.max_browsers:
+                    break
+                self._launching += 1
+            await self._launch(browser_config)
+
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+        logger.info(f"浏览器池已启动，预热 {len(self._browsers)} 个浏览器")
+
+    async def close(self):
+        """关闭所有浏览器"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+
+        browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            await self._close_browser(browser)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    @asynccontextmanager
+    async def lease(self, browser_config):
+        """租用一个与 browser_config 兼容的浏览器"""
+        browser = await self._acquire(browser_config)
+        lease = BrowserLease(browser, self.max_pages_per_browser)
+        try:
+            yield lease
+        finally:
+            await self._release(browser)
+
+    async def _acquire(self, browser_config) -> PooledBrowser:
+        key = browser_config_key(browser_config)
+
+        async with self.condition:
+            while True:
+                candidates = [
+                    b for b in self._browsers
+                    if b.key == key and not b.retiring
+                ]
+                if candidates:
+                    browser = min(candidates, key=lambda b: b.active)
+                    browser.active += 1
+                    browser.last_used = time.monotonic()
+                    return browser
+
+                if self._can_launch():
+                    self._launching += 1
+                    break
+
+                # 池已满：回收一个其他配置的空闲浏览器腾出位置
+                idle = [b for b in self._browsers if b.active == 0]
+                if idle:
+                    victim = min(idle, key=lambda b: b.last_used)
+                    self._browsers.remove(victim)
+                    self._launching += 1
+                    self.recycled += 1
+                    closing = asyncio.create_task(self._close_browser(victim))
+                    self._closing.add(closing)
+                    closing.add_done_callback(self._closing.discard)
+                    break
+
+                await self.condition.wait()
+
+        return await self._launch(browser_config, leased=True)
+
+    async def _release(self, browser: PooledBrowser):
+        healthy = self._is_healthy(browser)
+        async with self.condition:
+            browser.active -= 1
+            browser.last_used = time.monotonic()
+            if not healthy and not browser.retiring:
+                # 租用期间崩溃或断开的浏览器：新租约不再分配，最后一个租约结束后关闭
+                browser.retiring = True
+                self.unhealthy += 1
+                logger.warning("浏览器在租用期间断开，租约结束后回收")
+
+            should_close = browser.retiring and browser.active == 0
+            if should_close and browser in self._browsers:
+                self._browsers.remove(browser)
+            self.condition.notify_all()
+
+        if should_close:
+            self.recycled += 1
+            logger.info(f"回收浏览器（已抓取 {browser.pages} 个页面）")
+            await self._close_browser(browser)
+
+    def _can_launch(self) -> bool:
+        if len(self._browsers) + self._launching >= self.max_browsers:
+            return False
+        # 至少保留一个浏览器可用，内存上限只限制继续扩容
+        if self._browsers and self._over_memory_limit():
+            return False
+        return True
+
+    async def _launch(self, browser_config, leased: bool = False) -> PooledBrowser:
+        """启动新浏览器，调用前需已占用 _launching 名额"""
+        try:
+            crawler = self._crawler_factory(browser_config)
+            await crawler.start()
+        except Exception:
+            async with self.condition:
+                self._launching -= 1
+                self.condition.notify_all()
+            raise
+
+        browser = PooledBrowser(browser_config_key(browser_config), crawler)
+        if leased:
+            browser.active = 1
+        async with self.condition:
+            self._launching -= 1
+            self._browsers.append(browser)
+            self.launched += 1
+            self.condition.notify_all()
+        return browser
+
+    async def _close_browser(self, browser: PooledBrowser):
+        try:
+            await browser.crawler.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败: {str(e)}")
+        async with self.condition:
+            self.condition.notify_all()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"浏览器健康检查失败: {str(e)}", exc_info=True)
+
+    async def check_health(self):
+        """剔除已断开的空闲浏览器，并在超过内存上限时回收空闲浏览器"""
+        self._sample_memory()
+        to_close = []
+        async with self.condition:
+            for browser in list(self._browsers):
+                if browser.active == 0 and not self._is_healthy(browser):
+                    self._browsers.remove(browser)
+                    to_close.append(browser)
+
+            if self._over_memory_limit():
+                idle = sorted(
+                    (b for b in self._browsers if b.active == 0),
+                    key=lambda b: b.pages,
+                    reverse=True,
+                )
+                if idle:
+                    self._browsers.remove(idle[0])
+                    to_close.append(idle[0])
+                elif self._browsers:
+                    # 没有空闲浏览器时，让抓取页面最多的浏览器在租约结束后回收
+                    max(self._browsers, key=lambda b: b.pages).retiring = True
+
+        for browser in to_close:
+            self.recycled += 1
+            await self._close_browser(browser)
+
+    @staticmethod
+    def _is_healthy(browser: PooledBrowser) -> bool:
+        crawler = browser.crawler
+        if getattr(crawler, 'ready', True) is False:
+            return False
+        # crawl4ai 内部结构随版本变化，取不到浏览器对象时视为健康
+        strategy = getattr(crawler, 'crawler_strategy', None)
+        manager = getattr(strategy, 'browser_manager', None)
+        playwright_browser = getattr(manager, 'browser', None)
+        if playwright_browser is not None and hasattr(playwright_browser, 'is_connected'):
+            return playwright_browser.is_connected()
+        return True
+
+    def memory_usage_mb(self) -> Optional[float]:
+        """浏览器子进程的总常驻内存（MB），未安装 psutil 时返回 None
+
+        遍历进程树的开销较大，采样结果缓存一个健康检查间隔，由健康检查刷新。
+        """
+        interval = self.health_check_interval if self.health_check_interval > 0 else DEFAULT_MEMORY_SAMPLE_INTERVAL
+        if self._memory_sampled_at is None or time.monotonic() - self._memory_sampled_at >= interval:
+            self._sample_memory()
+        return self._memory_mb
+
+    def _sample_memory(self):
+        self._memory_mb = self._read_memory_mb()
+        self._memory_sampled_at = time.monotonic()
+
+    @staticmethod
+    def _read_memory_mb() -> Optional[float]:
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            total = 0
+            for child in psutil.Process(os.getpid()).children(recursive=True):
+                try:
+                    name = child.name().lower()
+                    if 'chrom' in name or 'firefox' in name or 'webkit' in name:
+                        total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _over_memory_limit(self) -> bool:
+        if not self.max_memory_mb:
+            return False
+        usage = self.memory_usage_mb()
+        return usage is not None and usage > self.max_memory_mb
+
+    def stats(self) -> Dict:
+        """浏览器池统计信息"""
+        return {
+            'browsers': len(self._browsers),
+            'active_leases': sum(b.active for b in self._browsers),
+            'max_browsers': self.max_browsers,
+            'launched': self.launched,
+            'recycled': self.recycled,
+            'unhealthy': self.unhealthy,
+            'memory_mb': self.memory_usage_mb(),
+        }
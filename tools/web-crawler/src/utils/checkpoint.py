@@ -0,0 +1,98 @@
+"""
+任务检查点
+与磁盘抓取前沿共用一个 SQLite 文件，周期性地增量保存前沿、已发现URL的指纹、
+统计信息和已产生的结果，进程重启后可从最近一次检查点继续抓取
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .disk_frontier import DiskFrontier
+
+
+def read_checkpoint_state(path) -> Optional[Dict]:
+    """读取检查点中的任务状态，不存在或尚未保存过检查点时返回 None"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(str(path))
+    try:
+        rows = conn.execute('SELECT key, value FROM meta').fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    state = {key: json.loads(value) for key, value in rows}
+    return state if 'config' in state else None
+
+
+def read_checkpoint_records(path) -> List[Dict]:
+    """读取检查点中保存的结果，不存在或没有结果表时返回空列表"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    conn = sqlite3.connect(str(path))
+    try:
+        rows = conn.execute('SELECT record FROM results ORDER BY seq').fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+    return [json.loads(record) for (record,) in rows]
+
+
+class CrawlCheckpoint:
+    """任务检查点
+
+    每次保存只追加上次检查点之后新增的结果，前沿只写入内存中的缓冲，
+    结果、前沿、正在抓取的URL和任务状态在同一个事务中提交，中断时不会出现不一致的检查点。
+    """
+
+    def __init__(self, frontier: DiskFrontier):
+        self.frontier = frontier
+        frontier.autocommit = False  # 前沿的写入只随检查点提交，与结果保持一致
+        self._conn = frontier.connection
+        self._conn.execute('CREATE TABLE IF NOT EXISTS results (seq INTEGER PRIMARY KEY, record TEXT NOT NULL)')
+        self._conn.commit()
+        self.result_offset = frontier.get_meta('result_offset', 0)
+        self.saved_at = time.monotonic()
+        self.saves = 0
+
+    def due(self, interval: float) -> bool:
+        """距上次保存是否已超过 interval 秒"""
+        return time.monotonic() - self.saved_at >= interval
+
+    def save(self, results: List[Mapping], in_flight: Iterable[Tuple[str, int]], state: Dict):
+        """保存检查点，results 为任务的全部结果（只追加新增部分）"""
+        end = len(results)
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO results (seq, record) VALUES (?, ?)',
+            (
+                (seq, json.dumps(dict(results[seq - 1]), ensure_ascii=False))
+                for seq in range(self.result_offset + 1, end + 1)
+            )
+        )
+        for key, value in state.items():
+            self.frontier.set_meta(key, value)
+        self.frontier.set_meta('result_offset', end)
+        self.frontier.checkpoint(in_flight)
+
+        self.result_offset = end
+        self.saved_at = time.monotonic()
+        self.saves += 1
+
+    def state(self) -> Dict:
+        """最近一次检查点保存的任务状态"""
+        rows = self._conn.execute('SELECT key, value FROM meta').fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def load_results(self) -> List[Dict]:
+        """最近一次检查点保存的结果"""
+        rows = self._conn.execute(
+            'SELECT record FROM results WHERE seq <= ? ORDER BY seq',
+            (self.result_offset,)
+        )
+        return [json.loads(record) for (record,) in rows]
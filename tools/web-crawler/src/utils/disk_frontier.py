@@ -0,0 +1,216 @@
+"""
+磁盘抓取前沿
+待抓取队列和已发现URL的指纹保存在 SQLite 中，内存中只保留队首和队尾的小批量缓冲，
+前沿增长到数百万URL时内存占用基本不变
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .frontier import CrawlFrontier
+from .urls import UrlCanonicalizer
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _signed(fingerprint: int) -> int:
+    """SQLite 整数为有符号 64 位"""
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+class DiskFingerprintSet:
+    """SQLite 中的指纹集合，新指纹先缓冲在内存中再批量写入"""
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE):
+        self._conn = conn
+        self.batch_size = batch_size
+        self._pending: Set[int] = set()
+        self._conn.execute('CREATE TABLE IF NOT EXISTS seen (fp INTEGER PRIMARY KEY) WITHOUT ROWID')
+        self._count = self._conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def add(self, fingerprint: int) -> bool:
+        """加入指纹，已存在时返回 False"""
+        fingerprint = _signed(fingerprint)
+        if fingerprint in self._pending or self._stored(fingerprint):
+            return False
+        self._pending.add(fingerprint)
+        self._count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def __contains__(self, fingerprint: int) -> bool:
+        fingerprint = _signed(fingerprint)
+        return fingerprint in self._pending or self._stored(fingerprint)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def flush(self):
+        if self._pending:
+            self._conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)', ((fp,) for fp in self._pending))
+            self._pending.clear()
+
+    def _stored(self, fingerprint: int) -> bool:
+        return self._conn.execute('SELECT 1 FROM seen WHERE fp = ?', (fingerprint,)).fetchone() is not None
+
+
+class DiskFrontier(CrawlFrontier):
+    """基于 SQLite 的抓取前沿
+
+    队列按入队顺序编号存放在 queue 表中，内存中只有两段缓冲：
+    - tail：最近入队、尚未写入磁盘的URL，超过 batch_size 时批量写入
+    - head：bfs 模式下从磁盘批量读出的最早入队的URL
+    bfs 按 head → 磁盘 → tail 的顺序出队；dfs 先从 tail 末尾出队，tail 为空时从磁盘读出最新的一批。
+
+    不保存检查点时每批写入、读出后立即提交，未提交的写入不超过两批。
+    由 CrawlCheckpoint 管理时（autocommit 为 False）所有写入在 checkpoint() 时才提交：
+    进程中断后重新打开同一文件，前沿恢复到最近一次检查点，
+    当时正在抓取和 head 中的URL保存在 pending 表中，最先出队。
+    """
+
+    def __init__(
+        self,
+        path,
+        strategy: str = 'bfs',
+        max_depth: int = 3,
+        max_pages: int = 50,
+        canonicalizer: Optional[UrlCanonicalizer] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.autocommit = True
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS queue ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' url TEXT NOT NULL,'
+            ' depth INTEGER NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pending ('
+            ' ord INTEGER PRIMARY KEY,'
+            ' url TEXT NOT NULL,'
+            ' depth INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        super().__init__(
+            strategy=strategy,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            seen=DiskFingerprintSet(self._conn, batch_size),
+            canonicalizer=canonicalizer,
+        )
+        self._head: List[Tuple[str, int]] = []
+        self._tail: List[Tuple[str, int]] = []
+        self._stored = self._conn.execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+        self.scheduled = self.get_meta('scheduled', 0)
+
+        # 从检查点恢复：pending 中的URL最先出队
+        pending = self._conn.execute('SELECT url, depth FROM pending ORDER BY ord').fetchall()
+        pending.reverse()
+        if self.strategy == 'dfs':
+            self._tail = pending
+        else:
+            self._head = pending
+        self._conn.commit()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        if self.strategy == 'dfs':
+            if not self._tail:
+                self._tail = self._read_batch(newest=True)
+            return self._tail.pop() if self._tail else None
+
+        if not self._head:
+            if self._stored:
+                self._head = self._read_batch(newest=False)
+            else:
+                self._head, self._tail = self._tail, []
+            self._head.reverse()
+        return self._head.pop() if self._head else None
+
+    def __len__(self) -> int:
+        return len(self._head) + self._stored + len(self._tail)
+
+    def checkpoint(self, in_flight: Iterable[Tuple[str, int]] = ()):
+        """写入内存缓冲并提交一个检查点
+
+        in_flight 为正在抓取的URL，和 bfs 的 head 一起写入 pending 表，恢复时最先出队；
+        head 仍保留在内存中继续出队。
+        """
+        self._write_tail(len(self._tail))
+        self.seen.flush()
+
+        pending = list(in_flight) + self._head[::-1]
+        self._conn.execute('DELETE FROM pending')
+        self._conn.executemany(
+            'INSERT INTO pending (ord, url, depth) VALUES (?, ?, ?)',
+            ((index, url, depth) for index, (url, depth) in enumerate(pending))
+        )
+        self.set_meta('scheduled', self.scheduled)
+        self._conn.commit()
+
+    def get_meta(self, key: str, default=None):
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value):
+        """写入检查点元数据，随下一次 checkpoint() 提交"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def destroy(self):
+        """关闭并删除磁盘文件"""
+        self.close()
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{self.path}{suffix}').unlink(missing_ok=True)
+
+    def _push(self, url: str, depth: int):
+        self._tail.append((url, depth))
+        if len(self._tail) >= 2 * self.batch_size:
+            # 写入 tail 中较早的一半，dfs 出队所需的最新URL留在内存中
+            self._write_tail(self.batch_size)
+            self.seen.flush()
+            self._commit_batch()
+
+    def _write_tail(self, count: int):
+        if not count:
+            return
+        self._conn.executemany('INSERT INTO queue (url, depth) VALUES (?, ?)', self._tail[:count])
+        self._stored += count
+        del self._tail[:count]
+
+    def _read_batch(self, newest: bool) -> List[Tuple[str, int]]:
+        """从磁盘读出并删除一批URL，按入队顺序返回"""
+        if not self._stored:
+            return []
+        order = 'DESC' if newest else 'ASC'
+        rows = self._conn.execute(
+            f'SELECT id, url, depth FROM queue ORDER BY id {order} LIMIT ?',
+            (self.batch_size,)
+        ).fetchall()
+        if newest:
+            rows.reverse()
+        self._conn.execute('DELETE FROM queue WHERE id BETWEEN ? AND ?', (rows[0][0], rows[-1][0]))
+        self._stored -= len(rows)
+        self._commit_batch()
+        return [(url, depth) for _, url, depth in rows]
+
+    def _commit_batch(self):
+        if self.autocommit:
+            self._conn.commit()
@@ -0,0 +1,305 @@
+"""
+HTTP 抓取引擎
+服务端渲染的页面直接用 aiohttp 获取和解析，不经过浏览器；
+内容看起来需要 JavaScript 渲染时交给浏览器，同一URL模板多次需要渲染后整个模板直接走浏览器
+"""
+
+import html
+import importlib.util
+import json
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from ..navigation import EnhancedNavigationExtractor
+from .near_duplicates import page_text
+
+# HTTP 抓取使用 aiohttp，第一次抓取时才导入；未安装时所有页面走浏览器
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODES = ('auto', 'http', 'browser')
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+
+_TITLE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.S | re.I)
+_META = re.compile(r'<meta\s[^>]*>', re.I)
+_META_ATTR = re.compile(r'(name|property|content)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.I)
+_BODY = re.compile(r'<body[^>]*>(.*)</body\s*>', re.S | re.I)
+_NOISE = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+# 前端框架的空挂载点：<div id="root"></div>、<div id="__next"></div>、<app-root></app-root> 等
+_EMPTY_ROOT = re.compile(
+    r'<div\b[^>]*\bid\s*=\s*["\'](?:root|app|__next|__nuxt|___gatsby|svelte)["\'][^>]*>\s*</div>'
+    r'|<(app-root|ng-view)\b[^>]*>\s*</\1>',
+    re.I
+)
+_ID_SEGMENT = re.compile(r'\d|^[0-9a-f]{16,}$|^[0-9a-f-]{32,36}$', re.I)
+
+
+def url_template(url: str) -> str:
+    """URL模板：含数字或形如哈希、UUID 的路径段替换为 *，查询参数只保留名称"""
+    parts = urlsplit(url)
+    path = '/'.join('*' if _ID_SEGMENT.search(segment) else segment for segment in parts.path.split('/'))
+    template = f'{parts.netloc.lower()}{path}'
+    if parts.query:
+        names = sorted({pair.split('=', 1)[0] for pair in parts.query.split('&') if pair})
+        template += '?' + '&'.join(names)
+    return template
+
+
+def render_reason(content: str, min_text: int = 200) -> Optional[str]:
+    """页面需要浏览器渲染的原因，服务端渲染的页面返回 None
+
+    - framework_root：前端框架的挂载点为空
+    - empty_body：页面带脚本，但可见文本少于 min_text 个字符
+    """
+    if _EMPTY_ROOT.search(content):
+        return 'framework_root'
+    if '<script' in content.lower():
+        body = _BODY.search(content)
+        text = page_text(_NOISE.sub(' ', body.group(1) if body else content))
+        if len(''.join(text.split())) < min_text:
+            return 'empty_body'
+    return None
+
+
+def _metadata(content: str) -> Dict[str, str]:
+    end = content.lower().find('</head')
+    head = content[:end] if end >= 0 else content[:20000]
+    metadata = {}
+    title = _TITLE.search(head)
+    if title:
+        metadata['title'] = html.unescape(' '.join(title.group(1).split()))
+    for tag in _META.findall(head):
+        attrs = {name.lower(): double or single for name, double, single in _META_ATTR.findall(tag)}
+        key = attrs.get('name') or attrs.get('property')
+        if key in ('description', 'og:description') and 'content' in attrs:
+            metadata.setdefault('description', html.unescape(attrs['content']))
+    return metadata
+
+
+def _navigation_html(links: List[Dict]) -> str:
+    """导航链接按层级还原为嵌套列表，相同的导航菜单在各页面生成相同的内容"""
+    parts = ['<nav><ul>']
+    depth = 0
+    for link in links:
+        level = link.get('level', 0)
+        while depth < level:
+            parts.append('<ul>')
+            depth += 1
+        while depth > level:
+            parts.append('</ul>')
+            depth -= 1
+        parts.append(f'<li><a href="{html.escape(link["url"])}">{html.escape(link["title"])}</a></li>')
+    parts.append('</ul>' * depth + '</ul></nav>')
+    return ''.join(parts)
+
+
+def _decode(body: bytes, charset: Optional[str]) -> str:
+    try:
+        return body.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class HttpCrawlResult:
+    """HTTP 抓取结果，字段与 crawl4ai 的 CrawlResult 中抓取流程用到的部分一致"""
+
+    __slots__ = (
+        'url', 'success', 'status_code', 'response_headers', 'error_message',
+        'metadata', 'cleaned_html', 'extracted_content', 'links',
+    )
+
+    def __init__(self, url: str, status_code: Optional[int] = None, response_headers=None, error_message: str = ''):
+        self.url = url
+        self.status_code = status_code
+        self.response_headers = response_headers or {}
+        self.success = status_code is not None and status_code < 400
+        self.error_message = error_message or ('' if self.success else f'HTTP {status_code}')
+        self.metadata: Dict[str, str] = {}
+        self.cleaned_html = ''
+        self.extracted_content: Optional[str] = None
+        self.links: Dict[str, List[Dict]] = {'internal': [], 'external': []}
+
+    @classmethod
+    def from_html(cls, url: str, content: str, extractor: EnhancedNavigationExtractor,
+                  status_code: int = 200, response_headers=None) -> 'HttpCrawlResult':
+        """解析页面：一次扫描得到导航链接和站内链接"""
+        result = cls(url, status_code, response_headers)
+        result.metadata = _metadata(content)
+        body = _BODY.search(content)
+        result.cleaned_html = _NOISE.sub('', body.group(1) if body else content).strip()
+
+        navigation, others = extractor.extract_page_links(content, url)
+        result.links['internal'] = [
+            {'href': link['url'], 'text': link['title'], 'title': ''} for link in navigation + others
+        ]
+        if navigation:
+            result.extracted_content = json.dumps({
+                'navigation': _navigation_html(navigation),
+                'navigation_links': [link['url'] for link in navigation],
+            }, ensure_ascii=False)
+        return result
+
+
+class FetchRouter:
+    """决定每个URL用 HTTP 还是浏览器抓取
+
+    - browser：全部走浏览器；任务设置了 wait_for 时固定为该模式
+    - http：全部走 HTTP，不做渲染检测
+    - auto：先走 HTTP，内容需要渲染时交给浏览器；同一模板累计 template_threshold 次后
+      该模板直接走浏览器，还没有任何页面通过 HTTP 成功时累计 site_threshold 次后整个站点走浏览器
+    """
+
+    def __init__(self, mode: str = 'auto', template_threshold: int = 2, site_threshold: int = 5, min_text: int = 200):
+        if mode not in FETCH_MODES:
+            raise ValueError(f'未知的抓取模式: {mode}')
+        self.mode = mode if AIOHTTP_AVAILABLE else 'browser'
+        self.template_threshold = template_threshold
+        self.site_threshold = site_threshold
+        self.min_text = min_text
+        self.http_pages = 0
+        self.browser_pages = 0
+        self.reasons: Counter = Counter()
+        self._template_escalations: Counter = Counter()
+        self._browser_templates = set()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'FetchRouter':
+        """根据任务配置的 fetch_mode（默认 auto）和 wait_for 创建"""
+        mode = 'browser' if config.get('wait_for') else config.get('fetch_mode') or 'auto'
+        return cls(mode)
+
+    def use_http(self, url: str) -> bool:
+        if self.mode != 'auto':
+            return self.mode == 'http'
+        return url_template(url) not in self._browser_templates
+
+    def check(self, url: str, content: str) -> Optional[str]:
+        """检查 HTTP 获取的内容，需要浏览器渲染时记录并返回原因"""
+        if self.mode != 'auto':
+            return None
+        reason = render_reason(content, self.min_text)
+        if reason:
+            self.escalate(url, reason)
+        return reason
+
+    def escalate(self, url: str, reason: str):
+        """记录一次交给浏览器的页面；连接错误和超时与页面内容无关，不计入模板和站点阈值"""
+        self.reasons[reason] += 1
+        if reason == 'transport':
+            return
+        template = url_template(url)
+        self._template_escalations[template] += 1
+        if self._template_escalations[template] >= self.template_threshold:
+            self._browser_templates.add(template)
+        if self.mode == 'auto' and self.http_pages == 0 and sum(self.reasons.values()) >= self.site_threshold:
+            logger.info(f'{self.site_threshold} 个页面需要浏览器渲染，之后全部使用浏览器抓取')
+            self.mode = 'browser'
+
+    def record(self, engine: str):
+        if engine == 'http':
+            self.http_pages += 1
+        else:
+            self.browser_pages += 1
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'http_pages': self.http_pages,
+            'browser_pages': self.browser_pages,
+            'escalations': dict(self.reasons),
+            'browser_templates': len(self._browser_templates),
+        }
+
+
+class HttpFetcher:
+    """复用连接的 HTTP 抓取器：keep-alive 连接池和 DNS 缓存在整个任务内共享
+
+    fetch() 先由 router 检查响应内容，需要浏览器渲染的页面不解析，直接返回 None；
+    连接错误和超时同样返回 None，由浏览器重新抓取，不直接记为失败页面。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        router: Optional[FetchRouter] = None,
+        limit: int = 100,
+        limit_per_host: int = 32,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 30,
+        timeout: float = 30,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.extractor = EnhancedNavigationExtractor(base_url)
+        self.router = router or FetchRouter()
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._session = None
+
+    async def start(self):
+        import aiohttp
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': self.user_agent, 'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5'},
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str) -> Optional[HttpCrawlResult]:
+        """获取并解析页面；不是 HTML 或需要渲染的页面返回 None，交给浏览器处理"""
+        if self._session is None:
+            await self.start()
+        try:
+            async with self._session.get(url) as response:
+                if response.status < 400 and 'html' not in (response.content_type or ''):
+                    self.router.escalate(url, 'content_type')
+                    return None
+                headers = dict(response.headers)
+                if response.status >= 400:
+                    return HttpCrawlResult(url, response.status, headers)
+                content = _decode(await response.read(), response.charset)
+                final_url = str(response.url)
+        except Exception as e:
+            logger.debug(f'HTTP 获取失败，交给浏览器: {url} - {str(e) or type(e).__name__}')
+            self.router.escalate(url, 'transport')
+            return None
+        return self._parse(url, content, response.status, headers, final_url)
+
+    def from_response(self, url: str, status: int, headers: Dict, content_type: Optional[str],
+                      charset: Optional[str], body: bytes, final_url: Optional[str] = None) -> Optional[HttpCrawlResult]:
+        """解析已经读取的响应（例如增量抓取的条件请求），判断与 fetch() 一致"""
+        if status < 400 and 'html' not in (content_type or ''):
+            self.router.escalate(url, 'content_type')
+            return None
+        if status >= 400:
+            return HttpCrawlResult(url, status, headers)
+        return self._parse(url, _decode(body, charset), status, headers, final_url or url)
+
+    def _parse(self, url: str, content: str, status: int, headers: Dict, final_url: str) -> Optional[HttpCrawlResult]:
+        if self.router.check(url, content):
+            return None
+        
+        # 链接按重定向后的地址解析，结果仍记录请求的URL，与浏览器抓取一致
+        result = HttpCrawlResult.from_html(final_url, content, self.extractor, status, headers)
+        result.url = url
+        return result
@@ -0,0 +1,64 @@
+"""
+抓取前沿
+记录待抓取的URL及其深度，按 BFS 或 DFS 顺序出队
+"""
+
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from .urls import FingerprintSet, UrlCanonicalizer, url_fingerprint
+
+
+class CrawlFrontier:
+    """内存抓取前沿
+
+    - bfs：先进先出，逐层抓取
+    - dfs：后进先出，沿路径深入
+    URL入队前先规范化，按规范化URL的 64 位指纹去重，每个页面只会入队一次；
+    入队总数达到 max_pages 后不再接受新URL。
+    """
+
+    def __init__(
+        self,
+        strategy: str = 'bfs',
+        max_depth: int = 3,
+        max_pages: int = 50,
+        seen: Optional[FingerprintSet] = None,
+        canonicalizer: Optional[UrlCanonicalizer] = None,
+    ):
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.seen = seen if seen is not None else FingerprintSet()
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        self.scheduled = 0
+        self._queue: Deque[Tuple[str, int]] = deque()
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """规范化后的URL入队，已见过、超过深度或超过页面上限时返回 False"""
+        if depth > self.max_depth or self.scheduled >= self.max_pages:
+            return False
+        url = self.canonicalizer.canonicalize(url)
+        if not self.seen.add(url_fingerprint(url)):
+            return False
+        self.scheduled += 1
+        self._push(url, depth)
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """取出下一个待抓取的 (url, depth)，前沿为空时返回 None"""
+        if not self._queue:
+            return None
+        if self.strategy == 'dfs':
+            return self._queue.pop()
+        return self._queue.popleft()
+
+    def _push(self, url: str, depth: int):
+        self._queue.append((url, depth))
+
+    @property
+    def full(self) -> bool:
+        return self.scheduled >= self.max_pages
+
+    def __len__(self) -> int:
+        return len(self._queue)
@@ -0,0 +1,185 @@
+"""
+链接过滤器
+由任务配置一次编译出的链接过滤规则：主机集合、合并后的排除正则和扩展名后缀表，
+每个链接只解析一次，批量过滤一个页面的全部链接，并按规则统计通过、拒绝数量和耗时
+"""
+
+import fnmatch
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 默认跳过的静态资源和二进制文件扩展名
+DEFAULT_SKIP_EXTENSIONS = (
+    'pdf', 'jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico', 'bmp',
+    'css', 'js', 'mjs', 'map', 'woff', 'woff2', 'ttf', 'eot',
+    'mp3', 'mp4', 'webm', 'avi', 'mov', 'zip', 'gz', 'tar', 'rar', '7z', 'exe', 'dmg',
+)
+
+# 只含一个前导 * 的扩展名模式，例如 *.pdf，编入后缀表而不是正则
+_SUFFIX_GLOB = re.compile(r'^\*\.([\w-]+)$')
+
+RULES = ('scheme', 'same_host', 'blocked_domain', 'extension', 'pattern')
+
+# 解析后的链接：(原始URL, 主机, 路径)
+ParsedLink = Tuple[str, str, str]
+
+
+def _split(url: str) -> Optional[ParsedLink]:
+    """只用字符串操作拆出 http(s) 链接的主机和路径，其他协议返回 None"""
+    scheme, sep, rest = url.partition('://')
+    if not sep or scheme.lower() not in ('http', 'https'):
+        return None
+    end = len(rest)
+    for delimiter in '/?#':
+        index = rest.find(delimiter)
+        if index != -1 and index < end:
+            end = index
+    host = rest[:end].lower()
+    path = rest[end:]
+    for delimiter in '?#':
+        index = path.find(delimiter)
+        if index != -1:
+            path = path[:index]
+    return url, host, path
+
+
+class RuleStats:
+    """单条规则的统计"""
+
+    __slots__ = ('checked', 'rejected', 'seconds')
+
+    def __init__(self):
+        self.checked = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'checked': self.checked,
+            'accepted': self.checked - self.rejected,
+            'rejected': self.rejected,
+            'time_ms': round(self.seconds * 1000, 3),
+        }
+
+
+class LinkFilter:
+    """编译后的链接过滤器
+
+    规则按从便宜到昂贵的顺序执行，链接被任一规则拒绝后不再检查后续规则：
+    - scheme：只保留 http / https
+    - same_host：只保留与起始URL同一主机的链接（internal_only=False 时跳过）
+    - blocked_domain：主机或其任一上级域名在 exclude_domains 中
+    - extension：路径扩展名在后缀表中（默认静态资源 + *.ext 形式的排除模式）
+    - pattern：其余排除模式合并成一个正则，对完整URL匹配
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        exclude_domains: Iterable[str] = (),
+        exclude_patterns: Iterable[str] = (),
+        skip_extensions: Iterable[str] = DEFAULT_SKIP_EXTENSIONS,
+        internal_only: bool = True,
+    ):
+        parsed = _split(base_url)
+        self.host = parsed[1] if parsed else ''
+        self.internal_only = internal_only
+        self.blocked_domains = frozenset(
+            domain.strip().lower().lstrip('.') for domain in exclude_domains if domain.strip()
+        )
+
+        extensions = {ext.lower().lstrip('.') for ext in skip_extensions}
+        globs = []
+        for pattern in exclude_patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue
+            match = _SUFFIX_GLOB.match(pattern)
+            if match:
+                extensions.add(match.group(1).lower())
+            else:
+                globs.append(fnmatch.translate(pattern))
+        self.skip_extensions = frozenset(extensions)
+        self.pattern = re.compile('|'.join(globs), re.IGNORECASE) if globs else None
+
+        self.rule_stats: Dict[str, RuleStats] = {rule: RuleStats() for rule in RULES}
+
+    @classmethod
+    def from_config(cls, config: Dict, base_url: str) -> 'LinkFilter':
+        """根据任务配置的 filters 创建"""
+        filters = config.get('filters') or {}
+        return cls(
+            base_url,
+            exclude_domains=filters.get('exclude_domains') or (),
+            exclude_patterns=filters.get('exclude_patterns') or (),
+            skip_extensions=filters.get('skip_extensions', DEFAULT_SKIP_EXTENSIONS),
+        )
+
+    def filter(self, urls: Iterable[str]) -> List[str]:
+        """批量过滤，返回通过全部规则的URL（保持原有顺序）"""
+        started = time.perf_counter()
+        candidates = [url for url in urls if url]
+        links = [link for link in map(_split, candidates) if link is not None]
+        self._record('scheme', len(candidates), len(links), started)
+
+        if self.internal_only:
+            started = time.perf_counter()
+            host = self.host
+            checked = len(links)
+            links = [link for link in links if link[1] == host]
+            self._record('same_host', checked, len(links), started)
+
+        if self.blocked_domains:
+            started = time.perf_counter()
+            checked = len(links)
+            links = [link for link in links if not self._blocked(link[1])]
+            self._record('blocked_domain', checked, len(links), started)
+
+        if self.skip_extensions:
+            started = time.perf_counter()
+            checked = len(links)
+            extensions = self.skip_extensions
+            links = [link for link in links if _extension(link[2]) not in extensions]
+            self._record('extension', checked, len(links), started)
+
+        if self.pattern is not None:
+            started = time.perf_counter()
+            checked = len(links)
+            match = self.pattern.match
+            links = [link for link in links if match(link[0]) is None]
+            self._record('pattern', checked, len(links), started)
+
+        return [link[0] for link in links]
+
+    def accepts(self, url: str) -> bool:
+        """单个URL是否通过过滤"""
+        return bool(self.filter((url,)))
+
+    def stats(self) -> Dict[str, Dict]:
+        """每条规则的检查数、通过数、拒绝数和累计耗时"""
+        return {rule: stat.to_dict() for rule, stat in self.rule_stats.items() if stat.checked}
+
+    def _blocked(self, host: str) -> bool:
+        host = host.rsplit('@', 1)[-1].split(':', 1)[0]
+        blocked = self.blocked_domains
+        while True:
+            if host in blocked:
+                return True
+            index = host.find('.')
+            if index == -1:
+                return False
+            host = host[index + 1:]
+
+    def _record(self, rule: str, checked: int, passed: int, started: float):
+        stat = self.rule_stats[rule]
+        stat.checked += checked
+        stat.rejected += checked - passed
+        stat.seconds += time.perf_counter() - started
+
+
+def _extension(path: str) -> str:
+    """路径最后一段的扩展名（小写），没有扩展名时返回空字符串"""
+    name = path.rpartition('/')[2]
+    dot = name.rfind('.')
+    return name[dot + 1:].lower() if dot > 0 else ''
@@ -0,0 +1,277 @@
+"""
+指标
+进程内的计数器、直方图和回调仪表，按 Prometheus 文本格式输出；
+记录操作只有一次字典查找和加法，不加锁，读取时复制当前值。
+抓取任务和命令行爬虫在每个页面的各阶段调用 CrawlMetrics 记录耗时、响应状态码和失败原因，
+浏览器池、任务队列、Socket.IO 推送积压和进程内存在指标被抓取时才读取
+"""
+
+import math
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# 页面各阶段耗时的默认桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+# 页面处理阶段：fetch（HTTP 获取与解析）、render（浏览器渲染）、revalidate（增量抓取的条件请求）、
+# extract（生成页面记录和保存正文）、postprocess（结果登记、站点结构和链接过滤）
+PHASES = ('fetch', 'render', 'revalidate', 'extract', 'postprocess')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增的计数器"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def values(self) -> Dict[LabelValues, float]:
+        return dict(self._values)
+
+    def samples(self) -> List[str]:
+        return [
+            f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+            for labels, value in sorted(list(self._values.items()))
+        ]
+
+
+class Histogram(_Metric):
+    """固定桶的直方图，每个标签组合保存各桶计数、总和与次数"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # 各桶计数 + [总和, 次数]
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[-1]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(list(self._series.items())):
+            series = list(series)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                bucket = _labels(self.labelnames, labels, 'le="%s"' % _number(bound))
+                lines.append(f'{self.name}_bucket{bucket} {_number(cumulative)}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {_number(series[-1])}')
+        return lines
+
+
+class Gauge(_Metric):
+    """抓取时才调用回调取值的仪表，回调返回数值，或 {标签值元组: 数值}，返回 None 时不输出"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str,
+                 callback: Callable[[], Union[None, float, Dict[LabelValues, float]]],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        value = self.callback()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            return [f'{self.name} {_number(value)}']
+        return [
+            f'{self.name}{_labels(self.labelnames, labels)} {_number(number)}'
+            for labels, number in sorted(value.items()) if number is not None
+        ]
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f'指标已注册: {metric.name}')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, callback, labelnames))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self, names: Optional[Iterable[str]] = None) -> str:
+        """Prometheus 文本格式（0.0.4）；回调出错的仪表跳过"""
+        lines = []
+        for name in names or self._metrics:
+            metric = self._metrics[name]
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def process_rss_bytes() -> Optional[int]:
+    """当前进程的常驻内存"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _mb_to_bytes(value: Optional[float]) -> Optional[float]:
+    return None if value is None else value * 1024 * 1024
+
+
+def failure_reason(result=None, error: Optional[BaseException] = None) -> str:
+    """失败原因分类：http_4xx/http_5xx、timeout、exception 或 error"""
+    if error is not None:
+        return 'timeout' if 'timeout' in type(error).__name__.lower() else 'exception'
+    status = getattr(result, 'status_code', None)
+    if status and status >= 400:
+        return f'http_{status // 100}xx'
+    if 'timeout' in (getattr(result, 'error_message', '') or '').lower():
+        return 'timeout'
+    return 'error'
+
+
+class CrawlMetrics:
+    """抓取指标：每次记录只是一次字典查找和加法"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.phase_seconds = self.registry.histogram(
+            'crawler_page_phase_seconds', '每个页面各处理阶段的耗时', ('phase',)
+        )
+        self.responses = self.registry.counter(
+            'crawler_responses_total', '按状态码统计的页面响应数', ('status',)
+        )
+        self.failures = self.registry.counter(
+            'crawler_failures_total', '按原因统计的抓取失败页面数', ('reason',)
+        )
+        self.pages = self.registry.counter(
+            'crawler_pages_total', '按来源统计的已处理页面数（http、browser、unchanged、duplicate）', ('source',)
+        )
+
+    def observe(self, phase: str, started: float) -> float:
+        """记录从 started（time.perf_counter()）到现在的阶段耗时，返回当前时间供下一阶段使用"""
+        now = time.perf_counter()
+        self.phase_seconds.observe(now - started, phase)
+        return now
+
+    def response(self, status_code: Optional[int]):
+        self.responses.inc(str(status_code) if status_code else 'none')
+
+    def failure(self, result=None, error: Optional[BaseException] = None):
+        self.failures.inc(failure_reason(result, error))
+
+    def page(self, source: str):
+        self.pages.inc(source)
+
+    def summary(self) -> Dict:
+        """按来源统计的页面数和按原因统计的失败数，供命令行输出"""
+        return {
+            'pages': {labels[0]: int(value) for labels, value in self.pages.values().items()},
+            'failures': {labels[0]: int(value) for labels, value in self.failures.values().items()},
+        }
+
+    def register_runtime(self, browser_pool=None, scheduler=None, emitter=None):
+        """注册抓取时读取的运行状态仪表"""
+        registry = self.registry
+        if browser_pool is not None:
+            registry.gauge('crawler_browser_pool_browsers', '浏览器池中的浏览器数', lambda: browser_pool.stats()['browsers'])
+            registry.gauge(
+                'crawler_browser_pool_active_leases', '正在被任务租用的浏览器数',
+                lambda: browser_pool.stats()['active_leases']
+            )
+            registry.gauge(
+                'crawler_browser_pool_utilization', '正在租用的浏览器数 / 最大浏览器数',
+                lambda: browser_pool.stats()['active_leases'] / max(browser_pool.max_browsers, 1)
+            )
+            registry.gauge(
+                'crawler_browser_memory_bytes', '浏览器子进程的常驻内存（需要 psutil）',
+                lambda: _mb_to_bytes(browser_pool.memory_usage_mb())
+            )
+        if scheduler is not None:
+            registry.gauge('crawler_task_queue_depth', '等待执行的任务数', lambda: scheduler.queue_depth)
+            registry.gauge('crawler_tasks_running', '正在执行的任务数', lambda: scheduler.running)
+        if emitter is not None:
+            registry.gauge('crawler_socket_emit_backlog', '等待推送的 Socket.IO 事件数', lambda: emitter.backlog)
+        registry.gauge('crawler_process_resident_memory_bytes', '服务进程的常驻内存', process_rss_bytes)
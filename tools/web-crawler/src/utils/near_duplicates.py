@@ -0,0 +1,126 @@
+"""
+近似重复检测
+页面文本的 64 位 SimHash 指纹，按分段桶索引查找汉明距离在阈值以内的已抓取页面，
+用于跳过分页列表、标签页、语言镜像等模板化页面的后处理
+"""
+
+import hashlib
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+
+_TAG = re.compile(r'<(script|style)\b.*?</\1\s*>|<[^>]*>', re.S | re.I)
+_TOKEN = re.compile(r'\w+')
+
+# 第 i 项为第 i 位是 0 的所有字节值，bytes.translate 删除这些字节后的长度即该位为 1 的特征数
+_ZERO_BYTES = [bytes(value for value in range(256) if not value >> bit & 1) for bit in range(8)]
+
+
+@lru_cache(maxsize=1 << 16)
+def _token_hash(token: str) -> int:
+    """词的 64 位哈希，站点内常用词在页面之间重复出现，结果缓存"""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _rotate(value: int, bits: int) -> int:
+    return ((value << bits) | (value >> (FINGERPRINT_BITS - bits))) & _MASK if bits else value
+
+
+def page_text(html: str) -> str:
+    """去掉标签、脚本和样式后的文本"""
+    return _TAG.sub(' ', html) if '<' in html else html
+
+
+def simhash(text: str, shingle: int = 3) -> Optional[int]:
+    """文本的 64 位 SimHash，特征为连续 shingle 个词，重复出现的特征按次数加权
+
+    文本中没有词时返回 None，这类页面（空页面、纯图片页面）没有可比较的内容，不做重复检测。
+
+    每个不同的词只哈希一次，逐位计数由 bytes.translate 完成，
+    Python 层的循环只有每个特征一次异或。
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return None
+
+    # 特征哈希为 shingle 个词哈希按位置循环移位后的异或，每个不同的词每种移位只计算一次
+    shingle = min(shingle, len(tokens))
+    count = len(tokens) - shingle + 1
+    unique = set(tokens)
+    features = None
+    for offset in range(shingle):
+        rotation = shingle - 1 - offset
+        table = {token: _rotate(_token_hash(token), rotation) for token in unique}
+        column = [table[token] for token in tokens[offset:offset + count]]
+        features = column if features is None else [a ^ b for a, b in zip(features, column)]
+
+    # 特征哈希排成字节串，按字节位置和位逐位统计为 1 的特征数，超过半数时指纹的该位为 1
+    digests = array('Q', features).tobytes()
+    fingerprint = 0
+    for position in range(8):
+        column = digests[position::8]
+        for bit, zeros in enumerate(_ZERO_BYTES):
+            if len(column.translate(None, zeros)) * 2 > count:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """SimHash 分段桶索引
+
+    指纹分成 max_distance + 1 段，汉明距离不超过 max_distance 的两个指纹至少有一段完全相同，
+    查询只需比较与新指纹有相同段的候选。drop_links 为真时近似重复页面中的链接不再入队。
+    """
+
+    def __init__(self, max_distance: int = 3, drop_links: bool = False):
+        if not 0 <= max_distance < FINGERPRINT_BITS // 2:
+            raise ValueError(f'max_distance 超出范围: {max_distance}')
+        self.max_distance = max_distance
+        self.drop_links = drop_links
+        bands = max_distance + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands: List[Tuple[int, int]] = [
+            (index * width, (1 << (width if index < bands - 1 else FINGERPRINT_BITS - index * width)) - 1)
+            for index in range(bands)
+        ]
+        self._buckets: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(bands)]
+        self.pages = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_config(cls, config) -> Optional['NearDuplicateIndex']:
+        """根据任务配置的 near_duplicates 创建，未开启时返回 None"""
+        if not config:
+            return None
+        options = config if isinstance(config, dict) else {}
+        return cls(max_distance=options.get('max_distance', 3), drop_links=bool(options.get('drop_links')))
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """返回与指纹近似重复的已登记页面URL"""
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            for candidate, url in buckets.get(fingerprint >> shift & mask, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return url
+        return None
+
+    def add(self, url: str, fingerprint: int):
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            buckets.setdefault(fingerprint >> shift & mask, []).append((fingerprint, url))
+
+    def check(self, url: str, fingerprint: int) -> Optional[str]:
+        """查找近似重复的页面；不是重复页面时登记该指纹并返回 None"""
+        self.pages += 1
+        original = self.find(fingerprint)
+        if original is not None:
+            self.duplicates += 1
+            return original
+        self.add(url, fingerprint)
+        return None
@@ -0,0 +1,150 @@
+"""
+单页面抓取流程
+Web 服务的抓取任务和命令行爬虫共用：按主机限速 → HTTP 获取或浏览器渲染 → 响应统计 →
+近似重复检测 → 生成页面记录 → 登记结果 → 过滤出待入队的内部链接
+"""
+
+import time
+from typing import Callable, List, Optional
+
+from ..navigation import DEFAULT_NAV_SELECTORS
+from .fetch_engine import FetchRouter, HttpFetcher
+from .link_filter import LinkFilter
+from .metrics import CrawlMetrics
+from .near_duplicates import NearDuplicateIndex, page_text, simhash
+from .page_record import PageRecord
+from .rate_limiter import HostRateLimiter
+
+
+def navigation_extraction_strategy():
+    """浏览器渲染页面时提取导航 HTML 和导航链接的 CSS 提取策略"""
+    from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
+
+    return JsonCssExtractionStrategy({
+        "navigation": {
+            "selector": ", ".join(DEFAULT_NAV_SELECTORS),
+            "type": "html"
+        },
+        "navigation_links": {
+            "selector": "nav a, .nav a, .navigation a, .navbar a, .menu a",
+            "type": "text",
+            "attribute": "href"
+        }
+    })
+
+
+class PageCrawler:
+    """抓取单个页面并返回过滤后的内部链接，作为 CrawlPipeline 的 crawl_page
+
+    调用方通过回调接入各自的结果处理：
+    - browser()：返回异步上下文管理器，进入时得到可调用 arun 的浏览器（浏览器池租约或自行启动的浏览器）；
+      为 None 时需要渲染的页面记为失败
+    - on_page(url, record, links)：登记成功抓取的页面
+    - on_duplicate(url, record, original)：登记近似重复的页面，跳过正文存储和导航解析
+    - on_failure(url, depth, message, error)：登记失败页面，error 为异常（抓取失败的响应时为 None）
+    """
+
+    def __init__(
+        self,
+        rate_limiter: HostRateLimiter,
+        fetch_router: FetchRouter,
+        link_filter: LinkFilter,
+        on_page: Callable,
+        on_failure: Callable,
+        browser: Optional[Callable] = None,
+        run_config=None,
+        fetcher: Optional[HttpFetcher] = None,
+        store=None,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        on_duplicate: Optional[Callable] = None,
+        metrics: Optional[CrawlMetrics] = None,
+    ):
+        self.rate_limiter = rate_limiter
+        self.fetch_router = fetch_router
+        self.link_filter = link_filter
+        self.on_page = on_page
+        self.on_failure = on_failure
+        self.browser = browser
+        self.run_config = run_config
+        self.fetcher = fetcher
+        self.store = store
+        self.near_duplicates = near_duplicates
+        self.on_duplicate = on_duplicate
+        self.metrics = metrics or CrawlMetrics()
+
+    async def crawl(self, url: str, depth: int, result=None, use_http: bool = True) -> List[str]:
+        """抓取页面，登记结果并返回过滤后的内部链接
+
+        result 为调用方已取得的 HTTP 抓取结果（例如增量抓取的条件请求）时直接使用；
+        use_http=False 时跳过 HTTP 获取，直接交给浏览器渲染。
+        """
+        metrics = self.metrics
+        try:
+            source = 'http'
+            if result is None:
+                result = await self._fetch(url, use_http)
+                if result is None:
+                    result = await self._render(url)
+                    source = 'browser'
+            self.fetch_router.record(source)
+            metrics.response(result.status_code)
+            self.rate_limiter.handle_response(url, result.status_code, result.response_headers)
+
+            if not result.success:
+                metrics.failure(result)
+                self.on_failure(url, depth, result.error_message, None)
+                return []
+
+            if self.near_duplicates is not None:
+                fingerprint = simhash(page_text(result.cleaned_html or ''))
+                original = self.near_duplicates.check(url, fingerprint) if fingerprint is not None else None
+                if original is not None:
+                    metrics.page('duplicate')
+                    if self.on_duplicate is not None:
+                        record = PageRecord(
+                            url,
+                            title=(result.metadata or {}).get('title') or '',
+                            success=result.success,
+                            duplicate_of=original
+                        )
+                        self.on_duplicate(url, record, original)
+                    return [] if self.near_duplicates.drop_links else self.links(result)
+
+            metrics.page(source)
+            started = time.perf_counter()
+            record = PageRecord.from_crawl_result(result, self.store)
+            started = metrics.observe('extract', started)
+            links = self.links(result)
+            self.on_page(url, record, links)
+            metrics.observe('postprocess', started)
+            return links
+
+        except Exception as e:
+            metrics.failure(error=e)
+            self.on_failure(url, depth, str(e), e)
+            return []
+
+    def links(self, result) -> List[str]:
+        """批量过滤页面中的内部链接"""
+        return self.link_filter.filter(link.get('href') for link in result.links.get('internal', []))
+
+    async def _fetch(self, url: str, use_http: bool):
+        """先按主机限速排队，静态页面直接用 HTTP 获取；需要渲染时返回 None，并为浏览器请求重新排队"""
+        await self.rate_limiter.acquire(url)
+        if not (use_http and self.fetcher is not None and self.fetch_router.use_http(url)):
+            return None
+        started = time.perf_counter()
+        result = await self.fetcher.fetch(url)
+        self.metrics.observe('fetch', started)
+        if result is None:
+            await self.rate_limiter.acquire(url)
+        return result
+
+    async def _render(self, url: str):
+        if self.browser is None:
+            raise RuntimeError('页面需要浏览器渲染，但没有可用的浏览器（未安装 crawl4ai）')
+        async with self.browser() as crawler:
+            started = time.perf_counter()
+            result = await crawler.arun(url=url, config=self.run_config)
+            self.metrics.observe('render', started)
+        return result
@@ -0,0 +1,181 @@
+"""
+页面记录
+抓取结果的紧凑表示：固定字段存放在 __slots__ 中，URL 和链接文本驻留共享，时间戳为整数，
+链接保存为元组，页面正文可保存在内容寻址存储中只保留引用；
+只在 API 边界通过 dict(record) / to_dict() 转换为 JSON 字典
+"""
+
+import json
+import re
+import sys
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+CONTENT_LIMIT = 5000  # 保存的正文长度
+LINK_LIMIT = 50       # 保存的链接数量
+
+_intern = sys.intern
+_WORD = re.compile(r'\S+')
+
+
+def count_words(text: Optional[str]) -> int:
+    """按空白分隔的单词数，与 len(text.split()) 相同
+
+    逐个匹配单词计数，不生成单词列表或子串。
+    """
+    if not text:
+        return 0
+    return sum(1 for _ in _WORD.finditer(text))
+
+
+def _compact_links(links: Iterable[Dict]):
+    return tuple(
+        (_intern(link.get('href') or ''), _intern(link.get('text') or ''), _intern(link.get('title') or ''))
+        for link in links
+    )
+
+
+class PageRecord(Mapping):
+    """单个页面的抓取结果
+
+    实现只读映射接口，现有的 record['url']、record.get('title') 和 dict(record) 用法不变；
+    可选字段为 None 时不出现在映射中。
+    """
+
+    __slots__ = (
+        'url', 'title', 'description', 'content', 'word_count', 'crawled_at',
+        'success', 'unchanged', 'duplicate_of', 'navigation_content', 'navigation_links', 'links', 'bodies',
+    )
+
+    _KEYS = (
+        'url', 'title', 'description', 'content', 'word_count', 'timestamp', 'success',
+        'unchanged', 'duplicate_of', 'navigation_content', 'navigation_links', 'links', 'bodies',
+    )
+    _OPTIONAL = frozenset((
+        'content', 'unchanged', 'duplicate_of', 'navigation_content', 'navigation_links', 'links', 'bodies',
+    ))
+
+    def __init__(
+        self,
+        url: str,
+        title: str = '',
+        description: str = '',
+        content: Optional[str] = '',
+        word_count: int = 0,
+        crawled_at: Optional[int] = None,
+        success: bool = True,
+        unchanged: bool = False,
+        duplicate_of: Optional[str] = None,
+        navigation_content: Optional[str] = None,
+        navigation_links: Optional[list] = None,
+        links: Optional[tuple] = None,
+        bodies: Optional[tuple] = None,
+    ):
+        self.url = _intern(url)
+        self.title = title
+        self.description = description
+        self.content = content
+        self.word_count = word_count
+        self.crawled_at = int(time.time()) if crawled_at is None else crawled_at
+        self.success = success
+        self.unchanged = unchanged
+        self.duplicate_of = duplicate_of  # 近似重复时为内容相近的已抓取页面URL
+        self.navigation_content = navigation_content
+        self.navigation_links = navigation_links
+        self.links = links  # (href, text, title) 元组
+        self.bodies = bodies  # 内容存储中的 (名称, key, 字节数) 元组
+
+    @classmethod
+    def from_crawl_result(cls, result, store=None) -> 'PageRecord':
+        """由 crawl4ai 的抓取结果创建
+
+        指定 store（BlobStore）时完整的 cleaned_html 保存到内容存储，记录中只保留引用，
+        否则记录中保存截断后的正文。
+        """
+        metadata = result.metadata or {}
+        html = result.cleaned_html or ''
+        record = cls(
+            result.url,
+            title=metadata.get('title') or '',
+            description=metadata.get('description') or '',
+            content=None if store is not None else html[:CONTENT_LIMIT],
+            word_count=count_words(html),
+            success=result.success,
+        )
+        if store is not None and html:
+            record.add_body('html', store.put(html))
+        if result.extracted_content:
+            try:
+                extracted = json.loads(result.extracted_content)
+            except json.JSONDecodeError:
+                extracted = None
+            if isinstance(extracted, dict):
+                record.navigation_content = extracted.get('navigation', '')
+                record.navigation_links = extracted.get('navigation_links', [])
+        links = getattr(result, 'links', None)
+        if links:
+            record.links = _compact_links(links.get('internal', [])[:LINK_LIMIT])
+        return record
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PageRecord':
+        """由 to_dict() 的输出创建，用于检查点、增量缓存等保存的 JSON 记录"""
+        timestamp = data.get('timestamp')
+        links = data.get('links')
+        bodies = data.get('bodies')
+        return cls(
+            data['url'],
+            title=data.get('title', ''),
+            description=data.get('description', ''),
+            content=data.get('content'),
+            word_count=data.get('word_count', 0),
+            crawled_at=int(datetime.fromisoformat(timestamp).timestamp()) if timestamp else None,
+            success=data.get('success', True),
+            unchanged=data.get('unchanged', False),
+            duplicate_of=data.get('duplicate_of'),
+            navigation_content=data.get('navigation_content'),
+            navigation_links=data.get('navigation_links'),
+            links=_compact_links(links) if links is not None else None,
+            bodies=tuple(
+                (_intern(name), _intern(ref['key']), ref['size']) for name, ref in bodies.items()
+            ) if bodies else None,
+        )
+
+    def add_body(self, name: str, ref: Dict):
+        """记录内容存储中的一项内容"""
+        self.bodies = (self.bodies or ()) + ((_intern(name), _intern(ref['key']), ref['size']),)
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.crawled_at).isoformat()
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+    def __getitem__(self, key: str):
+        if key == 'timestamp':
+            return self.timestamp
+        if key not in self._KEYS or (key in self._OPTIONAL and not self._present(key)):
+            raise KeyError(key)
+        if key == 'links':
+            return [{'href': href, 'text': text, 'title': title} for href, text, title in self.links]
+        if key == 'bodies':
+            return {name: {'key': body_key, 'size': size} for name, body_key, size in self.bodies}
+        return getattr(self, key)
+
+    def __iter__(self):
+        for key in self._KEYS:
+            if key not in self._OPTIONAL or self._present(key):
+                yield key
+
+    def _present(self, key: str) -> bool:
+        value = getattr(self, key)
+        return bool(value) if key == 'unchanged' else value is not None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'PageRecord({self.url!r})'
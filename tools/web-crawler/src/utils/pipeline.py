@@ -0,0 +1,83 @@
+"""
+流式抓取管线
+多个工作协程从抓取前沿取URL抓取，页面中发现的新链接直接进入前沿，
+每个页面只抓取、渲染一次
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from .frontier import CrawlFrontier
+
+logger = logging.getLogger(__name__)
+
+# 抓取单个页面的回调：处理结果并返回页面中发现的链接
+PageHandler = Callable[[str, int], Awaitable[Iterable[str]]]
+
+
+class CrawlPipeline:
+    """由抓取前沿驱动的并发抓取管线"""
+
+    def __init__(
+        self,
+        frontier: CrawlFrontier,
+        crawl_page: PageHandler,
+        concurrency: int = 4,
+        on_page_done: Optional[Callable[[str], None]] = None,
+    ):
+        self.frontier = frontier
+        self.crawl_page = crawl_page
+        self.concurrency = max(1, concurrency)
+        self.on_page_done = on_page_done
+
+        self.in_flight = 0
+        self.pages_done = 0
+        self.active: Dict[str, int] = {}  # 正在抓取的 URL -> 深度，链接入队后移除
+        self._changed: Optional[asyncio.Condition] = None
+
+    async def run(self):
+        """运行直到前沿为空且没有正在抓取的页面"""
+        self._changed = asyncio.Condition()
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def _worker(self):
+        while True:
+            async with self._changed:
+                while True:
+                    item = self.frontier.pop()
+                    if item is not None:
+                        self.in_flight += 1
+                        self.active[item[0]] = item[1]
+                        break
+                    if self.in_flight == 0:
+                        # 前沿已空且没有页面可能再产生新链接
+                        self._changed.notify_all()
+                        return
+                    await self._changed.wait()
+
+            url, depth = item
+            links = ()
+            try:
+                links = await self.crawl_page(url, depth) or ()
+            except Exception as e:
+                logger.error(f"页面处理异常: {url} - {str(e)}", exc_info=True)
+
+            async with self._changed:
+                if depth < self.frontier.max_depth:
+                    for link in links:
+                        if self.frontier.full:
+                            break
+                        self.frontier.add(link, depth + 1)
+                self.active.pop(url, None)
+                self.in_flight -= 1
+                self.pages_done += 1
+                self._changed.notify_all()
+
+            if self.on_page_done:
+                self.on_page_done(url)
@@ -0,0 +1,275 @@
+"""
+性能剖析
+按需对运行中的爬虫事件循环做限时剖析：采样 CPU 调用栈、cProfile 或 tracemalloc 内存分配，
+结果为折叠调用栈（flamegraph.pl、speedscope 可直接读取）或 pstats 文件；
+没有剖析在进行时不安装任何钩子，也没有采样线程
+"""
+
+import cProfile
+import marshal
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set
+
+MODES = ('cpu', 'alloc')
+OUTPUTS = {'cpu': ('collapsed', 'pstats'), 'alloc': ('collapsed',)}
+DEFAULT_INTERVAL = 0.005  # 采样间隔（秒）
+MAX_STACK_DEPTH = 128
+ALLOC_FRAMES = 32  # tracemalloc 每次分配保留的调用栈深度
+LOOP_CALL_TIMEOUT = 5.0
+
+# 采样和 tracemalloc 都是进程级的，同一时间只允许一个剖析
+_active = threading.Lock()
+
+
+def _short_path(filename: str) -> str:
+    """去掉 sys.path 中最长的匹配前缀，让调用栈更短"""
+    best = ''
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+class StackSampler:
+    """定时读取线程当前调用栈，按折叠调用栈计数
+
+    thread_ids 为空时采样除采样线程外的所有线程，每个调用栈以线程名开头。
+    """
+
+    def __init__(self, thread_ids: Optional[Set[int]] = None, max_depth: int = MAX_STACK_DEPTH):
+        self.thread_ids = thread_ids
+        self.max_depth = max_depth
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._names: Dict[object, str] = {}
+        self._thread_names: Dict[int, str] = {}
+
+    def _name(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+        return name
+
+    def _thread_name(self, ident: int) -> str:
+        if ident not in self._thread_names:
+            self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        return self._thread_names.get(ident, str(ident))
+
+    def sample(self):
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me or (self.thread_ids is not None and ident not in self.thread_ids):
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._name(frame.f_code))
+                frame = frame.f_back
+            if self.thread_ids is None:
+                stack.append(self._thread_name(ident))
+            stack.reverse()
+            self.counts[';'.join(stack)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.counts.items()))
+
+
+def allocation_stacks(snapshot: tracemalloc.Snapshot, baseline: Optional[tracemalloc.Snapshot] = None) -> str:
+    """按调用栈汇总仍未释放的分配字节数，输出折叠调用栈
+
+    有 baseline 时只统计相对 baseline 增加的部分。
+    """
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    if baseline is None:
+        stats = [(stat.traceback, stat.size) for stat in snapshot.statistics('traceback')]
+    else:
+        stats = [
+            (stat.traceback, stat.size_diff) for stat in snapshot.compare_to(baseline, 'traceback')
+            if stat.size_diff > 0
+        ]
+    lines = []
+    for traceback, size in stats:
+        # 调用栈从最外层到分配位置排列
+        stack = ';'.join(f'{_short_path(frame.filename)}:{frame.lineno}' for frame in traceback)
+        lines.append(f'{stack} {size}\n')
+    return ''.join(sorted(lines))
+
+
+class ProfileCapture:
+    """一次限时剖析，在后台线程中运行
+
+    - cpu/collapsed：每 interval 秒采样一次事件循环线程（threads='all' 时为所有线程）的调用栈，
+      计数为采样次数，等待 I/O 的时间显示为事件循环的 select 调用
+    - cpu/pstats：在事件循环线程上启用 cProfile，确定性统计，剖析期间开销较大
+    - alloc/collapsed：启用 tracemalloc，统计剖析期间分配且结束时仍未释放的字节数（整个进程）
+
+    剖析在 seconds 秒后、调用 stop() 或 stop_when() 返回真时结束，结果保存在 data 中。
+    """
+
+    def __init__(
+        self,
+        mode: str = 'cpu',
+        seconds: float = 30.0,
+        output: Optional[str] = None,
+        loop=None,
+        thread_id: Optional[int] = None,
+        threads: str = 'loop',
+        interval: float = DEFAULT_INTERVAL,
+        stop_when: Optional[Callable[[], bool]] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f'不支持的剖析模式: {mode}，可选 {", ".join(MODES)}')
+        output = output or OUTPUTS[mode][0]
+        if output not in OUTPUTS[mode]:
+            raise ValueError(f'{mode} 模式不支持输出格式: {output}，可选 {", ".join(OUTPUTS[mode])}')
+        if not math.isfinite(seconds) or seconds <= 0:
+            raise ValueError('剖析时长必须为大于 0 的有限数字')
+        if threads not in ('loop', 'all'):
+            raise ValueError('threads 只能为 loop 或 all')
+        if output == 'pstats' and loop is None:
+            raise ValueError('pstats 输出需要事件循环')
+
+        self.mode = mode
+        self.output = output
+        self.seconds = seconds
+        self.loop = loop
+        self.thread_ids = {thread_id} if threads == 'loop' and thread_id is not None else None
+        self.interval = interval
+        self.stop_when = stop_when
+
+        self.samples = 0
+        self.data: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def filename(self) -> str:
+        return f'profile-{self.mode}.{"pstats" if self.output == "pstats" else "folded"}'
+
+    @property
+    def mimetype(self) -> str:
+        return 'application/octet-stream' if self.output == 'pstats' else 'text/plain; charset=utf-8'
+
+    def start(self) -> 'ProfileCapture':
+        """开始剖析；已有剖析在进行时抛出 RuntimeError"""
+        if not _active.acquire(blocking=False):
+            raise RuntimeError('已有性能剖析正在进行')
+        self.started_at = time.time()
+        try:
+            threading.Thread(target=self._run, name='profile-capture', daemon=True).start()
+        except Exception:
+            _active.release()
+            raise
+        return self
+
+    def stop(self):
+        """提前结束剖析，已采集的数据照常输出"""
+        self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def describe(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'output': self.output,
+            'seconds': self.seconds,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'done': self.done.is_set(),
+            'samples': self.samples,
+            'size': len(self.data) if self.data is not None else None,
+            'error': self.error,
+        }
+
+    def _run(self):
+        try:
+            if self.mode == 'alloc':
+                self._capture_allocations()
+            elif self.output == 'pstats':
+                self._capture_pstats()
+            else:
+                self._capture_samples()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+            _active.release()
+            self.done.set()
+
+    def _finished(self, deadline: float) -> bool:
+        return (
+            time.monotonic() >= deadline
+            or self._stop.is_set()
+            or (self.stop_when is not None and self.stop_when())
+        )
+
+    def _wait(self):
+        deadline = time.monotonic() + self.seconds
+        while not self._finished(deadline):
+            self._stop.wait(min(0.1, self.seconds))
+
+    def _capture_samples(self):
+        sampler = StackSampler(self.thread_ids)
+        deadline = time.monotonic() + self.seconds
+        while not self._finished(deadline):
+            sampler.sample()
+            self.samples = sampler.samples
+            self._stop.wait(self.interval)
+        self.data = sampler.collapsed().encode('utf-8')
+
+    def _capture_pstats(self):
+        profile = cProfile.Profile()
+        self._call_on_loop(profile.enable)
+        try:
+            self._wait()
+        finally:
+            self._call_on_loop(profile.disable)
+        profile.create_stats()
+        self.samples = sum(stat[1] for stat in profile.stats.values())  # 函数调用次数
+        self.data = marshal.dumps(profile.stats)
+
+    def _capture_allocations(self):
+        # 进程已经在跟踪内存分配时不接管 tracemalloc，只统计剖析期间的增量
+        owner = not tracemalloc.is_tracing()
+        baseline = None
+        if owner:
+            tracemalloc.start(ALLOC_FRAMES)
+        else:
+            baseline = tracemalloc.take_snapshot()
+        try:
+            self._wait()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if owner:
+                tracemalloc.stop()
+        self.samples = len(snapshot.traces)
+        self.data = allocation_stacks(snapshot, baseline).encode('utf-8')
+
+    def _call_on_loop(self, func: Callable):
+        """在事件循环线程上执行 func 并等待完成"""
+        finished = threading.Event()
+        errors: List[BaseException] = []
+
+        def call():
+            try:
+                func()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                finished.set()
+
+        self.loop.call_soon_threadsafe(call)
+        if not finished.wait(LOOP_CALL_TIMEOUT):
+            raise RuntimeError('事件循环没有响应')
+        if errors:
+            raise errors[0]
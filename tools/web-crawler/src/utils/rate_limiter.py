@@ -0,0 +1,230 @@
+"""
+按主机限速器
+使用令牌桶控制对每个主机的请求速率，支持 robots.txt 的 Crawl-delay 和响应中的 Retry-After
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+import urllib.request
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# robots.txt 在线程池中获取，避免阻塞事件循环
+_robots_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='robots')
+
+
+def host_of(url: str) -> str:
+    """提取URL的主机键（小写 host[:port]）"""
+    return urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头，返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """单个主机的令牌桶
+
+    令牌数允许为负，表示已经预约但尚未到时间的请求，
+    因此并发的请求者按预约顺序依次放行。
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+
+class HostRateLimiter:
+    """所有任务和抓取阶段共享的按主机限速器"""
+
+    def __init__(
+        self,
+        default_rate: float = 2.0,
+        default_burst: int = 4,
+        respect_robots: bool = True,
+        user_agent: str = '*',
+    ):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._overrides: Dict[str, Dict] = {}
+        self._crawl_delays: Dict[str, float] = {}
+        self._robots: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def configure_host(
+        self,
+        host: str,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        stricter_only: bool = False,
+    ):
+        """设置主机的请求速率（次/秒）和突发数
+
+        robots.txt 的 Crawl-delay 仍然生效，设置的速率不会超过它；
+        stricter_only 为真时只能降低当前速率和突发数，用于多个任务共享的限速器。
+        """
+        if rate is not None and not rate > 0:
+            raise ValueError(f'请求速率必须大于 0: {rate}')
+        if burst is not None and burst < 1:
+            raise ValueError(f'突发数必须不小于 1: {burst}')
+
+        host = host.lower()
+        with self._lock:
+            override = self._overrides.setdefault(host, {})
+            bucket = self._buckets.get(host)
+            if stricter_only:
+                if rate is not None:
+                    rate = min(rate, override.get('rate', bucket.rate if bucket else self.default_rate))
+                if burst is not None:
+                    burst = min(burst, override.get('burst', bucket.burst if bucket else self.default_burst))
+            if rate is not None:
+                override['rate'] = rate
+            if burst is not None:
+                override['burst'] = burst
+            if bucket:
+                bucket.rate = override.get('rate', bucket.rate)
+                bucket.burst = max(1, override.get('burst', bucket.burst))
+                self._apply_crawl_delay(host, bucket)
+
+    def set_crawl_delay(self, host: str, delay: float):
+        """应用 Crawl-delay：速率不超过每 delay 秒一次，且不允许突发"""
+        if delay <= 0:
+            return
+        host = host.lower()
+        with self._lock:
+            self._crawl_delays[host] = delay
+            self._apply_crawl_delay(host, self._get_bucket(host))
+
+    def _apply_crawl_delay(self, host: str, bucket: TokenBucket):
+        delay = self._crawl_delays.get(host)
+        if delay:
+            bucket.rate = min(bucket.rate, 1.0 / delay)
+            bucket.burst = 1
+            bucket.tokens = min(bucket.tokens, 1.0)
+
+    def defer(self, url: str, seconds: float):
+        """在 seconds 秒内暂停对该主机的请求（Retry-After）"""
+        with self._lock:
+            bucket = self._get_bucket(host_of(url))
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+
+    def handle_response(self, url: str, status_code: Optional[int], headers: Optional[Dict] = None) -> Optional[float]:
+        """根据响应状态码和 Retry-After 头调整主机限速，返回退避秒数"""
+        if status_code not in (429, 503):
+            return None
+        retry_after = None
+        for key, value in (headers or {}).items():
+            if key.lower() == 'retry-after':
+                retry_after = parse_retry_after(value)
+                break
+        if retry_after is None:
+            # 未给出 Retry-After 时按当前速率退避几个请求间隔
+            retry_after = 4.0 / self.bucket_for(url).rate
+        self.defer(url, retry_after)
+        logger.info(f"主机 {host_of(url)} 返回 {status_code}，暂停 {retry_after:.1f} 秒")
+        return retry_after
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        with self._lock:
+            return self._get_bucket(host_of(url))
+
+    async def acquire(self, url: str):
+        """等待直到允许向该URL所在主机发送请求"""
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+
+        if self.respect_robots and parsed.scheme in ('http', 'https'):
+            await self._ensure_robots(parsed.scheme, host)
+
+        with self._lock:
+            wait = self._get_bucket(host).reserve(time.monotonic())
+
+        if wait > 0:
+            self.total_wait += wait
+            await asyncio.sleep(wait)
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            override = self._overrides.get(host, {})
+            bucket = TokenBucket(
+                override.get('rate', self.default_rate),
+                override.get('burst', self.default_burst),
+            )
+            self._buckets[host] = bucket
+        return bucket
+
+    async def _ensure_robots(self, scheme: str, host: str):
+        with self._lock:
+            future = self._robots.get(host)
+            if future is None:
+                future = _robots_executor.submit(self._load_robots, scheme, host)
+                self._robots[host] = future
+        if not future.done():
+            await asyncio.wrap_future(future)
+
+    def _load_robots(self, scheme: str, host: str):
+        delay = self._fetch_robots_delay(f'{scheme}://{host}/robots.txt')
+        if delay:
+            self.set_crawl_delay(host, delay)
+            logger.info(f"主机 {host} 的 robots.txt 要求 Crawl-delay {delay} 秒")
+
+    def _fetch_robots_delay(self, robots_url: str) -> Optional[float]:
+        """获取 robots.txt 中的 Crawl-delay 或 Request-rate"""
+        try:
+            request = urllib.request.Request(robots_url, headers={'User-Agent': self.user_agent})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                lines = response.read().decode('utf-8', errors='ignore').splitlines()
+        except Exception:
+            return None
+
+        parser = RobotFileParser()
+        parser.parse(lines)
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            return float(delay)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests:
+            return request_rate.seconds / request_rate.requests
+        return None
+
+    def stats(self) -> Dict:
+        """各主机的当前速率设置"""
+        with self._lock:
+            return {
+                host: {'rate': bucket.rate, 'burst': bucket.burst}
+                for host, bucket in self._buckets.items()
+            }
@@ -0,0 +1,134 @@
+"""
+站点结构树
+抓取过程中增量维护的URL路径字典树和导航链接集合，每个结果按路径长度更新，
+任意时刻都可以直接输出当前的导航结构，不需要在抓取结束后重新扫描全部结果
+"""
+
+import hashlib
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from ..navigation import EnhancedNavigationExtractor
+
+
+class _Node:
+    """路径字典树的节点，url 为空表示只作为中间目录出现过"""
+
+    __slots__ = ('name', 'url', 'title', 'children', 'pages')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.url: Optional[str] = None
+        self.title: Optional[str] = None
+        self.children: Dict[str, '_Node'] = {}
+        self.pages: Optional[Dict[str, str]] = None  # 该路径下抓取到的页面 URL → 标题
+
+
+def _segments(url: str) -> List[str]:
+    return [segment for segment in urlsplit(url).path.split('/') if segment]
+
+
+class SiteTree:
+    """增量站点结构
+
+    - add_page：页面按URL路径插入字典树，耗时与路径段数成正比
+    - add_navigation：页面的导航 HTML 只在内容第一次出现时解析，链接按 URL 去重后插入字典树
+    - pages()/navigation_links()/tree()：从当前结构直接生成，不重新解析任何结果
+    """
+
+    def __init__(self, base_url: str, extractor: Optional[EnhancedNavigationExtractor] = None):
+        self.base_url = base_url
+        self.extractor = extractor or EnhancedNavigationExtractor(base_url)
+        self.root = _Node('')
+        self.links: Dict[str, Dict] = {}  # 导航链接，按发现顺序
+        self.page_count = 0
+        self.version = 0
+        self._parsed_navigation = set()
+
+    @classmethod
+    def from_navigation(cls, base_url: str, navigation: List[Dict]) -> 'SiteTree':
+        """由已生成的导航列表重建，用于已写入磁盘的任务"""
+        tree = cls(base_url)
+        for item in navigation:
+            if item.get('type') == 'page':
+                tree.add_page(item['url'], item.get('title') or '')
+            else:
+                tree._add_link(item)
+        return tree
+
+    def add_page(self, url: str, title: str = ''):
+        """记录一个已抓取的页面"""
+        node = self._insert(url, title or '无标题')
+        if node.pages is None:
+            node.pages = {}
+        if url not in node.pages:
+            self.page_count += 1
+        node.pages[url] = title or '无标题'
+        self.version += 1
+
+    def add_navigation(self, content: Optional[str], page_url: str) -> int:
+        """解析页面的导航 HTML，返回新增的导航链接数；相同的导航内容只解析一次"""
+        if not content:
+            return 0
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        if digest in self._parsed_navigation:
+            return 0
+        self._parsed_navigation.add(digest)
+
+        added = 0
+        for link in self.extractor.extract_links(content, page_url):
+            added += self._add_link(link)
+        return added
+
+    def navigation_links(self) -> List[Dict]:
+        """去重后的导航链接，按发现顺序"""
+        return list(self.links.values())
+
+    def pages(self) -> List[Dict]:
+        """已抓取的页面，按路径层级逐层输出，同一层内按路径排序"""
+        items = []
+        queue = deque([(self.root, '', 0)])
+        while queue:
+            node, path, level = queue.popleft()
+            if node.pages:
+                for url, title in node.pages.items():
+                    items.append({'url': url, 'title': title, 'path': path or '/', 'level': level, 'type': 'page'})
+            for name in sorted(node.children):
+                queue.append((node.children[name], f'{path}/{name}', level + 1))
+        return items
+
+    def tree(self) -> List[Dict]:
+        """嵌套的站点结构，每个节点为 {name, url, title, children}"""
+        def build(node: _Node) -> Dict:
+            return {
+                'name': node.name,
+                'url': node.url,
+                'title': node.title or node.name,
+                'children': [build(node.children[name]) for name in sorted(node.children)],
+            }
+
+        children = [build(self.root.children[name]) for name in sorted(self.root.children)]
+        if self.root.url:
+            return [dict(build(self.root), children=children)]
+        return children
+
+    def _add_link(self, link: Dict) -> int:
+        if link['url'] in self.links:
+            return 0
+        self.links[link['url']] = link
+        self._insert(link['url'], link.get('title') or '')
+        self.version += 1
+        return 1
+
+    def _insert(self, url: str, title: str) -> _Node:
+        node = self.root
+        for segment in _segments(url):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node(segment)
+            node = child
+        if node.url is None:
+            node.url = url
+            node.title = title
+        return node
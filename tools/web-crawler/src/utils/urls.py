@@ -0,0 +1,203 @@
+"""
+URL 工具
+URL 规范化、可配置的规范化规则和 64 位指纹去重
+"""
+
+import hashlib
+from array import array
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 默认移除的跟踪参数，以 * 结尾的按前缀匹配
+DEFAULT_TRACKING_PARAMS = (
+    'utm_*', 'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'igshid', 'spm', 'ref_src',
+)
+
+
+class UrlCanonicalizer:
+    """可配置的URL规范化
+
+    - drop_fragment：去掉 #片段
+    - trailing_slash：keep 保持原样，strip 去掉路径末尾的 /（根路径除外），add 为路径补上 /
+    - remove_default_port：去掉 http:80 / https:443
+    - lowercase_host / lowercase_path：主机名、路径转小写（路径默认区分大小写）
+    - sort_query：查询参数按名称排序
+    - strip_params：移除的查询参数，以 * 结尾的按前缀匹配
+    """
+
+    def __init__(
+        self,
+        drop_fragment: bool = True,
+        trailing_slash: str = 'strip',
+        remove_default_port: bool = True,
+        lowercase_host: bool = True,
+        lowercase_path: bool = False,
+        sort_query: bool = True,
+        strip_params: Optional[Iterable[str]] = DEFAULT_TRACKING_PARAMS,
+    ):
+        if trailing_slash not in ('keep', 'strip', 'add'):
+            raise ValueError(f'不支持的 trailing_slash 规则: {trailing_slash}')
+        self.drop_fragment = drop_fragment
+        self.trailing_slash = trailing_slash
+        self.remove_default_port = remove_default_port
+        self.lowercase_host = lowercase_host
+        self.lowercase_path = lowercase_path
+        self.sort_query = sort_query
+
+        params = [p.lower() for p in (strip_params or ())]
+        self._strip_exact = frozenset(p for p in params if not p.endswith('*'))
+        self._strip_prefixes = tuple(p[:-1] for p in params if p.endswith('*'))
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'UrlCanonicalizer':
+        """根据任务配置中的 url_rules 创建"""
+        return cls(**(config or {}))
+
+    def canonicalize(self, url: str) -> str:
+        """返回规范化后的URL"""
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+
+        netloc = parts.netloc
+        if netloc and '@' not in netloc and ':' not in netloc:
+            # 常见情况：没有端口和用户信息，避免解析 hostname/port 属性
+            if self.lowercase_host:
+                netloc = netloc.lower()
+        elif netloc:
+            host = parts.hostname or ''
+            if self.lowercase_host:
+                host = host.lower()
+            if ':' in host:
+                host = f'[{host}]'
+            port = parts.port
+            if port and not (self.remove_default_port and port == DEFAULT_PORTS.get(scheme)):
+                host = f'{host}:{port}'
+            if parts.username:
+                userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+                host = f'{userinfo}@{host}'
+            netloc = host
+
+        path = parts.path
+        if self.lowercase_path:
+            path = path.lower()
+        if netloc and not path:
+            path = '/'
+        if self.trailing_slash == 'strip':
+            if len(path) > 1 and path.endswith('/'):
+                path = path.rstrip('/') or '/'
+        elif self.trailing_slash == 'add':
+            last_segment = path.rsplit('/', 1)[-1]
+            if path and not path.endswith('/') and '.' not in last_segment:
+                path += '/'
+
+        query = self._canonical_query(parts.query)
+        fragment = '' if self.drop_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def _canonical_query(self, query: str) -> str:
+        if not query:
+            return ''
+        # 直接处理原始的 key=value 片段，不重新编码参数值
+        strip_exact = self._strip_exact
+        strip_prefixes = self._strip_prefixes
+        keyed = []
+        for pair in query.split('&'):
+            if not pair:
+                continue
+            name = pair.partition('=')[0]
+            lowered = name.lower()
+            if lowered in strip_exact or (strip_prefixes and lowered.startswith(strip_prefixes)):
+                continue
+            keyed.append((name, pair))
+        if self.sort_query:
+            keyed.sort()
+        pairs = [pair for _, pair in keyed]
+        return '&'.join(pairs)
+
+    def fingerprint(self, url: str) -> int:
+        """规范化URL的 64 位指纹"""
+        return url_fingerprint(self.canonicalize(url))
+
+
+def url_fingerprint(url: str) -> int:
+    """URL字符串的 64 位指纹"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class FingerprintSet:
+    """64 位指纹集合
+
+    开放寻址哈希表，指纹直接存放在 array('Q') 中，装载率不超过 0.7，
+    每个URL约占 12-23 字节，而字符串集合每个URL需要 100 字节以上。
+    不同URL指纹碰撞的概率约为 n² / 2⁶⁵，百万级URL可以忽略。
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity: int = 1024):
+        size = 8
+        while size * self.MAX_LOAD < capacity:
+            size *= 2
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+        self._limit = int(size * self.MAX_LOAD)
+
+    def add(self, fingerprint: int) -> bool:
+        """加入指纹，已存在时返回 False"""
+        fingerprint = fingerprint or 1  # 0 表示空槽
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == 0:
+                break
+            if slot == fingerprint:
+                return False
+            index = (index + 1) & mask
+
+        table[index] = fingerprint
+        self._count += 1
+        if self._count > self._limit:
+            self._grow()
+        return True
+
+    def __contains__(self, fingerprint: int) -> bool:
+        fingerprint = fingerprint or 1
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == 0:
+                return False
+            if slot == fingerprint:
+                return True
+            index = (index + 1) & mask
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return (slot for slot in self._table if slot)
+
+    @property
+    def nbytes(self) -> int:
+        """哈希表占用的字节数"""
+        return self._table.itemsize * len(self._table)
+
+    def _grow(self):
+        old_table = self._table
+        size = len(old_table) * 2
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._limit = int(size * self.MAX_LOAD)
+        self._count = 0
+        for slot in old_table:
+            if slot:
+                self.add(slot)
@@ -0,0 +1,130 @@
+"""
+HTTP 验证器缓存
+在磁盘上按与抓取前沿相同规则规范化的URL记录 ETag、Last-Modified、内容哈希和处理后的结果，
+用于增量重抓时发送条件请求并复用未变化页面的结果
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .urls import UrlCanonicalizer
+
+
+def content_hash(body: bytes) -> str:
+    """计算页面内容哈希"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ValidatorEntry:
+    """单个URL的验证器记录"""
+
+    __slots__ = ('url', 'etag', 'last_modified', 'content_hash', 'record', 'links', 'updated_at')
+
+    def __init__(self, url, etag, last_modified, content_hash, record, links, updated_at):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.record = record
+        self.links = links
+        self.updated_at = updated_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    """基于 SQLite 的验证器缓存，可在多个任务之间共享
+
+    URL 用 UrlCanonicalizer 规范化后作为键；任务配置了 url_rules 时传入前沿的规范化器，
+    保证缓存与前沿对同一页面使用同一个键。
+    """
+
+    def __init__(self, path, canonicalizer: Optional[UrlCanonicalizer] = None):
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS validators ('
+            ' url TEXT PRIMARY KEY,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' content_hash TEXT,'
+            ' record TEXT,'
+            ' links TEXT,'
+            ' updated_at INTEGER)'
+        )
+        self._conn.commit()
+
+    def key(self, url: str, canonicalizer: Optional[UrlCanonicalizer] = None) -> str:
+        return (canonicalizer or self.canonicalizer).canonicalize(url)
+
+    def get(self, url: str, canonicalizer: Optional[UrlCanonicalizer] = None) -> Optional[ValidatorEntry]:
+        """读取URL的验证器记录"""
+        key = self.key(url, canonicalizer)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, content_hash, record, links, updated_at'
+                ' FROM validators WHERE url = ?',
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body_hash, record, links, updated_at = row
+        return ValidatorEntry(
+            key, etag, last_modified, body_hash,
+            json.loads(record) if record else None,
+            json.loads(links) if links else [],
+            updated_at,
+        )
+
+    def put(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_hash: Optional[str],
+        record: Optional[Dict],
+        links: Optional[List[str]] = None,
+        canonicalizer: Optional[UrlCanonicalizer] = None,
+    ):
+        """保存URL的验证器和处理后的结果"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self.key(url, canonicalizer), etag, last_modified, body_hash,
+                    json.dumps(record, ensure_ascii=False) if record is not None else None,
+                    json.dumps(links or []),
+                    int(time.time()),
+                )
+            )
+            self._conn.commit()
+
+    def records(self) -> List[Dict]:
+        """所有保存的处理结果，用于统计仍被引用的内容存储"""
+        with self._lock:
+            rows = self._conn.execute('SELECT record FROM validators WHERE record IS NOT NULL').fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM validators').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -3,8 +3,20 @@ Web界面模块
 包含Flask服务器和前端界面
 """
 
-from .server import create_app
+import importlib
+
+# 服务器模块导入时会创建 Flask 应用，按需导入
+_LAZY_EXPORTS = {
+    "create_app": ".server",
+}
 
 __all__ = [
     "create_app",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,16 @@
+"""
+指标接口
+Prometheus 文本格式的 /metrics 响应；抓取指标 CrawlMetrics 定义在 utils.metrics 中，
+命令行爬虫不加载 Flask 也可以使用
+"""
+
+from flask import Response
+
+from ..utils.metrics import MetricsRegistry
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_response(registry: MetricsRegistry) -> Response:
+    """Prometheus 文本格式的指标响应"""
+    return Response(registry.render(), content_type=PROMETHEUS_MIMETYPE)
@@ -0,0 +1,101 @@
+"""
+剖析接口
+POST 开始对爬虫事件循环的限时剖析，GET 查询进度并在完成后下载剖析文件
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask import Response, jsonify
+
+from ..utils.profiler import ProfileCapture
+
+
+class ProfileStore:
+    """每个任务最近一次剖析的有界存储
+
+    剖析文件可能有数 MB：完成超过 ttl_seconds 的剖析被删除，数量超过 max_profiles 时
+    按最近最少访问的顺序删除已完成的剖析；进行中的剖析（同一时间最多一个）始终保留。
+    """
+
+    def __init__(self, max_profiles: int = 32, ttl_seconds: float = 3600):
+        self.max_profiles = max_profiles
+        self.ttl_seconds = ttl_seconds
+        self._profiles: "OrderedDict[str, ProfileCapture]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, task_id: str, capture: ProfileCapture):
+        with self._lock:
+            self._profiles[task_id] = capture
+            self._profiles.move_to_end(task_id)
+            self._prune()
+
+    def get(self, task_id: str) -> Optional[ProfileCapture]:
+        with self._lock:
+            self._prune()
+            capture = self._profiles.get(task_id)
+            if capture is not None:
+                self._profiles.move_to_end(task_id)
+            return capture
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._profiles)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        finished = [task_id for task_id, capture in self._profiles.items() if capture.done.is_set()]
+        for task_id in finished:
+            if self._profiles[task_id].finished_at < cutoff:
+                del self._profiles[task_id]
+        for task_id in finished:
+            if len(self._profiles) <= self.max_profiles:
+                break
+            self._profiles.pop(task_id, None)
+
+
+def start_profile(task, args, loop, thread_id: int, max_seconds: float) -> ProfileCapture:
+    """按查询参数开始剖析，任务结束时剖析随之结束
+
+    参数错误时抛出 ValueError，已有剖析在进行时抛出 RuntimeError。
+    """
+    try:
+        seconds = float(args.get('seconds', 30))
+    except ValueError:
+        raise ValueError('seconds 必须为数字')
+    if not math.isfinite(seconds):
+        raise ValueError('seconds 必须为有限数字')
+    if seconds > max_seconds:
+        raise ValueError(f'剖析时长不能超过 {max_seconds:g} 秒')
+
+    capture = ProfileCapture(
+        mode=args.get('mode', 'cpu'),
+        seconds=seconds,
+        output=args.get('format'),
+        loop=loop,
+        thread_id=thread_id,
+        threads=args.get('threads', 'loop'),
+        stop_when=lambda: task.status not in ('pending', 'running'),
+    )
+    return capture.start()
+
+
+def profile_response(capture: Optional[ProfileCapture], download_url: str):
+    """剖析未完成时返回 202 和进度，完成后返回剖析文件"""
+    if capture is None:
+        return jsonify({'error': '任务没有剖析记录'}), 404
+
+    document = dict(capture.describe(), download=download_url)
+    if not capture.done.is_set():
+        return jsonify(document), 202
+    if capture.error:
+        return jsonify(document), 500
+
+    return Response(
+        capture.data,
+        content_type=capture.mimetype,
+        headers={'Content-Disposition': f'attachment; filename={capture.filename}'},
+    )
@@ -0,0 +1,134 @@
+"""
+结果接口
+以游标分页或 NDJSON 流的方式输出任务结果，边序列化边写出，
+响应的内存占用和首字节时间不随结果数量增长
+"""
+
+import json
+from typing import Dict, Iterator, Optional
+
+from flask import Response, jsonify, stream_with_context
+
+from ..utils.site_tree import SiteTree
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# 结果中 bodies 引用的内容类型
+BODY_MIMETYPES = {
+    'html': 'text/html; charset=utf-8',
+    'markdown': 'text/markdown; charset=utf-8',
+    'screenshot': 'image/png',
+    'pdf': 'application/pdf',
+}
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_records(results, after: int, limit: Optional[int]) -> Iterator[Dict]:
+    """按序号迭代结果，序号从 1 开始，只返回序号大于 after 的记录
+
+    结果列表只追加不修改，请求开始时截取长度，之后新增的结果留给下一页。
+    """
+    end = len(results)
+    if limit is not None:
+        end = min(end, after + limit)
+    for seq in range(after + 1, end + 1):
+        yield dict(results[seq - 1], seq=seq)
+
+
+def _parse_cursor(args):
+    after = int(args.get('after', 0))
+    limit = args.get('limit')
+    if limit is not None:
+        limit = int(limit)
+        if limit <= 0:
+            raise ValueError('limit 必须为正整数')
+        limit = min(limit, MAX_PAGE_LIMIT)
+    if after < 0:
+        raise ValueError('after 不能为负数')
+    return after, limit
+
+
+def results_response(task, args, accept: str = '') -> Response:
+    """生成任务结果响应
+
+    - ?after=<seq>&limit=<n>：游标分页，响应中 next_after 为下一页游标，没有更多结果时为 null
+    - ?format=ndjson 或 Accept: application/x-ndjson：每行一条结果的流式输出
+    - 不带游标参数时保持原有格式，一次返回全部结果、导航和统计信息
+    """
+    try:
+        after, limit = _parse_cursor(args)
+    except ValueError as e:
+        return jsonify({'error': f'无效的分页参数: {str(e)}'}), 400
+
+    results = task.results
+
+    if args.get('format') == 'ndjson' or NDJSON_MIMETYPE in (accept or ''):
+        def generate_ndjson():
+            for record in iter_records(results, after, limit):
+                yield _dumps(record) + '\n'
+
+        return Response(stream_with_context(generate_ndjson()), mimetype=NDJSON_MIMETYPE)
+
+    paginated = 'after' in args or 'limit' in args
+    if paginated and limit is None:
+        limit = DEFAULT_PAGE_LIMIT
+
+    def generate_json():
+        yield '{"results":['
+        last_seq = after
+        for index, record in enumerate(iter_records(results, after, limit)):
+            last_seq = record['seq']
+            yield ('' if index == 0 else ',') + _dumps(record)
+        yield '],"stats":' + _dumps(task.stats)
+
+        if paginated:
+            has_more = last_seq < len(results) or task.status in ('pending', 'running')
+            yield ',"next_after":' + _dumps(last_seq if has_more else None)
+            yield ',"total":' + _dumps(len(results))
+        if not paginated or args.get('include') == 'navigation':
+            yield ',"navigation":' + _dumps(task.navigation)
+        yield '}'
+
+    return Response(stream_with_context(generate_json()), mimetype='application/json')
+
+
+def body_response(task, seq: int, name: str, store) -> Response:
+    """从内容存储中流式输出第 seq 条结果的 bodies[name]"""
+    if not 1 <= seq <= len(task.results):
+        return jsonify({'error': '结果不存在'}), 404
+    ref = (task.results[seq - 1].get('bodies') or {}).get(name)
+    if not ref or ref['key'] not in store:
+        return jsonify({'error': f'结果没有 {name} 内容'}), 404
+
+    return Response(
+        stream_with_context(store.iter_chunks(ref['key'])),
+        mimetype=BODY_MIMETYPES.get(name, 'application/octet-stream'),
+        headers={
+            'Content-Length': str(ref['size']),
+            'ETag': f'"{ref["key"]}"',
+            'Cache-Control': 'public, max-age=31536000, immutable',
+        }
+    )
+
+
+def navigation_response(task, base_url: str) -> Response:
+    """任务当前的导航链接、页面列表和嵌套站点结构
+
+    运行中的任务直接读取增量维护的站点结构；已写入磁盘的任务由保存的导航列表重建。
+    """
+    site_tree = getattr(task, 'site_tree', None)
+    if site_tree is None:
+        site_tree = SiteTree.from_navigation(base_url, task.navigation)
+    return jsonify({
+        'task_id': task.task_id,
+        'status': task.status,
+        'version': site_tree.version,
+        'page_count': site_tree.page_count,
+        'navigation': site_tree.navigation_links(),
+        'tree': site_tree.tree(),
+    })
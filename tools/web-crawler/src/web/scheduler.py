@@ -0,0 +1,87 @@
+"""
+任务调度器
+在共享的爬虫事件循环上并发执行多个爬虫任务
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskScheduler:
+    """爬虫任务调度器
+
+    所有任务运行在同一个长期存在的事件循环上，同时运行的任务数不超过
+    max_concurrent，其余任务按提交顺序排队。submit 可以在任意线程调用，
+    有空闲名额时任务会在事件循环的下一轮立即开始。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_concurrent: int = 2):
+        self.loop = loop
+        self.max_concurrent = max(1, max_concurrent)
+
+        self._pending: Deque[Tuple[object, float]] = deque()
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    def submit(self, task):
+        """提交任务（线程安全）"""
+        self.submitted += 1
+        self.loop.call_soon_threadsafe(self._enqueue, task, time.monotonic())
+
+    def _enqueue(self, task, submitted_at: float):
+        self._pending.append((task, submitted_at))
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._running < self.max_concurrent and self._pending:
+            task, submitted_at = self._pending.popleft()
+            wait = time.monotonic() - submitted_at
+            self._last_wait = wait
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+            self._running += 1
+            self.loop.create_task(self._run(task))
+
+    async def _run(self, task):
+        try:
+            await task.run()
+        except Exception as e:
+            logger.error(f"任务执行异常: {str(e)}", exc_info=True)
+        finally:
+            self._running -= 1
+            self.completed += 1
+            self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def stats(self) -> Dict:
+        """调度器统计信息，等待时间单位为毫秒"""
+        started = self.completed + self._running
+        return {
+            'queue_depth': self.queue_depth,
+            'running': self._running,
+            'max_concurrent': self.max_concurrent,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'wait_time_ms': {
+                'last': round(self._last_wait * 1000, 2),
+                'avg': round(self._total_wait / started * 1000, 2) if started else 0.0,
+                'max': round(self._max_wait * 1000, 2),
+            },
+        }
@@ -5,33 +5,58 @@
 """
 
 import asyncio
-import json
+import importlib.util
 import os
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional
 import threading
-import queue
 import time
+import weakref
 
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import logging
 
-# 爬虫相关导入
-try:
-    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-    from crawl4ai.extraction_strategy import JsonCssExtractionStrategy, LLMExtractionStrategy
-    from crawl4ai.deep_crawling import BFSDeepCrawlStrategy, DFSDeepCrawlStrategy
-    from crawl4ai.deep_crawling.filters import DomainFilter, URLPatternFilter, FilterChain
-    from crawl4ai import LLMConfig
-    CRAWL4AI_AVAILABLE = True
-except ImportError:
-    CRAWL4AI_AVAILABLE = False
+from ..utils.blob_store import BlobStore, body_keys
+from ..utils.browser_pool import BrowserPool
+from ..utils.checkpoint import CrawlCheckpoint, read_checkpoint_records, read_checkpoint_state
+from ..utils.fetch_engine import FetchRouter, HttpFetcher
+from ..utils.frontier import CrawlFrontier
+from ..utils.link_filter import LinkFilter
+from ..utils.metrics import CrawlMetrics
+from ..utils.near_duplicates import NearDuplicateIndex
+from ..utils.page_crawler import PageCrawler, navigation_extraction_strategy
+from ..utils.page_record import PageRecord
+from ..utils.pipeline import CrawlPipeline
+from ..utils.rate_limiter import HostRateLimiter, host_of
+from ..utils.site_tree import SiteTree
+from ..utils.disk_frontier import DiskFrontier
+from ..utils.urls import UrlCanonicalizer
+from ..utils.validator_cache import ValidatorCache, content_hash
+from .scheduler import TaskScheduler
+from .metrics_api import metrics_response
+from .profile_api import ProfileStore, profile_response, start_profile
+from .results_api import body_response, navigation_response, results_response
+from .status_api import TaskChangeLog, status_response
+from .socket_hub import TaskEventEmitter
+from .task_registry import TaskRegistry
+
+# crawl4ai 导入耗时较长，启动时只检查是否安装，第一次创建浏览器或抓取配置时再导入，
+# 只使用 API 的进程不会加载浏览器依赖
+CRAWL4AI_AVAILABLE = importlib.util.find_spec('crawl4ai') is not None
+if not CRAWL4AI_AVAILABLE:
     print("警告: crawl4ai 未安装，请运行 'pip install crawl4ai'")
 
+if TYPE_CHECKING:
+    from crawl4ai import BrowserConfig
+
+# 增量抓取使用 aiohttp 发送条件请求，同样在第一次使用时导入
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -45,10 +70,169 @@ app.config['SECRET_KEY'] = 'your-secret-key'
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# 全局变量
-tasks: Dict[str, Dict] = {}  # 存储任务状态
-task_queue = queue.Queue()   # 任务队列
-results_storage: Dict[str, List] = {}  # 结果存储
+
+def create_app() -> Flask:
+    """返回服务器的 Flask 应用，供 src.web 按需导出"""
+    return app
+
+
+# 任务事件按房间缓冲，后台按固定频率批量推送给订阅该任务的客户端
+emitter = TaskEventEmitter(
+    socketio,
+    flush_interval=float(os.environ.get('CRAWLER_SOCKET_FLUSH_INTERVAL', 0.25))
+)
+
+# 内容寻址存储：页面正文等大块内容按哈希压缩保存，结果中只保留引用，相同内容跨任务只保存一份
+blob_store = BlobStore(os.environ.get('CRAWLER_BLOB_DIR', 'crawl_results/blobs'))
+
+
+
+def referenced_blobs():
+    """任务之外仍引用页面内容的记录：验证器缓存和检查点中保存的结果"""
+    if os.path.exists(VALIDATOR_DB_PATH):
+        yield from body_keys(get_validator_cache().records())
+    for path in Path(FRONTIER_DIR).glob('*.db'):
+        yield from body_keys(read_checkpoint_records(path))
+
+
+# 任务注册表：内存中只保留有限数量的任务，已结束的任务按 TTL/LRU 写入磁盘，
+# 删除过期的任务文件后回收不再被引用的页面内容
+tasks = TaskRegistry(
+    spill_dir=os.environ.get('CRAWLER_TASK_SPILL_DIR', 'crawl_results/tasks'),
+    max_tasks=int(os.environ.get('CRAWLER_MAX_TASKS_IN_MEMORY', 100)),
+    max_result_bytes=int(float(os.environ.get('CRAWLER_MAX_RESULT_MB', 256)) * 1024 * 1024),
+    ttl_seconds=float(os.environ.get('CRAWLER_TASK_TTL', 3600)),
+    spill_retention_seconds=float(os.environ.get('CRAWLER_TASK_SPILL_RETENTION', 7 * 24 * 3600)),
+    blob_store=blob_store,
+    blob_refs=referenced_blobs
+)
+# 后台定期淘汰过期任务并删除超过保留时间的任务文件，不依赖 API 访问触发
+tasks.start_sweeper(float(os.environ.get('CRAWLER_TASK_SWEEP_INTERVAL', 60)))
+
+# 并发抓取配置：单任务默认并发页数与全局并发页数上限
+DEFAULT_TASK_CONCURRENCY = int(os.environ.get('CRAWLER_TASK_CONCURRENCY', 4))
+GLOBAL_PAGE_CONCURRENCY = int(os.environ.get('CRAWLER_GLOBAL_CONCURRENCY', 16))
+_global_page_slots = weakref.WeakKeyDictionary()  # 事件循环 -> 全局并发信号量
+
+
+def get_global_page_slots() -> asyncio.Semaphore:
+    """获取当前事件循环上所有任务共享的页面并发信号量"""
+    loop = asyncio.get_running_loop()
+    slots = _global_page_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(GLOBAL_PAGE_CONCURRENCY)
+        _global_page_slots[loop] = slots
+    return slots
+
+
+# 按主机限速器：所有任务和抓取阶段共享，替代固定的请求间隔
+rate_limiter = HostRateLimiter(
+    default_rate=float(os.environ.get('CRAWLER_HOST_RATE', 2.0)),
+    default_burst=int(os.environ.get('CRAWLER_HOST_BURST', 4)),
+    respect_robots=os.environ.get('CRAWLER_RESPECT_ROBOTS', '1') != '0'
+)
+
+# 抓取指标：任务在每个页面的各阶段记录耗时、状态码和失败原因，由 /metrics 输出
+crawl_metrics = CrawlMetrics()
+
+# 验证器缓存：增量抓取时记录每个URL的 ETag、Last-Modified 和内容哈希
+VALIDATOR_DB_PATH = os.environ.get('CRAWLER_VALIDATOR_DB', 'crawl_results/validators.db')
+_validator_cache: Optional[ValidatorCache] = None
+
+
+def get_validator_cache() -> ValidatorCache:
+    """获取所有任务共享的验证器缓存"""
+    global _validator_cache
+    if _validator_cache is None:
+        _validator_cache = ValidatorCache(VALIDATOR_DB_PATH)
+    return _validator_cache
+
+
+# 磁盘抓取前沿：max_pages 达到阈值或任务配置 frontier: "disk" 时使用，
+# 待抓取队列和已发现URL保存在 SQLite 中，内存占用不随站点规模增长
+FRONTIER_DIR = os.environ.get('CRAWLER_FRONTIER_DIR', 'crawl_results/frontier')
+DISK_FRONTIER_MIN_PAGES = int(os.environ.get('CRAWLER_DISK_FRONTIER_MIN_PAGES', 10000))
+
+# 检查点：使用磁盘前沿的任务每隔一段时间把前沿、统计和新增结果提交到前沿文件中，
+# 服务重启后可通过 POST /api/tasks/<task_id>/resume 从最近一次检查点继续（0 表示关闭）
+CHECKPOINT_INTERVAL = float(os.environ.get('CRAWLER_CHECKPOINT_INTERVAL', 30))
+
+
+def checkpoint_path(task_id: str) -> Path:
+    """任务的磁盘前沿和检查点文件"""
+    return Path(FRONTIER_DIR) / f'{task_id}.db'
+
+
+# 浏览器池：兼容配置的任务和阶段共享预热的浏览器实例
+browser_pool = BrowserPool(
+    max_browsers=int(os.environ.get('CRAWLER_POOL_BROWSERS', 2)),
+    max_pages_per_browser=int(os.environ.get('CRAWLER_POOL_RECYCLE_PAGES', 500)),
+    max_memory_mb=int(os.environ.get('CRAWLER_POOL_MAX_MEMORY_MB', 0)) or None,
+    health_check_interval=float(os.environ.get('CRAWLER_POOL_HEALTH_INTERVAL', 30)),
+)
+
+# 默认浏览器设置，用于预热浏览器池
+DEFAULT_BROWSER_SETTINGS = {
+    'browser_type': 'chromium',
+    'headless': True,
+    'viewport': {'width': 1280, 'height': 720},
+}
+
+# 爬虫事件循环：浏览器实例绑定在创建它的事件循环上，
+# 所有任务都在这个长期存在的循环上执行才能复用浏览器池
+crawler_loop = asyncio.new_event_loop()
+
+
+def _run_crawler_loop():
+    """爬虫事件循环线程"""
+    asyncio.set_event_loop(crawler_loop)
+    crawler_loop.run_forever()
+
+
+loop_thread = threading.Thread(target=_run_crawler_loop, daemon=True)
+loop_thread.start()
+
+# 按需剖析：每个任务保留最近一次剖析，剖析的是所有任务共享的爬虫事件循环；
+# 已完成的剖析按数量上限和保留时间删除
+profiles = ProfileStore(
+    max_profiles=int(os.environ.get('CRAWLER_PROFILE_KEEP', 32)),
+    ttl_seconds=float(os.environ.get('CRAWLER_PROFILE_TTL', 3600))
+)
+MAX_PROFILE_SECONDS = float(os.environ.get('CRAWLER_PROFILE_MAX_SECONDS', 300))
+
+
+def build_browser_config(settings: Dict) -> 'BrowserConfig':
+    """根据任务配置创建浏览器配置"""
+    from crawl4ai import BrowserConfig
+    
+    viewport = settings.get('viewport', DEFAULT_BROWSER_SETTINGS['viewport'])
+    return BrowserConfig(
+        browser_type=settings.get('browser_type', DEFAULT_BROWSER_SETTINGS['browser_type']),
+        headless=settings.get('headless', DEFAULT_BROWSER_SETTINGS['headless']),
+        viewport_width=viewport['width'],
+        viewport_height=viewport['height']
+    )
+
+
+def start_browser_pool(prewarm: Optional[int] = None):
+    """启动浏览器池并预热默认配置的浏览器"""
+    if not CRAWL4AI_AVAILABLE:
+        logger.warning('crawl4ai 未安装，跳过浏览器池预热')
+        return None
+    
+    if prewarm is None:
+        prewarm = int(os.environ.get('CRAWLER_POOL_PREWARM', 1))
+    prewarm_configs = [build_browser_config(DEFAULT_BROWSER_SETTINGS) for _ in range(prewarm)]
+    return asyncio.run_coroutine_threadsafe(browser_pool.start(prewarm_configs), crawler_loop)
+
+
+def stop_browser_pool(timeout: float = 10):
+    """关闭浏览器池中的所有浏览器"""
+    future = asyncio.run_coroutine_threadsafe(browser_pool.close(), crawler_loop)
+    try:
+        future.result(timeout=timeout)
+    except Exception as e:
+        logger.warning(f"关闭浏览器池失败: {str(e)}")
 
 
 class CrawlerTask:
@@ -63,17 +247,35 @@ class CrawlerTask:
         self.stats = {
             'discovered': 0,
             'crawled': 0,
-            'failed': 0
+            'failed': 0,
+            'unchanged': 0,
+            'duplicates': 0
         }
-        self.results = []
+        self.results: List[PageRecord] = []
         self.navigation = []
+        self.site_tree = SiteTree(config.get('start_url', ''))  # 随结果增量更新的站点结构
         self.error = None
         self.start_time = None
         self.end_time = None
+        self.changes = TaskChangeLog()  # 版本号及新增结果、日志记录
         
         # 存储发现的URL和内容
-        self.discovered_urls = set()
+        self.frontier: Optional[CrawlFrontier] = None
         self.crawled_content = {}
+        self.resumed = False  # 是否从检查点恢复
+        self._checkpoint: Optional[CrawlCheckpoint] = None
+        self._pipeline: Optional[CrawlPipeline] = None
+        self._browser_config = None
+        self._run_config = None
+        self.link_filter: Optional[LinkFilter] = None
+        self.fetch_router: Optional[FetchRouter] = None
+        self._fetcher: Optional[HttpFetcher] = None
+        self._start_error = None
+        self._validators = None
+        self._http = None
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        self._page_crawler: Optional[PageCrawler] = None
+        self._revalidated: Dict[str, Dict] = {}  # 正在抓取的URL -> 条件请求取得的验证器
 
     def update_status(self, status: str, progress: int = None, status_text: str = None):
         """更新任务状态"""
@@ -82,9 +284,10 @@ class CrawlerTask:
             self.progress = progress
         if status_text:
             self.status_text = status_text
+        self.changes.bump()
             
-        # 通过WebSocket发送更新
-        socketio.emit('task_update', {
+        # 通过WebSocket发送更新（同一刷新周期内只推送最新进度）
+        emitter.emit_status(self.task_id, {
             'task_id': self.task_id,
             'status': self.status,
             'progress': self.progress,
@@ -99,39 +302,42 @@ class CrawlerTask:
             'message': message,
             'level': level
         }
+        self.changes.record_log(log_entry)
         
-        socketio.emit('log', log_entry)
+        emitter.emit_log(self.task_id, log_entry)
         logger.info(f"[{self.task_id}] {message}")
 
-    def add_result(self, result: Dict):
+    def add_result(self, result: PageRecord):
         """添加结果"""
         self.results.append(result)
         self.stats['crawled'] = len(self.results)
+        self._update_site_tree(result)
+        seq = self.changes.record_result()
         
-        socketio.emit('result', {
-            'task_id': self.task_id,
-            'result': result
-        })
+        emitter.emit_result(self.task_id, seq, result.to_dict())
+
+    def _update_site_tree(self, result: PageRecord):
+        self.site_tree.add_page(result['url'], result['title'])
+        self.site_tree.add_navigation(result.get('navigation_content'), result['url'])
 
     async def run(self):
         """执行爬虫任务"""
         if not CRAWL4AI_AVAILABLE:
             self.status = 'failed'
             self.error = 'crawl4ai 未安装'
+            self.changes.bump()
             return
 
         try:
             self.start_time = datetime.now()
             self.update_status('running', 0, '初始化爬虫...')
             self.add_log('开始执行爬虫任务')
+            self._configure_rate_limit()
 
-            # 第一步：发现网站结构
-            await self.discover_website_structure()
-            
-            # 第二步：抓取所有内容
+            # 第一步：边发现边抓取所有内容
             await self.crawl_all_content()
             
-            # 第三步：生成导航结构
+            # 第二步：生成导航结构
             self.generate_navigation_structure()
             
             # 完成
@@ -145,271 +351,338 @@ class CrawlerTask:
             self.add_log(f'任务执行失败: {str(e)}', 'error')
             logger.error(f"任务 {self.task_id} 失败: {str(e)}", exc_info=True)
 
-    async def discover_website_structure(self):
-        """发现网站结构"""
-        self.update_status('running', 10, '发现网站结构...')
-        self.add_log('开始发现网站结构')
-        
-        config = self.config
-        browser_config = self._create_browser_config()
-        
-        # 配置过滤器
-        filters = []
-        if config['filters']['exclude_domains']:
-            domain_filter = DomainFilter(
-                blocked_domains=config['filters']['exclude_domains']
-            )
-            filters.append(domain_filter)
-        
-        if config['filters']['exclude_patterns']:
-            pattern_filter = URLPatternFilter(
-                excluded_patterns=config['filters']['exclude_patterns']
-            )
-            filters.append(pattern_filter)
+    async def crawl_all_content(self):
+        """抓取所有内容
+
+        从起始URL开始，由抓取前沿驱动：每个页面抓取完成后立即处理结果，
+        页面中发现的内部链接直接进入前沿，每个页面只抓取、渲染一次。
+        """
+        self.update_status('running', 10, '开始抓取...')
+        self.add_log('开始抓取网站内容')
         
-        # 总是创建 FilterChain，即使没有过滤器也创建空的
-        filter_chain = FilterChain(filters)
+        from crawl4ai import CacheMode, CrawlerRunConfig
         
-        # 配置深度爬取策略
-        deep_crawl_strategy = None
-        if config['crawl_strategy'] == 'bfs':
-            deep_crawl_strategy = BFSDeepCrawlStrategy(
-                max_depth=config['max_depth'],
-                include_external=False,
-                max_pages=config['max_pages'],
-                filter_chain=filter_chain
-            )
-        elif config['crawl_strategy'] == 'dfs':
-            deep_crawl_strategy = DFSDeepCrawlStrategy(
-                max_depth=config['max_depth'],
-                include_external=False,
-                max_pages=config['max_pages'],
-                filter_chain=filter_chain
-            )
+        config = self.config
+        self._browser_config = self._create_browser_config()
+        self.link_filter = LinkFilter.from_config(config, config['start_url'])
+        self._near_duplicates = NearDuplicateIndex.from_config(config.get('near_duplicates'))
         
-        # 配置爬取参数
-        run_config = CrawlerRunConfig(
+        # 所有页面共用同一份单页面抓取配置
+        self._run_config = CrawlerRunConfig(
             cache_mode=getattr(CacheMode, config['cache_mode']),
-            deep_crawl_strategy=deep_crawl_strategy,
+            extraction_strategy=navigation_extraction_strategy(),
             exclude_external_links=config['filters']['exclude_external'],
             exclude_social_media_links=config['filters']['exclude_social'],
             exclude_external_images=config['filters']['exclude_images'],
             process_iframes=config['filters']['process_iframes'],
             word_count_threshold=config['word_threshold'],
-            wait_for=config['wait_for'],
-            stream=True
+            wait_for=config['wait_for']
         )
         
-        # 创建爬虫实例
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            # 首先爬取首页
-            result = await crawler.arun(
-                url=config['start_url'],
-                config=run_config
-            )
-            
-            if result.success:
-                self.add_log(f'成功发现网站结构: {config["start_url"]}')
-                self.discovered_urls.add(config['start_url'])
-                
-                # 处理结果
-                processed_result = self._process_crawl_result(result)
-                self.add_result(processed_result)
-                
-                # 更新统计信息
-                self.stats['discovered'] = len(self.discovered_urls)
-                self.stats['crawled'] = len(self.results)
-                
-                self.update_status('running', 30, '网站结构发现完成')
-            else:
-                raise Exception(f"无法访问网站: {result.error_message}")
-
-    async def crawl_all_content(self):
-        """抓取所有内容"""
-        self.update_status('running', 40, '开始抓取所有内容...')
-        self.add_log('开始抓取所有发现的页面')
+        # 配置抓取前沿，从检查点恢复时前沿中已有待抓取的URL
+        frontier = self.frontier = self._create_frontier()
+        if self.resumed:
+            self._restore_checkpoint()
+        else:
+            frontier.add(config['start_url'])
+        if self._checkpoint:
+            self._save_checkpoint()
         
-        config = self.config
-        browser_config = self._create_browser_config()
+        # 单任务并发页数，1 表示逐页顺序抓取
+        concurrency = max(1, int(config.get('concurrency', DEFAULT_TASK_CONCURRENCY)))
+        self.add_log(f'并发抓取，并发数: {concurrency}')
         
-        # 创建爬虫实例
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            # 获取所有需要抓取的URL
-            urls_to_crawl = list(self.discovered_urls)
-            total_urls = len(urls_to_crawl)
-            
-            if total_urls == 0:
-                self.add_log('没有发现需要抓取的URL')
-                return
-            
-            # 批量抓取
-            for i, url in enumerate(urls_to_crawl):
-                if url in self.crawled_content:
-                    continue
-                
-                try:
-                    # 更新进度
-                    progress = 40 + int((i / total_urls) * 50)
-                    self.update_status('running', progress, f'抓取中 ({i+1}/{total_urls}): {url}')
-                    
-                    # 配置单页面抓取
-                    run_config = CrawlerRunConfig(
-                        cache_mode=getattr(CacheMode, config['cache_mode']),
-                        extraction_strategy=self._create_extraction_strategy(),
-                        word_count_threshold=config['word_threshold'],
-                        wait_for=config['wait_for']
-                    )
-                    
-                    # 抓取页面
-                    result = await crawler.arun(url=url, config=run_config)
-                    
-                    if result.success:
-                        self.add_log(f'成功抓取: {url}')
-                        processed_result = self._process_crawl_result(result)
-                        self.add_result(processed_result)
-                        self.crawled_content[url] = processed_result
-                    else:
-                        self.add_log(f'抓取失败: {url} - {result.error_message}', 'warning')
-                        self.stats['failed'] += 1
-                        
-                except Exception as e:
-                    self.add_log(f'抓取出错: {url} - {str(e)}', 'error')
-                    self.stats['failed'] += 1
-                
-                # 更新统计信息
-                self.stats['crawled'] = len(self.results)
-                
-                # 短暂延迟，避免过快请求
-                await asyncio.sleep(0.5)
-            
-            self.update_status('running', 90, '内容抓取完成')
-
-    def generate_navigation_structure(self):
-        """生成导航结构"""
-        self.update_status('running', 95, '生成导航结构...')
-        self.add_log('开始生成导航结构')
+        # 服务端渲染的页面直接用 HTTP 获取，需要渲染时交给浏览器
+        self.fetch_router = FetchRouter.from_config(config)
+        if self.fetch_router.mode != 'browser':
+            self._fetcher = HttpFetcher(config['start_url'], self.fetch_router, limit_per_host=concurrency)
+            self.add_log(f'抓取引擎: {self.fetch_router.mode}，静态页面不经过浏览器')
         
-        # 从抓取的内容中提取导航信息
-        navigation_items = []
-        
-        for result in self.results:
-            if result.get('navigation_content'):
-                # 提取导航链接
-                nav_links = self._extract_navigation_links(
-                    result['navigation_content'], 
-                    result['url']
-                )
-                navigation_items.extend(nav_links)
+        # 增量模式：先发条件请求，未变化的页面复用上次的处理结果
+        if config.get('crawl_mode') == 'incremental':
+            if AIOHTTP_AVAILABLE:
+                import aiohttp
+                self._validators = get_validator_cache()
+                self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+                self.add_log(f'增量抓取模式，验证器缓存: {len(self._validators)} 条')
+            else:
+                self.add_log('aiohttp 未安装，增量抓取退化为完整抓取', 'warning')
         
-        # 去重并排序
-        unique_nav_items = {}
-        for item in navigation_items:
-            key = item['url']
-            if key not in unique_nav_items:
-                unique_nav_items[key] = item
+        self._page_crawler = PageCrawler(
+            rate_limiter,
+            self.fetch_router,
+            self.link_filter,
+            on_page=self._record_page,
+            on_failure=self._record_failure,
+            browser=self._lease_browser,
+            run_config=self._run_config,
+            fetcher=self._fetcher,
+            store=blob_store,
+            near_duplicates=self._near_duplicates,
+            on_duplicate=self._record_duplicate,
+            metrics=crawl_metrics
+        )
         
-        self.navigation = list(unique_nav_items.values())
-        self.navigation.sort(key=lambda x: x.get('title', ''))
+        completed = False
+        try:
+            pipeline = self._pipeline = CrawlPipeline(
+                frontier,
+                self._crawl_page,
+                concurrency=concurrency,
+                on_page_done=lambda url: self._on_page_done(frontier, pipeline, url)
+            )
+            await pipeline.run()
+            completed = True
+        finally:
+            if self._http:
+                await self._http.close()
+                self._http = None
+            if self._fetcher:
+                await self._fetcher.close()
+                self._fetcher = None
+            self._close_frontier(completed)
         
-        self.add_log(f'生成导航结构完成，共 {len(self.navigation)} 个导航项')
-
-    def _create_browser_config(self) -> BrowserConfig:
-        """创建浏览器配置"""
-        return BrowserConfig(
-            browser_type=self.config['browser_type'],
-            headless=self.config['headless'],
-            viewport_width=self.config['viewport']['width'],
-            viewport_height=self.config['viewport']['height']
-        )
-
-    def _create_extraction_strategy(self):
-        """创建提取策略"""
-        # 使用CSS选择器提取策略
-        extraction_config = {
-            "navigation": {
-                "selector": "nav, .nav, .navigation, nav[role='navigation'], .navbar, .menu, .sidebar, .nav-menu, .main-nav, .site-nav, .primary-nav, .header-nav, .top-nav, .side-nav, .navigation-menu",
-                "type": "html"
-            },
-            "navigation_links": {
-                "selector": "nav a, .nav a, .navigation a, .navbar a, .menu a",
-                "type": "text",
-                "attribute": "href"
-            }
-        }
+        if not self.results and self._start_error:
+            raise Exception(f"无法访问网站: {self._start_error}")
         
-        return JsonCssExtractionStrategy(extraction_config)
-
-    def _process_crawl_result(self, result) -> Dict:
-        """处理爬取结果"""
-        # 基本信息
-        processed = {
-            'url': result.url,
-            'title': result.metadata.get('title', ''),
-            'description': result.metadata.get('description', ''),
-            'content': result.cleaned_html[:5000] if result.cleaned_html else '',  # 限制长度
-            'word_count': len(result.cleaned_html.split()) if result.cleaned_html else 0,
-            'timestamp': datetime.now().isoformat(),
-            'success': result.success
-        }
+        self.update_status('running', 90, '内容抓取完成')
+        self.add_log(f'内容抓取完成! 成功: {len(self.results)}, 失败: {self.stats["failed"]}')
+        rejected = {rule: stat['rejected'] for rule, stat in self.link_filter.stats().items() if stat['rejected']}
+        if rejected:
+            self.add_log(f'链接过滤: {rejected}')
+        fetch = self.fetch_router.stats()
+        self.add_log(f'抓取引擎: HTTP {fetch["http_pages"]} 页, 浏览器 {fetch["browser_pages"]} 页, 交给浏览器: {fetch["escalations"]}')
+
+    async def _crawl_page(self, url: str, depth: int) -> List[str]:
+        """抓取单个页面：增量模式先发条件请求，其余流程与命令行爬虫共用 PageCrawler"""
+        if not self._http:
+            return await self._page_crawler.crawl(url, depth)
         
-        # 添加提取的结构化数据
-        if result.extracted_content:
-            try:
-                extracted_data = json.loads(result.extracted_content)
-                processed['navigation_content'] = extracted_data.get('navigation', '')
-                processed['navigation_links'] = extracted_data.get('navigation_links', [])
-            except json.JSONDecodeError:
-                pass
+        try:
+            started = time.perf_counter()
+            validators = await self._revalidate(url)
+            crawl_metrics.observe('revalidate', started)
+            if validators['unchanged']:
+                crawl_metrics.page('unchanged')
+                return self._reuse_unchanged(url, validators['entry'])
+        except Exception as e:
+            crawl_metrics.failure(error=e)
+            self._record_failure(url, depth, str(e), e)
+            return []
         
-        # 添加链接信息
-        if hasattr(result, 'links') and result.links:
-            processed['links'] = result.links[:50]  # 限制链接数量
+        # 只有条件请求返回 200 时，页面处理完成后才用新的验证器更新缓存；
+        # 请求出错或返回错误状态时保留缓存中上次成功的记录
+        if validators.get('status') == 200:
+            self._revalidated[url] = validators
+        # 条件请求已取得新内容时直接使用，不再重复请求；需要渲染时直接交给浏览器
+        try:
+            return await self._page_crawler.crawl(
+                url, depth, result=validators.get('result'), use_http='result' not in validators
+            )
+        finally:
+            self._revalidated.pop(url, None)
+
+    @asynccontextmanager
+    async def _lease_browser(self):
+        """每个需要渲染的页面单独租用浏览器：只用 HTTP 的任务不占用浏览器，
+        达到页数上限的浏览器在当前页面结束后即可回收
+        """
+        async with get_global_page_slots(), browser_pool.lease(self._browser_config) as lease:
+            yield lease.crawler
+            lease.record_pages()
+
+    def _record_page(self, url: str, record: PageRecord, links: List[str]):
+        """登记成功抓取的页面，增量模式同时更新验证器缓存"""
+        self.add_log(f'成功抓取: {url}')
+        if url not in self.crawled_content:  # 恢复后重新抓取检查点时正在抓取的页面
+            self.add_result(record)
+        self.crawled_content[url] = record
         
-        return processed
+        validators = self._revalidated.get(url)
+        if validators:
+            self._validators.put(
+                url,
+                validators.get('etag'),
+                validators.get('last_modified'),
+                validators.get('content_hash'),
+                record.to_dict(),
+                links,
+                canonicalizer=self.frontier.canonicalizer
+            )
 
-    def _extract_navigation_links(self, nav_content: str, base_url: str) -> List[Dict]:
-        """从导航内容中提取链接"""
-        import re
-        from urllib.parse import urljoin, urlparse
+    def _record_failure(self, url: str, depth: int, message: str, error: Optional[BaseException]):
+        """登记失败页面，起始页面失败时记录原因"""
+        if error is None:
+            self.add_log(f'抓取失败: {url} - {message}', 'warning')
+        else:
+            self.add_log(f'抓取出错: {url} - {message}', 'error')
+        self.stats['failed'] += 1
+        if depth == 0:
+            self._start_error = message
+
+    async def _revalidate(self, url: str) -> Dict:
+        """发送条件请求判断页面是否变化，同时获取新的验证器
+
+        页面已变化且走 HTTP 抓取时，result 为用已读取的响应解析出的结果（需要渲染时为 None）。
+        """
+        entry = self._validators.get(url, self.frontier.canonicalizer)
+        reusable = entry is not None and entry.record is not None
+        headers = entry.conditional_headers() if reusable else {}
+        
+        try:
+            await rate_limiter.acquire(url)
+            async with self._http.get(url, headers=headers) as response:
+                rate_limiter.handle_response(url, response.status, response.headers)
+                if response.status == 304 and reusable:
+                    return {'unchanged': True, 'entry': entry}
+                
+                body = await response.read()
+                body_hash = content_hash(body)
+                validators = {
+                    # 服务器不支持条件请求时，按内容哈希判断
+                    'unchanged': reusable and response.status == 200 and entry.content_hash == body_hash,
+                    'entry': entry,
+                    'status': response.status,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'content_hash': body_hash
+                }
+                if not validators['unchanged'] and self._fetcher and self.fetch_router.use_http(url):
+                    validators['result'] = self._fetcher.from_response(
+                        url, response.status, dict(response.headers),
+                        response.content_type, response.charset, body, str(response.url)
+                    )
+                return validators
+        except Exception as e:
+            logger.debug(f"条件请求失败，回退到浏览器抓取: {url} - {str(e)}")
+            return {'unchanged': False, 'entry': entry}
+
+    def _reuse_unchanged(self, url: str, entry) -> List[str]:
+        """复用未变化页面上次的处理结果，跳过渲染和后处理"""
+        record = PageRecord.from_dict(entry.record)
+        record.crawled_at = int(time.time())
+        record.unchanged = True
+        if url not in self.crawled_content:
+            self.add_result(record)
+        self.crawled_content[url] = record
+        self.stats['unchanged'] += 1
+        self.add_log(f'页面未变化，复用上次结果: {url}')
+        return entry.links
+
+    def _record_duplicate(self, url: str, record: PageRecord, original: str):
+        """登记近似重复的页面，记录中只有标题和对应的已抓取页面"""
+        if url not in self.crawled_content:
+            self.add_result(record)
+        self.crawled_content[url] = record
+        self.stats['duplicates'] += 1
+        self.add_log(f'近似重复页面: {url}（与 {original} 相近）')
+
+    def _on_page_done(self, frontier: CrawlFrontier, pipeline: CrawlPipeline, url: str):
+        """页面完成后更新统计和进度，页面可能乱序完成"""
+        self.stats['discovered'] = len(frontier.seen)
+        self.stats['crawled'] = len(self.results)
         
-        links = []
+        # 前沿仍在增长，进度按已知页面数估算并保持单调
+        progress = 10 + int((pipeline.pages_done / max(frontier.scheduled, 1)) * 80)
+        self.update_status(
+            'running',
+            max(self.progress, progress),
+            f'抓取中 ({pipeline.pages_done}/{frontier.scheduled}): {url}'
+        )
         
-        # 使用正则表达式提取链接
-        link_pattern = r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>([^<]*)</a>'
-        matches = re.findall(link_pattern, nav_content, re.IGNORECASE)
+        if self._checkpoint and self._checkpoint.due(CHECKPOINT_INTERVAL):
+            self._save_checkpoint()
+
+    def _create_frontier(self) -> CrawlFrontier:
+        """创建抓取前沿：bfs/dfs 决定出队顺序，其他策略仅抓取首页链接"""
+        config = self.config
+        strategy = config['crawl_strategy']
+        options = dict(
+            strategy=strategy if strategy in ('bfs', 'dfs') else 'bfs',
+            max_depth=config['max_depth'] if strategy in ('bfs', 'dfs') else 1,
+            max_pages=config['max_pages'],
+            canonicalizer=UrlCanonicalizer.from_config(config.get('url_rules'))
+        )
         
-        for href, text in matches:
-            if href and text.strip():
-                # 处理相对链接
-                full_url = urljoin(base_url, href)
-                
-                # 验证URL
-                if self._is_valid_url(full_url, base_url):
-                    links.append({
-                        'url': full_url,
-                        'title': text.strip(),
-                        'type': 'navigation'
-                    })
+        # 检查点只保存在磁盘前沿中：显式 frontier: "memory" 优先，checkpoint: true 时改用磁盘前沿，
+        # 其余任务只有达到磁盘前沿阈值时才使用磁盘前沿和检查点；恢复的任务总是从磁盘前沿继续
+        kind = 'disk' if self.resumed else config.get('frontier') or (
+            'disk' if config.get('checkpoint') or config['max_pages'] >= DISK_FRONTIER_MIN_PAGES else 'memory'
+        )
+        if kind != 'disk':
+            return CrawlFrontier(**options)
+        checkpoint = self.resumed or config.get('checkpoint', CHECKPOINT_INTERVAL > 0)
         
-        return links
+        path = checkpoint_path(self.task_id)
+        self.add_log(f'使用磁盘抓取前沿: {path}')
+        frontier = DiskFrontier(path, **options)
+        if checkpoint:
+            self._checkpoint = CrawlCheckpoint(frontier)
+        return frontier
+
+    def _restore_checkpoint(self):
+        """从检查点恢复统计和已产生的结果，已抓取的页面不再重新抓取"""
+        state = self._checkpoint.state()
+        self.results = [PageRecord.from_dict(record) for record in self._checkpoint.load_results()]
+        self.changes.restore(self.changes.bump(), len(self.results))
+        self.stats.update(state.get('stats', {}))
+        if state.get('start_time'):
+            self.start_time = datetime.fromisoformat(state['start_time'])
+        for record in self.results:
+            self.crawled_content[record['url']] = record
+            self._update_site_tree(record)
+        self.add_log(
+            f'从检查点恢复: 已抓取 {len(self.results)} 个页面，待抓取 {len(self.frontier)} 个URL'
+        )
 
-    def _is_valid_url(self, url: str, base_url: str) -> bool:
-        """验证URL是否有效"""
+    def _save_checkpoint(self):
+        """增量保存检查点：新增结果、前沿缓冲、正在抓取的URL和统计信息"""
+        in_flight = self._pipeline.active.items() if self._pipeline else ()
         try:
-            parsed = urlparse(url)
-            base_parsed = urlparse(base_url)
-            
-            # 必须是HTTP/HTTPS协议
-            if parsed.scheme not in ['http', 'https']:
-                return False
-            
-            # 必须是同一域名（内部链接）
-            if parsed.netloc != base_parsed.netloc:
-                return False
-            
-            return True
-        except:
-            return False
+            self._checkpoint.save(self.results, in_flight, {
+                'config': self.config,
+                'stats': self.stats,
+                'start_time': self.start_time.isoformat() if self.start_time else None,
+            })
+        except Exception as e:
+            self.add_log(f'保存检查点失败: {str(e)}', 'warning')
+
+    def _close_frontier(self, completed: bool):
+        """抓取完成后删除磁盘前沿；中断时保存最终检查点以便恢复"""
+        frontier = self.frontier
+        if not isinstance(frontier, DiskFrontier):
+            return
+        if self._checkpoint and not completed:
+            self._save_checkpoint()
+            frontier.close()
+            self.add_log(f'已保存检查点，可通过 /api/tasks/{self.task_id}/resume 继续')
+        else:
+            frontier.destroy()
+        self._checkpoint = None
+        self._pipeline = None
+
+    def generate_navigation_structure(self):
+        """生成导航结构：导航链接在抓取过程中已增量解析，这里只输出当前结构"""
+        self.update_status('running', 95, '生成导航结构...')
+        links = sorted(self.site_tree.navigation_links(), key=lambda x: x.get('title', ''))
+        # 页面列表一并保存，任务写入磁盘后由 SiteTree.from_navigation 重建完整结构
+        self.navigation = links + self.site_tree.pages()
+        self.add_log(f'生成导航结构完成，共 {len(links)} 个导航项')
+
+    def _configure_rate_limit(self):
+        """应用任务配置中目标站点的限速设置"""
+        rate_limit = self.config.get('rate_limit')
+        if rate_limit:
+            rate_limiter.configure_host(
+                host_of(self.config['start_url']),
+                rate=rate_limit.get('rate'),
+                burst=rate_limit.get('burst'),
+                stricter_only=True  # 限速器由所有任务共享，单个任务不能放宽其他任务的限速
+            )
+
+    def _create_browser_config(self) -> 'BrowserConfig':
+        """创建浏览器配置"""
+        return build_browser_config(self.config)
 
     def to_dict(self) -> Dict:
         """转换为字典"""
@@ -419,7 +692,7 @@ class CrawlerTask:
             'progress': self.progress,
             'status_text': self.status_text,
             'stats': self.stats,
-            'results': self.results,
+            'results': [dict(result) for result in self.results],
             'navigation': self.navigation,
             'error': self.error,
             'start_time': self.start_time.isoformat() if self.start_time else None,
@@ -427,29 +700,12 @@ class CrawlerTask:
         }
 
 
-def task_worker():
-    """任务工作线程"""
-    while True:
-        try:
-            task = task_queue.get(timeout=1)
-            if task is None:
-                break
-            
-            # 执行任务
-            asyncio.run(task.run())
-            
-            # 标记任务完成
-            task_queue.task_done()
-            
-        except queue.Empty:
-            continue
-        except Exception as e:
-            logger.error(f"任务工作线程错误: {str(e)}", exc_info=True)
-
-
-# 启动任务工作线程
-worker_thread = threading.Thread(target=task_worker, daemon=True)
-worker_thread.start()
+# 任务调度器：在爬虫事件循环上并发执行任务
+scheduler = TaskScheduler(
+    crawler_loop,
+    max_concurrent=int(os.environ.get('CRAWLER_MAX_TASKS', 2))
+)
+crawl_metrics.register_runtime(browser_pool=browser_pool, scheduler=scheduler, emitter=emitter)
 
 
 # Web 路由
@@ -476,10 +732,10 @@ def start_crawl():
         
         # 创建任务
         task = CrawlerTask(task_id, data)
-        tasks[task_id] = task
+        tasks.add(task)
         
-        # 添加到队列
-        task_queue.put(task)
+        # 提交到调度器
+        scheduler.submit(task)
         
         return jsonify({
             'success': True,
@@ -495,44 +751,122 @@ def start_crawl():
         }), 500
 
 
+@app.route('/api/tasks/<task_id>/resume', methods=['POST'])
+def resume_task(task_id):
+    """从最近一次检查点继续执行中断或失败的任务"""
+    task = tasks.get(task_id)
+    if task and task.status in ('pending', 'running'):
+        return jsonify({'success': False, 'error': '任务仍在执行'}), 409
+    
+    state = read_checkpoint_state(checkpoint_path(task_id))
+    if state is None:
+        return jsonify({'success': False, 'error': '没有可恢复的检查点'}), 404
+    
+    task = CrawlerTask(task_id, state['config'])
+    task.resumed = True
+    tasks.add(task)
+    scheduler.submit(task)
+    
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        'message': '任务已恢复'
+    })
+
+
+@app.route('/api/tasks/<task_id>/profile', methods=['POST'])
+def start_task_profile(task_id):
+    """对执行中的任务开始限时剖析，?seconds=&mode=cpu|alloc&format=collapsed|pstats&threads=loop|all"""
+    task = tasks.get(task_id)
+    if not task:
+        return jsonify({'error': '任务不存在'}), 404
+    if task.status not in ('pending', 'running'):
+        return jsonify({'error': '任务不在执行中'}), 409
+    
+    try:
+        capture = start_profile(task, request.args, crawler_loop, loop_thread.ident, MAX_PROFILE_SECONDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    
+    profiles.put(task_id, capture)
+    return jsonify(dict(capture.describe(), download=f'/api/tasks/{task_id}/profile')), 202
+
+
+@app.route('/api/tasks/<task_id>/profile')
+def get_task_profile(task_id):
+    """剖析进行中返回进度，完成后下载剖析文件"""
+    return profile_response(profiles.get(task_id), f'/api/tasks/{task_id}/profile')
+
+
+@app.route('/api/tasks/<task_id>/profile', methods=['DELETE'])
+def stop_task_profile(task_id):
+    """提前结束剖析"""
+    capture = profiles.get(task_id)
+    if capture is None:
+        return jsonify({'error': '任务没有剖析记录'}), 404
+    
+    capture.stop()
+    return jsonify(capture.describe())
+
+
 @app.route('/api/status/<task_id>')
 def get_task_status(task_id):
-    """获取任务状态"""
+    """获取任务状态，?since=<version> 时附带该版本之后新增的结果和日志"""
     task = tasks.get(task_id)
     if not task:
         return jsonify({'error': '任务不存在'}), 404
     
-    return jsonify(task.to_dict())
+    return status_response(task, request.args, request.headers.get('If-None-Match', ''))
 
 
 @app.route('/api/results/<task_id>')
 def get_task_results(task_id):
-    """获取任务结果"""
+    """获取任务结果，支持 ?after=&limit= 游标分页和 NDJSON 流式输出"""
     task = tasks.get(task_id)
     if not task:
         return jsonify({'error': '任务不存在'}), 404
     
-    return jsonify({
-        'results': task.results,
-        'navigation': task.navigation,
-        'stats': task.stats
-    })
+    return results_response(task, request.args, request.headers.get('Accept', ''))
+
+
+@app.route('/api/results/<task_id>/<int:seq>/<name>')
+def get_result_body(task_id, seq, name):
+    """从内容存储中流式输出第 seq 条结果的正文、Markdown、截图或 PDF"""
+    task = tasks.get(task_id)
+    if not task:
+        return jsonify({'error': '任务不存在'}), 404
+    
+    return body_response(task, seq, name, blob_store)
+
+
+@app.route('/api/tasks/<task_id>/navigation')
+def get_task_navigation(task_id):
+    """获取任务当前的站点结构，抓取过程中也可调用"""
+    task = tasks.get(task_id)
+    if not task:
+        return jsonify({'error': '任务不存在'}), 404
+    
+    return navigation_response(task, task.config.get('start_url', ''))
+
+
+@app.route('/api/scheduler')
+def get_scheduler_stats():
+    """获取调度器状态"""
+    return jsonify(scheduler.stats())
+
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus 格式的抓取指标"""
+    return metrics_response(crawl_metrics.registry)
 
 
 @app.route('/api/tasks')
 def list_tasks():
     """列出所有任务"""
-    task_list = []
-    for task_id, task in tasks.items():
-        task_list.append({
-            'task_id': task_id,
-            'status': task.status,
-            'progress': task.progress,
-            'stats': task.stats,
-            'start_time': task.start_time.isoformat() if task.start_time else None
-        })
-    
-    return jsonify(task_list)
+    return jsonify(tasks.summaries())
 
 
 # WebSocket 事件处理
@@ -548,5 +882,24 @@ def handle_disconnect():
     logger.info('客户端已断开连接')
 
 
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """订阅任务房间，只接收该任务的事件"""
+    task_id = (data or {}).get('task_id')
+    if task_id not in tasks:
+        emit('subscribe_error', {'task_id': task_id, 'error': '任务不存在'})
+        return
+    join_room(task_id)
+    emit('subscribed', {'task_id': task_id})
+
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """退订任务房间"""
+    task_id = (data or {}).get('task_id')
+    if task_id:
+        leave_room(task_id)
+
+
 if __name__ == '__main__':
     socketio.run(app, host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
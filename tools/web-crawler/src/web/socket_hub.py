@@ -0,0 +1,131 @@
+"""
+Socket.IO 推送
+按任务房间缓冲事件，由后台任务按固定频率批量推送：
+进度更新只推送最新值，日志和结果合并为批次，爬虫协程只写缓冲区、从不等待客户端
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _RoomBuffer:
+    """单个任务房间待推送的事件"""
+
+    __slots__ = ('status', 'logs', 'results')
+
+    def __init__(self, max_events: int):
+        self.status = None
+        self.logs: Deque[Dict] = deque(maxlen=max_events)
+        self.results: Deque[Dict] = deque(maxlen=max_events)
+
+
+class TaskEventEmitter:
+    """按任务房间合并、限频的 Socket.IO 推送器
+
+    - task_update：只保留每个任务最新的一次
+    - log_batch / result_batch：每次刷新合并成一条消息
+    - 每个房间的日志和结果各最多缓冲 max_room_events 条，超出时丢弃最旧的
+    - 所有房间待推送事件超过 max_pending 时先丢弃最旧的日志，再丢弃最旧的结果；
+      结果带连续的 seq，客户端发现缺口时通过状态接口的 since 补齐
+    """
+
+    def __init__(self, socketio, flush_interval: float = 0.25, max_pending: int = 10000,
+                 max_room_events: int = 2000):
+        self.socketio = socketio
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_room_events = max_room_events
+
+        self._rooms: Dict[str, _RoomBuffer] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._started = False
+        self.emitted = 0
+        self.dropped = 0
+
+    def emit_status(self, task_id: str, payload: Dict):
+        """进度更新，同一刷新周期内只推送最新值"""
+        with self._lock:
+            room = self._room(task_id)
+            if room.status is None:
+                self._pending += 1
+            room.status = payload
+        self._ensure_started()
+
+    def emit_log(self, task_id: str, entry: Dict):
+        with self._lock:
+            self._append(self._room(task_id).logs, entry)
+        self._ensure_started()
+
+    def emit_result(self, task_id: str, seq: int, result: Dict):
+        with self._lock:
+            self._append(self._room(task_id).results, {'seq': seq, 'result': result})
+        self._ensure_started()
+
+    @property
+    def backlog(self) -> int:
+        """待推送的事件数"""
+        return self._pending
+
+    def flush(self):
+        """推送所有缓冲的事件"""
+        with self._lock:
+            rooms, self._rooms = self._rooms, {}
+            self._pending = 0
+
+        for task_id, room in rooms.items():
+            try:
+                if room.status is not None:
+                    self.socketio.emit('task_update', room.status, to=task_id)
+                if room.logs:
+                    self.socketio.emit('log_batch', {'task_id': task_id, 'logs': list(room.logs)}, to=task_id)
+                if room.results:
+                    self.socketio.emit('result_batch', {'task_id': task_id, 'results': list(room.results)}, to=task_id)
+                self.emitted += (room.status is not None) + len(room.logs) + len(room.results)
+            except Exception as e:
+                logger.warning(f"推送任务 {task_id} 事件失败: {str(e)}")
+
+    def _room(self, task_id: str) -> _RoomBuffer:
+        room = self._rooms.get(task_id)
+        if room is None:
+            room = _RoomBuffer(self.max_room_events)
+            self._rooms[task_id] = room
+        return room
+
+    def _append(self, events: Deque[Dict], event: Dict):
+        if len(events) == events.maxlen:
+            self.dropped += 1  # deque 自动丢弃最旧的一条，待推送数不变
+        else:
+            self._pending += 1
+        events.append(event)
+        if self._pending > self.max_pending:
+            self._trim()
+
+    def _trim(self):
+        for attribute in ('logs', 'results'):
+            for room in self._rooms.values():
+                events = getattr(room, attribute)
+                while events and self._pending > self.max_pending:
+                    events.popleft()
+                    self._pending -= 1
+                    self.dropped += 1
+                if self._pending <= self.max_pending:
+                    return
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.socketio.start_background_task(self._flush_loop)
+
+    def _flush_loop(self):
+        while True:
+            self.socketio.sleep(self.flush_interval)
+            self.flush()
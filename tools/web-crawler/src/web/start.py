@@ -3,35 +3,24 @@
 智能网站爬虫 Web 版启动脚本 v2.1.0
 """
 
+import importlib.util
 import sys
-import subprocess
-import os
-from pathlib import Path
+
 
 def check_dependencies():
-    """检查依赖是否安装"""
+    """检查依赖是否安装，只查找模块而不导入"""
     required_packages = [
-        'flask',
-        'flask_cors', 
-        'flask_socketio',
-        'crawl4ai',
-        'beautifulsoup4'
+        ('flask', 'flask'),
+        ('flask-cors', 'flask_cors'),
+        ('flask-socketio', 'flask_socketio'),
+        ('crawl4ai', 'crawl4ai'),
+        ('beautifulsoup4', 'bs4')
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            if package == 'flask_cors':
-                __import__('flask_cors')
-            elif package == 'flask_socketio':
-                __import__('flask_socketio')
-            elif package == 'beautifulsoup4':
-                __import__('bs4')
-            else:
-                __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    missing_packages = [
+        package for package, module in required_packages
+        if importlib.util.find_spec(module) is None
+    ]
     
     if missing_packages:
         print("❌ 缺少以下依赖包:")
@@ -44,8 +33,8 @@ def check_dependencies():
     
     return True
 
-def start_server():
-    """启动服务器"""
+def start_server(host: str = '0.0.0.0', port: int = 5000):
+    """在当前进程中启动服务器"""
     print("🚀 启动智能网站爬虫 Web 服务器...")
     
     # 检查基础依赖
@@ -54,21 +43,27 @@ def start_server():
     
     # 启动服务器
     try:
-        from .server import app, socketio
+        from .server import app, socketio, start_browser_pool, stop_browser_pool
+        
+        # 预热浏览器池，任务开始时无需等待浏览器启动
+        print("\n🧭 预热浏览器池...")
+        start_browser_pool()
+        
         print("\n🌐 服务器信息:")
-        print("📱 Web界面: http://localhost:5000")
-        print("🔌 API接口: http://localhost:5000/api/tasks")
+        print(f"📱 Web界面: http://localhost:{port}")
+        print(f"🔌 API接口: http://localhost:{port}/api/tasks")
         print("💡 提示: 按 Ctrl+C 停止服务器")
         
-        socketio.run(app, host='0.0.0.0', port=5000, debug=False)
+        socketio.run(app, host=host, port=port, debug=False)
         
     except KeyboardInterrupt:
+        stop_browser_pool()
         print("\n👋 服务器已停止")
     except Exception as e:
         print(f"❌ 启动失败: {e}")
         print("\n🔧 故障排除:")
         print("   1. 确保所有依赖已安装: pip install -r requirements.txt")
-        print("   2. 检查端口5000是否被占用")
+        print(f"   2. 检查端口{port}是否被占用")
         print("   3. 确保server.py文件存在且无语法错误")
         sys.exit(1)
 
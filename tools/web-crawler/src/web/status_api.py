@@ -0,0 +1,112 @@
+"""
+状态接口
+轻量的任务状态文档：只包含计数、进度和单调递增的版本号，
+?since=<version> 时附带该版本之后新增的结果和日志，并支持 ETag/304
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+MAX_LOG_ENTRIES = 1000
+
+
+class TaskChangeLog:
+    """记录任务的版本号，以及每条结果、日志产生时的版本
+
+    结果本身仍保存在任务的 results 列表中，这里只记录每条结果对应的版本，
+    日志保留最近 MAX_LOG_ENTRIES 条。
+    """
+
+    def __init__(self, max_logs: int = MAX_LOG_ENTRIES):
+        self.version = 0
+        self._result_versions: List[int] = []
+        self._logs: Deque[Tuple[int, Dict]] = deque(maxlen=max_logs)
+
+    def bump(self) -> int:
+        """任务状态发生变化"""
+        self.version += 1
+        return self.version
+
+    def record_result(self) -> int:
+        """任务新增一条结果（在结果追加到 results 之后调用），返回结果序号"""
+        self._result_versions.append(self.bump())
+        return len(self._result_versions)
+
+    def record_log(self, entry: Dict):
+        """任务新增一条日志"""
+        self._logs.append((self.bump(), entry))
+
+    def result_range_since(self, version: int) -> Tuple[int, int]:
+        """返回 version 之后新增结果在 results 中的下标范围 [start, end)"""
+        end = len(self._result_versions)
+        start = bisect_right(self._result_versions, version, 0, end)
+        return start, end
+
+    def restore(self, version: int, result_count: int):
+        """从磁盘恢复任务时设置版本号，已有的结果都记为该版本产生"""
+        self.version = version
+        self._result_versions = [version] * result_count
+
+    def logs_since(self, version: int) -> List[Dict]:
+        """返回 version 之后新增的日志"""
+        entries = []
+        for entry_version, entry in reversed(self._logs):
+            if entry_version <= version:
+                break
+            entries.append(entry)
+        entries.reverse()
+        return entries
+
+
+def status_document(task) -> Dict:
+    """任务的轻量状态文档"""
+    link_filter = getattr(task, 'link_filter', None)
+    fetch_router = getattr(task, 'fetch_router', None)
+    return {
+        'task_id': task.task_id,
+        'status': task.status,
+        'progress': task.progress,
+        'status_text': task.status_text,
+        'stats': task.stats,
+        'error': task.error,
+        'start_time': task.start_time.isoformat() if task.start_time else None,
+        'end_time': task.end_time.isoformat() if task.end_time else None,
+        'version': task.changes.version,
+        'result_count': len(task.results),
+        'link_filter': link_filter.stats() if link_filter else None,
+        'fetch': fetch_router.stats() if fetch_router else None,
+    }
+
+
+def status_response(task, args, if_none_match: str = ''):
+    """生成状态响应
+
+    ETag 只由任务 ID 和版本号决定：客户端带上次响应的 ETag 轮询时，
+    版本号未变化即返回 304，不论 since 是否随之前进。
+    """
+    from flask import jsonify
+
+    version = task.changes.version
+    since = args.get('since')
+    etag = f'W/"{task.task_id}-{version}"'
+    if if_none_match and etag in if_none_match:
+        return '', 304, {'ETag': etag}
+
+    document = status_document(task)
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'since 必须为整数版本号'}), 400
+
+        start, end = task.changes.result_range_since(since)
+        document['results'] = [
+            dict(task.results[index], seq=index + 1) for index in range(start, end)
+        ]
+        document['logs'] = task.changes.logs_since(since)
+
+    response = jsonify(document)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,372 @@
+"""
+任务注册表
+限制内存中保留的任务数量和结果总大小，已结束的任务按 TTL 和 LRU 淘汰到磁盘，
+再次访问时透明地从磁盘加载
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from ..utils.blob_store import GC_MIN_AGE_SECONDS, body_keys
+from .status_api import TaskChangeLog
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('completed', 'failed')
+SPILL_SUFFIX = '.ndjson.gz'
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def task_summary(task) -> Dict:
+    """任务列表中展示的摘要"""
+    return {
+        'task_id': task.task_id,
+        'status': task.status,
+        'progress': task.progress,
+        'stats': task.stats,
+        'start_time': _isoformat(task.start_time),
+    }
+
+
+class SpilledTask:
+    """从磁盘加载的已结束任务，提供与 CrawlerTask 相同的只读字段"""
+
+    def __init__(self, header: Dict, results: List[Dict]):
+        self.task_id = header['task_id']
+        self.config = header.get('config', {})
+        self.status = header['status']
+        self.progress = header['progress']
+        self.status_text = header['status_text']
+        self.stats = header['stats']
+        self.error = header.get('error')
+        self.start_time = _parse_time(header.get('start_time'))
+        self.end_time = _parse_time(header.get('end_time'))
+        self.navigation = header.get('navigation', [])
+        self.results = results
+        self.changes = TaskChangeLog()
+        self.changes.restore(header.get('version', 0), len(results))
+
+
+class TaskRegistry:
+    """有界任务注册表
+
+    - 运行中和排队中的任务始终保留在内存中
+    - 已结束超过 ttl_seconds 的任务被淘汰
+    - 任务数超过 max_tasks 或已结束任务的结果总大小超过 max_result_bytes 时，
+      按最近最少使用的顺序淘汰已结束任务
+    - 淘汰的任务写入 spill_dir 下的 gzip 压缩 NDJSON 文件：首行为任务信息，之后每行一条结果，
+      超过 spill_retention_seconds 的文件由 sweep() 删除（0 表示一直保留）
+    - 指定 blob_store 时，sweep() 删除磁盘任务文件后回收不再被引用的页面内容：
+      仍被引用的内容来自内存中的任务、磁盘上的任务文件和 blob_refs() 返回的其他引用（验证器缓存、检查点等）
+
+    锁只保护内存中的索引：结果大小的统计和磁盘读写都在锁外进行，不阻塞其他读取者。
+    """
+
+    def __init__(
+        self,
+        spill_dir,
+        max_tasks: int = 100,
+        max_result_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        spill_retention_seconds: float = 7 * 24 * 3600,
+        blob_store=None,
+        blob_refs: Optional[Callable[[], Iterable[str]]] = None,
+        blob_min_age_seconds: float = GC_MIN_AGE_SECONDS,
+    ):
+        self.spill_dir = Path(spill_dir)
+        self.max_tasks = max_tasks
+        self.max_result_bytes = max_result_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_retention_seconds = spill_retention_seconds
+        self.blob_store = blob_store
+        self.blob_refs = blob_refs
+        self.blob_min_age_seconds = blob_min_age_seconds
+
+        self._tasks: "OrderedDict[str, object]" = OrderedDict()
+        self._result_bytes: Dict[str, int] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._spilled: Dict[str, Dict] = {}
+        self._spilling: Set[str] = set()
+        self._lock = threading.RLock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        self.spill_count = 0
+        self.load_count = 0
+        self.expired_count = 0
+        self.collected_blobs = 0
+
+        self._scan_spill_dir()
+
+    def add(self, task):
+        """注册新任务，替换同ID的旧任务（例如从检查点恢复的任务）"""
+        with self._lock:
+            if self._spilled.pop(task.task_id, None) is not None:
+                self._path(task.task_id).unlink(missing_ok=True)
+            self._result_bytes.pop(task.task_id, None)
+            self._finished_at.pop(task.task_id, None)
+            self._tasks[task.task_id] = task
+            self._tasks.move_to_end(task.task_id)
+        self.enforce()
+
+    def get(self, task_id: str):
+        """获取任务，已淘汰的任务从磁盘重新加载"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                self._tasks.move_to_end(task_id)
+                return task
+            if task_id not in self._spilled:
+                return None
+
+        loaded = self._load(task_id)
+        if loaded is None:
+            return None
+        size = sum(len(_dumps(r)) for r in loaded.results)
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                # 其他线程没有同时加载或替换该任务
+                if self._spilled.pop(task_id, None) is None:
+                    return None
+                task = self._tasks[task_id] = loaded
+                self._finished_at[task_id] = time.monotonic()
+                self._result_bytes[task_id] = size
+                self.load_count += 1
+            self._tasks.move_to_end(task_id)
+        self.enforce(keep=task_id)
+        return task
+
+    def __contains__(self, task_id) -> bool:
+        with self._lock:
+            return task_id in self._tasks or task_id in self._spilled
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks) + len(self._spilled)
+
+    def summaries(self) -> List[Dict]:
+        """所有任务（包括已淘汰到磁盘的任务）的摘要"""
+        self.enforce()
+        with self._lock:
+            summaries = [task_summary(task) for task in self._tasks.values()]
+            summaries.extend(self._spilled.values())
+        summaries.sort(key=lambda item: item['start_time'] or '')
+        return summaries
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'in_memory': len(self._tasks),
+                'spilled': len(self._spilled),
+                'result_bytes': sum(self._result_bytes.values()),
+                'spill_count': self.spill_count,
+                'load_count': self.load_count,
+                'expired_count': self.expired_count,
+                'collected_blobs': self.collected_blobs,
+            }
+
+    def enforce(self, keep: Optional[str] = None):
+        """按 TTL、任务数和结果大小淘汰已结束的任务"""
+        with self._lock:
+            now = time.monotonic()
+            unsized = []
+            for task_id, task in self._tasks.items():
+                if task.status in FINISHED_STATUSES and task_id not in self._finished_at:
+                    self._finished_at[task_id] = now
+                    unsized.append((task_id, task))
+
+        # 已结束任务的结果不再变化，在锁外统计大小
+        sizes = {task_id: sum(len(_dumps(dict(r))) for r in task.results) for task_id, task in unsized}
+
+        with self._lock:
+            for task_id, task in unsized:
+                if self._tasks.get(task_id) is task:
+                    self._result_bytes[task_id] = sizes[task_id]
+
+            # OrderedDict 按最近访问排序，靠前的是最久未使用的任务；
+            # 选出淘汰的任务后按淘汰后的数量和大小继续判断
+            count = len(self._tasks) - len(self._spilling)
+            total = sum(size for task_id, size in self._result_bytes.items() if task_id not in self._spilling)
+            victims = []
+            for task_id, task in self._tasks.items():
+                if (task.status not in FINISHED_STATUSES or task_id == keep
+                        or task_id in self._spilling or task_id not in self._result_bytes):
+                    continue
+                expired = now - self._finished_at[task_id] > self.ttl_seconds
+                if expired or count > self.max_tasks or total > self.max_result_bytes:
+                    victims.append((task_id, task))
+                    self._spilling.add(task_id)
+                    count -= 1
+                    total -= self._result_bytes[task_id]
+
+        for task_id, task in victims:
+            self._spill(task_id, task)
+
+    def sweep(self):
+        """淘汰过期任务，删除超过保留时间的磁盘任务文件，并回收这些任务独占的页面内容"""
+        self.enforce()
+        if not self.spill_retention_seconds or not self.spill_dir.exists():
+            return
+        cutoff = time.time() - self.spill_retention_seconds
+        expired = 0
+        for path in self.spill_dir.glob('*' + SPILL_SUFFIX):
+            task_id = path.name[:-len(SPILL_SUFFIX)]
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            with self._lock:
+                if task_id in self._tasks or task_id in self._spilling:
+                    continue
+                self._spilled.pop(task_id, None)
+                self.expired_count += 1
+            path.unlink(missing_ok=True)
+            expired += 1
+
+        if expired and self.blob_store is not None:
+            self.collect_blobs()
+
+    def collect_blobs(self) -> int:
+        """删除内容存储中不再被任何任务或 blob_refs() 引用的内容，返回删除的文件数"""
+        try:
+            live = set(self._live_blob_keys())
+        except Exception as e:
+            # 引用统计不完整时不能删除任何内容
+            logger.error(f"统计页面内容引用失败，跳过回收: {str(e)}")
+            return 0
+        removed = self.blob_store.gc(live, self.blob_min_age_seconds)
+        with self._lock:
+            self.collected_blobs += removed
+        if removed:
+            logger.info(f"回收了 {removed} 个不再被引用的页面内容")
+        return removed
+
+    def start_sweeper(self, interval: float = 60):
+        """启动后台线程，每 interval 秒执行一次 sweep()"""
+        if self._sweeper is not None or interval <= 0:
+            return
+
+        def run():
+            while not self._stop_sweeper.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"清理任务失败: {str(e)}", exc_info=True)
+
+        self._sweeper = threading.Thread(target=run, name='task-registry-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        self._sweeper = None
+
+    def _spill(self, task_id: str, task):
+        """在锁外把任务写入磁盘，写入成功后再从内存中移除"""
+        header = {
+            'task_id': task.task_id,
+            'config': getattr(task, 'config', {}),
+            'status': task.status,
+            'progress': task.progress,
+            'status_text': task.status_text,
+            'stats': task.stats,
+            'error': task.error,
+            'start_time': _isoformat(task.start_time),
+            'end_time': _isoformat(task.end_time),
+            'navigation': task.navigation,
+            'version': task.changes.version,
+        }
+
+        path = self._path(task_id)
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.tmp')
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(_dumps(header) + '\n')
+                for result in task.results:
+                    f.write(_dumps(dict(result)) + '\n')
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.error(f"任务 {task_id} 写入磁盘失败，保留在内存中: {str(e)}")
+            with self._lock:
+                self._spilling.discard(task_id)
+            return
+
+        with self._lock:
+            self._spilling.discard(task_id)
+            if self._tasks.get(task_id) is not task:
+                # 写入期间同ID的任务被替换（例如从检查点恢复），磁盘上的旧任务作废
+                path.unlink(missing_ok=True)
+                return
+            del self._tasks[task_id]
+            self._result_bytes.pop(task_id, None)
+            self._finished_at.pop(task_id, None)
+            self._spilled[task_id] = task_summary(task)
+            self.spill_count += 1
+
+    def _live_blob_keys(self) -> Iterator[str]:
+        with self._lock:
+            results = [task.results for task in self._tasks.values()]
+        for task_results in results:
+            yield from body_keys(list(task_results))
+
+        # 写入中的任务仍在内存中，已被上面统计
+        for path in self.spill_dir.glob('*' + SPILL_SUFFIX):
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    f.readline()
+                    yield from body_keys(json.loads(line) for line in f)
+            except FileNotFoundError:
+                continue  # 已被 sweep() 删除
+
+        if self.blob_refs is not None:
+            yield from self.blob_refs()
+
+    def _load(self, task_id: str) -> Optional[SpilledTask]:
+        try:
+            with gzip.open(self._path(task_id), 'rt', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                results = [json.loads(line) for line in f]
+        except Exception as e:
+            logger.error(f"加载任务 {task_id} 失败: {str(e)}")
+            return None
+        return SpilledTask(header, results)
+
+    def _scan_spill_dir(self):
+        """启动时读取磁盘上已淘汰任务的摘要"""
+        if not self.spill_dir.exists():
+            return
+        for path in self.spill_dir.glob('*' + SPILL_SUFFIX):
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    header = json.loads(f.readline())
+                self._spilled[header['task_id']] = {
+                    'task_id': header['task_id'],
+                    'status': header['status'],
+                    'progress': header['progress'],
+                    'stats': header['stats'],
+                    'start_time': header.get('start_time'),
+                }
+            except Exception as e:
+                logger.warning(f"跳过无法读取的任务文件 {path.name}: {str(e)}")
+
+    def _path(self, task_id: str) -> Path:
+        return self.spill_dir / f'{task_id}{SPILL_SUFFIX}'
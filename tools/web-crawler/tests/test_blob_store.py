@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+内容寻址存储测试
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.blob_store import BlobStore, body_keys
+from src.utils.page_record import PageRecord
+
+
+def test_identical_bodies_are_stored_once(tmp_path):
+    """相同内容在任务内和任务间（共用目录的不同实例）只保存一份"""
+    footer = '<footer>版权所有</footer>' * 200
+    first = BlobStore(tmp_path)
+    ref = first.put(footer)
+    assert first.put(footer.encode('utf-8')) == ref
+    assert BlobStore(tmp_path).put(footer) == ref
+
+    files = [path for path in tmp_path.rglob('*') if path.is_file()]
+    assert len(files) == 1
+    assert files[0].stat().st_size < len(footer.encode('utf-8')) // 10
+    assert first.stats()['writes'] == 1
+    assert first.stats()['dedup_hits'] == 1
+
+
+def test_stream_chunks(tmp_path):
+    """按块解压读取，拼接后与原内容一致；未压缩内容原样保存"""
+    store = BlobStore(tmp_path)
+    data = bytes(range(256)) * 1000
+    ref = store.put(data)
+    chunks = list(store.iter_chunks(ref['key'], chunk_size=4096))
+    assert len(chunks) > 1
+    assert b''.join(chunks) == data
+    assert ref['size'] == len(data)
+
+    png = b'\x89PNG\r\n\x1a\n' + bytes(100)
+    raw_ref = store.put(png, compress=False)
+    assert (tmp_path / raw_ref['key'][:2] / raw_ref['key']).read_bytes() == png
+    assert store.get(raw_ref['key']) == png
+
+
+def test_missing_or_invalid_key(tmp_path):
+    store = BlobStore(tmp_path)
+    assert '0' * 64 not in store
+    assert '../etc/passwd' not in store
+    with pytest.raises(KeyError):
+        store.get('0' * 64)
+
+
+def test_gc_removes_unreferenced_old_blobs(tmp_path):
+    """gc() 只删除不在引用集合中且超过最短保留时间的内容，复用内容会重新计时"""
+    store = BlobStore(tmp_path)
+    live = store.put('<p>仍被引用</p>')
+    dead = store.put('<p>不再引用</p>')
+    fresh = store.put('<p>刚写入</p>')
+    reused = store.put('<p>刚被复用</p>')
+    stale_tmp = tmp_path / live['key'][:2] / 'partial.tmp'
+    stale_tmp.write_bytes(b'x')
+
+    past = time.time() - 7200
+    for path in [stale_tmp] + [store._find(ref['key']) for ref in (live, dead, reused)]:
+        os.utime(path, (past, past))
+    store.put('<p>刚被复用</p>')
+
+    records = [{'bodies': {'html': live}}, {'title': '没有正文'}]
+    assert list(body_keys(records)) == [live['key']]
+    assert store.gc(set(body_keys(records)), min_age_seconds=3600) == 2
+    assert live['key'] in store and fresh['key'] in store and reused['key'] in store
+    assert dead['key'] not in store and not stale_tmp.exists()
+    assert store.stats()['collected'] == 2
+
+
+def test_page_record_keeps_only_reference(tmp_path):
+    """指定内容存储时，结果中只保留正文的引用"""
+    store = BlobStore(tmp_path)
+    html = '<main>' + 'content ' * 2000 + '</main>'
+    result = SimpleNamespace(
+        url='https://example.com/a', metadata={}, cleaned_html=html,
+        extracted_content=None, links=None, success=True,
+    )
+    record = PageRecord.from_crawl_result(result, store)
+    data = dict(record)
+    assert 'content' not in data
+    assert data['word_count'] == len(html.split())
+    assert store.get(data['bodies']['html']['key']).decode('utf-8') == html
+    assert dict(PageRecord.from_dict(data)) == data
+
+
+def test_body_response_streams_from_store(tmp_path):
+    """结果接口按引用流式输出内容"""
+    pytest.importorskip('flask')
+    from flask import Flask
+    from src.web.results_api import body_response
+
+    store = BlobStore(tmp_path)
+    markdown = '# 标题\n\n正文'
+    task = SimpleNamespace(results=[{'url': 'https://example.com', 'bodies': {'markdown': store.put(markdown)}}])
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = body_response(task, 1, 'markdown', store)
+        assert response.mimetype == 'text/markdown'
+        assert b''.join(response.response).decode('utf-8') == markdown
+        assert body_response(task, 1, 'pdf', store)[1] == 404
+        assert body_response(task, 2, 'markdown', store)[1] == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
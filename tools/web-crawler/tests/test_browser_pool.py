@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+浏览器池测试
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.browser_pool import BrowserPool
+
+
+class FakeCrawler:
+    """模拟 AsyncWebCrawler，只记录启动和关闭"""
+
+    def __init__(self, config):
+        self.config = config
+        self.started = False
+        self.closed = False
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed = True
+
+
+def make_config(headless=True, width=1280):
+    return SimpleNamespace(browser_type='chromium', headless=headless, viewport_width=width)
+
+
+def make_pool(**kwargs):
+    kwargs.setdefault('health_check_interval', 0)
+    return BrowserPool(crawler_factory=FakeCrawler, **kwargs)
+
+
+def test_compatible_configs_share_browser():
+    """兼容配置的多个阶段复用同一个浏览器"""
+    async def scenario():
+        pool = make_pool()
+        async with pool.lease(make_config()) as first:
+            pass
+        async with pool.lease(make_config()) as second:
+            pass
+        assert first.crawler is second.crawler
+        assert pool.launched == 1
+
+    asyncio.run(scenario())
+
+
+def test_incompatible_configs_use_separate_browsers():
+    """不兼容的配置使用不同的浏览器"""
+    async def scenario():
+        pool = make_pool()
+        async with pool.lease(make_config(headless=True)) as first:
+            async with pool.lease(make_config(headless=False)) as second:
+                assert first.crawler is not second.crawler
+        assert pool.stats()['browsers'] == 2
+
+    asyncio.run(scenario())
+
+
+def test_browser_recycled_after_page_limit():
+    """浏览器抓取页面数达到上限后被回收"""
+    async def scenario():
+        pool = make_pool(max_pages_per_browser=3)
+        async with pool.lease(make_config()) as lease:
+            lease.record_pages(3)
+            old_crawler = lease.crawler
+        assert old_crawler.closed
+        async with pool.lease(make_config()) as lease:
+            assert lease.crawler is not old_crawler
+        assert pool.recycled == 1
+
+    asyncio.run(scenario())
+
+
+def test_long_lease_retires_browser_at_page_limit():
+    """长期租约中达到页数上限时，新租约改用新浏览器，旧浏览器在租约结束后关闭"""
+    async def scenario():
+        pool = make_pool(max_pages_per_browser=3)
+        async with pool.lease(make_config()) as long_lease:
+            long_lease.record_pages(3)
+            async with pool.lease(make_config()) as other:
+                assert other.crawler is not long_lease.crawler
+            assert not long_lease.crawler.closed
+        assert long_lease.crawler.closed
+        assert pool.launched == 2 and pool.recycled == 1
+
+    asyncio.run(scenario())
+
+
+def test_eviction_counted_and_awaited():
+    """池满时淘汰其他配置的空闲浏览器计入回收数，关闭浏览器池时等待关闭完成"""
+    async def scenario():
+        pool = make_pool(max_browsers=1)
+        async with pool.lease(make_config(width=800)) as first:
+            pass
+        async with pool.lease(make_config(width=1024)):
+            pass
+        await pool.close()
+        assert first.crawler.closed
+        assert pool.recycled == 1
+
+    asyncio.run(scenario())
+
+
+def test_full_pool_waits_for_release():
+    """池满且无空闲浏览器时，新租约等待释放"""
+    async def scenario():
+        pool = make_pool(max_browsers=1)
+        order = []
+
+        async def hold():
+            async with pool.lease(make_config(width=800)):
+                order.append('hold')
+                await asyncio.sleep(0.05)
+            order.append('released')
+
+        async def wait():
+            await asyncio.sleep(0.01)
+            async with pool.lease(make_config(width=1024)):
+                order.append('acquired')
+
+        await asyncio.gather(hold(), wait())
+        assert order == ['hold', 'released', 'acquired']
+        assert pool.stats()['browsers'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_browser_crashed_during_lease_is_not_reused():
+    """租用期间断开的浏览器在租约结束时回收，新租约使用新浏览器"""
+    async def scenario():
+        pool = make_pool()
+        try:
+            async with pool.lease(make_config()) as lease:
+                lease.crawler.ready = False
+                raise RuntimeError('Browser has been closed')
+        except RuntimeError:
+            pass
+        crashed = lease.crawler
+        assert crashed.closed
+        async with pool.lease(make_config()) as lease:
+            assert lease.crawler is not crashed
+        assert pool.stats()['unhealthy'] == 1 and pool.recycled == 1
+
+    asyncio.run(scenario())
+
+
+def test_memory_sampled_once_per_health_interval(monkeypatch):
+    """指标抓取读取缓存的内存值，健康检查时重新采样"""
+    samples = []
+
+    def read():
+        samples.append(1)
+        return float(len(samples))
+
+    async def scenario():
+        pool = make_pool(health_check_interval=60, max_memory_mb=1000)
+        monkeypatch.setattr(pool, '_read_memory_mb', read)
+        assert pool.stats()['memory_mb'] == 1.0
+        assert pool.memory_usage_mb() == 1.0
+        async with pool.lease(make_config()):
+            pass
+        assert len(samples) == 1
+
+        await pool.check_health()
+        assert pool.stats()['memory_mb'] == 2.0 and len(samples) == 2
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
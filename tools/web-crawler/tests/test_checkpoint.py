@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+任务检查点测试
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.checkpoint import CrawlCheckpoint, read_checkpoint_records, read_checkpoint_state
+from src.utils.disk_frontier import DiskFrontier
+from src.utils.pipeline import CrawlPipeline
+
+BASE = 'https://example.com'
+
+
+class Killed(Exception):
+    """模拟进程被杀死"""
+
+
+def links_of(url):
+    """模拟站点：每个页面链接到 3 个子页面，最大深度 5 时共 364 个页面"""
+    path = url[len(BASE):].rstrip('/')
+    return [f'{BASE}{path}/{i}' for i in range(3)]
+
+
+def run_crawl(path, results, fetched, strategy='bfs', stop_after=None, checkpoint_every=10):
+    """运行抓取，stop_after 页后模拟进程被杀死（不保存最终检查点）"""
+    frontier = DiskFrontier(path, strategy=strategy, max_depth=5, max_pages=10000, batch_size=32)
+    checkpoint = CrawlCheckpoint(frontier)
+    done_urls = {record['url'] for record in results}
+    pipeline = None
+
+    async def crawl_page(url, depth):
+        fetched.append(url)
+        await asyncio.sleep(0)
+        if url not in done_urls:
+            done_urls.add(url)
+            results.append({'url': url, 'depth': depth})
+        return links_of(url)
+
+    def on_page_done(url):
+        if pipeline.pages_done % checkpoint_every == 0:
+            checkpoint.save(results, pipeline.active.items(), {'config': {'start_url': BASE}})
+        if stop_after and pipeline.pages_done >= stop_after:
+            raise Killed
+
+    async def main():
+        nonlocal pipeline
+        if not results:
+            frontier.add(BASE + '/')
+            checkpoint.save(results, (), {'config': {'start_url': BASE}})
+        pipeline = CrawlPipeline(frontier, crawl_page, concurrency=4, on_page_done=on_page_done)
+        await pipeline.run()
+
+    try:
+        asyncio.run(main())
+    except Killed:
+        pass
+    frontier.close()
+
+
+@pytest.mark.parametrize('strategy', ['bfs', 'dfs'])
+def test_resume_continues_without_refetching(tmp_path, strategy):
+    """中断后从检查点恢复，只重新抓取最后一次检查点之后的页面"""
+    path = tmp_path / 'task.db'
+    first_results, first_fetched = [], []
+    run_crawl(path, first_results, first_fetched, strategy, stop_after=105)
+
+    state = read_checkpoint_state(path)
+    assert state['config'] == {'start_url': BASE}
+    assert state['result_offset'] == 100
+
+    frontier = DiskFrontier(path, strategy=strategy, max_depth=5, max_pages=10000, batch_size=32)
+    checkpoint = CrawlCheckpoint(frontier)
+    results = checkpoint.load_results()
+    frontier.close()
+    assert len(results) == 100
+    assert read_checkpoint_records(path) == results
+
+    second_fetched = []
+    run_crawl(path, results, second_fetched, strategy)
+
+    all_pages = {record['url'] for record in results}
+    assert len(results) == len(all_pages) == 364
+    assert not set(second_fetched) & {record['url'] for record in results[:90]}
+    assert len(first_fetched) + len(second_fetched) <= 364 + 5 + 4
+
+
+def test_missing_checkpoint(tmp_path):
+    assert read_checkpoint_state(tmp_path / 'missing.db') is None
+    assert read_checkpoint_records(tmp_path / 'missing.db') == []
+
+    frontier = DiskFrontier(tmp_path / 'fresh.db')
+    frontier.close()
+    assert read_checkpoint_state(tmp_path / 'fresh.db') is None
+    assert read_checkpoint_records(tmp_path / 'fresh.db') == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+命令行爬虫测试
+"""
+
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.crawler import WebsiteCrawler
+
+BASE = 'https://example.com'
+
+# 模拟站点：路径 -> 页面中的内部链接
+SITE = {
+    '/': ['/a', '/b', '/a#top', 'https://other.com/x', '/logo.png'],
+    '/a': ['/a/1', '/'],
+    '/b': ['/missing'],
+    '/a/1': [],
+}
+
+
+class FakeCrawler:
+    def __init__(self, body=None):
+        self.started = self.closed = False
+        self.body = body  # 所有页面使用相同正文，模拟模板化页面
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed = True
+
+    async def arun(self, url, config=None):
+        await asyncio.sleep(0)
+        path = url[len(BASE):] or '/'
+        links = [{'href': BASE + href if href.startswith('/') else href} for href in SITE.get(path, [])]
+        return SimpleNamespace(
+            url=url, success=path in SITE, error_message='404', status_code=200 if path in SITE else 404,
+            response_headers={}, metadata={'title': path}, cleaned_html=self.body or f'<p>page {path}</p>',
+            extracted_content=None, links={'internal': links},
+        )
+
+
+def make_crawler(output_dir, body=None, config=None, **options):
+    fake = FakeCrawler(body)
+    crawler = WebsiteCrawler(
+        BASE, output_dir, crawler_factory=lambda: fake, run_config=object(),
+        config=dict(
+            {'respect_robots': False, 'rate_limit': {'rate': 1000, 'burst': 100}, 'fetch_mode': 'browser'},
+            **(config or {})
+        ),
+        **options
+    )
+    return crawler, fake
+
+
+def test_streams_one_line_per_page(tmp_path):
+    """每个成功页面写一行 JSON，正文保存在内容存储中"""
+    crawler, fake = make_crawler(tmp_path / 'out', concurrency=3)
+    summary = asyncio.run(crawler.crawl())
+
+    lines = (tmp_path / 'out' / 'results.jsonl').read_text(encoding='utf-8').splitlines()
+    records = [json.loads(line) for line in lines]
+    assert sorted(record['url'] for record in records) == [BASE + '/', BASE + '/a', BASE + '/a/1', BASE + '/b']
+    assert all('content' not in record and record['bodies']['html'] for record in records)
+    assert summary['crawled'] == 4
+    assert summary['failed'] == 1
+    assert summary['bytes'] == sum(len(line.encode('utf-8')) + 1 for line in lines)
+    assert summary['link_filter']['same_host']['rejected'] == 1
+    assert summary['pages'] == {'browser': 4} and summary['failures'] == {'http_4xx': 1}
+    assert fake.started and fake.closed
+
+
+def test_stdout_and_limits():
+    """输出到标准输出时记录中保存正文，遵守深度和页面数限制"""
+    out = io.StringIO()
+    crawler, _ = make_crawler('-', max_depth=1)
+    assert crawler.results_path is None
+    asyncio.run(crawler.crawl(out))
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(record['url'] for record in records) == [BASE + '/', BASE + '/a', BASE + '/b']
+    assert records[0]['content'] == '<p>page /</p>'
+
+    out = io.StringIO()
+    crawler, _ = make_crawler('-', max_pages=2)
+    summary = asyncio.run(crawler.crawl(out))
+    assert summary['crawled'] == 2 and summary['pages_per_second'] > 0
+
+
+def test_near_duplicates_share_the_server_page_flow():
+    """与 Web 服务相同：近似重复页面只记录 duplicate_of，drop_links 时不再跟随其中的链接"""
+    out = io.StringIO()
+    body = '<p>' + ' '.join(f'word{i}' for i in range(200)) + '</p>'
+    crawler, _ = make_crawler('-', body=body, config={'near_duplicates': {'drop_links': True}})
+    summary = asyncio.run(crawler.crawl(out))
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(record['url'] for record in records) == [BASE + '/', BASE + '/a', BASE + '/b']
+    assert sorted(record.get('duplicate_of', '') for record in records) == ['', BASE + '/', BASE + '/']
+    assert summary['duplicates'] == 2 and summary['pages'] == {'browser': 1, 'duplicate': 2}
+
+
+def test_pages_needing_a_browser_fail_without_one():
+    """未安装 crawl4ai 时只用 HTTP 抓取，需要渲染的页面记为失败"""
+    out = io.StringIO()
+    crawler = WebsiteCrawler(BASE, '-', config={'respect_robots': False, 'fetch_mode': 'browser'})
+    crawler._crawler_factory = None
+    summary = asyncio.run(crawler.crawl(out))
+    assert summary['crawled'] == 0 and summary['failures'] == {'exception': 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
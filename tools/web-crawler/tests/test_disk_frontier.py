@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+磁盘抓取前沿测试
+"""
+
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.disk_frontier import DiskFrontier
+from src.utils.frontier import CrawlFrontier
+
+
+def drive(frontier, seed=3, steps=2000):
+    """随机交替入队和出队，返回出队序列"""
+    rng = random.Random(seed)
+    popped = []
+    for step in range(steps):
+        if rng.random() < 0.6:
+            frontier.add(f'https://example.com/p/{rng.randrange(1500)}', depth=rng.randrange(3))
+        else:
+            item = frontier.pop()
+            if item:
+                popped.append(item)
+    while True:
+        item = frontier.pop()
+        if item is None:
+            return popped
+        popped.append(item)
+
+
+@pytest.mark.parametrize('strategy', ['bfs', 'dfs'])
+def test_same_order_as_memory_frontier(tmp_path, strategy):
+    """小批量缓冲下出队顺序与内存前沿一致"""
+    memory = CrawlFrontier(strategy=strategy, max_pages=10000)
+    disk = DiskFrontier(tmp_path / 'frontier.db', strategy=strategy, max_pages=10000, batch_size=16)
+
+    assert drive(disk) == drive(memory)
+    assert disk.scheduled == memory.scheduled
+    assert len(disk.seen) == len(memory.seen)
+    assert len(disk) == 0
+    disk.close()
+
+
+def test_buffers_stay_bounded(tmp_path):
+    """前沿增长时内存缓冲不超过批量大小"""
+    frontier = DiskFrontier(tmp_path / 'frontier.db', max_pages=100000, batch_size=100)
+    for index in range(5000):
+        frontier.add(f'https://example.com/{index}')
+        assert len(frontier._tail) < 200
+        assert len(frontier.seen._pending) < 100
+
+    assert len(frontier) == 5000
+    assert not frontier.add('https://example.com/42/')
+    assert frontier.pop() == ('https://example.com/0', 0)
+    assert len(frontier._head) == 99
+    frontier.close()
+
+
+def test_batches_committed_without_checkpoint(tmp_path):
+    """不保存检查点时每批写入后立即提交，不会一直持有写事务"""
+    path = tmp_path / 'frontier.db'
+    frontier = DiskFrontier(path, max_pages=100000, batch_size=100)
+    for index in range(1000):
+        frontier.add(f'https://example.com/{index}')
+    assert len(frontier._tail) < 200  # 已有多批写入磁盘
+
+    reader = sqlite3.connect(str(path))
+    assert reader.execute('SELECT COUNT(*) FROM queue').fetchone()[0] == 1000 - len(frontier._tail)
+    frontier.pop()
+    assert not frontier.connection.in_transaction
+    reader.close()
+    frontier.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+HTTP 抓取引擎测试
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.navigation import EnhancedNavigationExtractor
+from src.utils import fetch_engine
+from src.utils.fetch_engine import FetchRouter, HttpCrawlResult, render_reason, url_template
+from src.utils.page_record import PageRecord
+from src.utils.site_tree import SiteTree
+
+STATIC = '''<html><head><title>安装 &amp; 配置</title><meta name="description" content="安装说明"></head>
+<body><nav><ul><li><a href="/docs">文档</a><ul><li><a href="/docs/install">安装</a></li></ul></li></ul></nav>
+<main><h1>安装</h1><p>''' + '正文内容 ' * 100 + '''</p><a href="/docs/faq#top">常见问题</a>
+<a href="https://other.com/">外部</a></main><script>track()</script></body></html>'''
+
+SPA = '<html><head><title>App</title></head><body><div id="root"></div><script src="/app.js"></script></body></html>'
+SHELL = '<html><body><header>Loading</header><script src="/bundle.js"></script></body></html>'
+
+
+@pytest.fixture
+def auto_mode(monkeypatch):
+    monkeypatch.setattr(fetch_engine, 'AIOHTTP_AVAILABLE', True)
+
+
+def test_render_detection_and_templates():
+    assert render_reason(STATIC) is None
+    assert render_reason(SPA) == 'framework_root'
+    assert render_reason(SHELL) == 'empty_body'
+    assert render_reason('<html><body><p>短页面</p></body></html>') is None  # 没有脚本的短页面不需要渲染
+
+    assert url_template('https://Example.com/blog/2024/post-12?page=2&sort=new') == 'example.com/blog/*/*?page&sort'
+    assert url_template('https://example.com/docs/install') == 'example.com/docs/install'
+
+
+def test_parse_static_page():
+    """一次解析得到元数据、站内链接和导航结构，可直接生成页面记录"""
+    url = 'https://example.com/docs/install'
+    result = HttpCrawlResult.from_html(url, STATIC, EnhancedNavigationExtractor('https://example.com'))
+    assert result.success and result.status_code == 200
+    assert result.metadata == {'title': '安装 & 配置', 'description': '安装说明'}
+    assert [link['href'] for link in result.links['internal']] == [
+        'https://example.com/docs', 'https://example.com/docs/install', 'https://example.com/docs/faq',
+    ]
+    assert 'track()' not in result.cleaned_html and '<h1>安装</h1>' in result.cleaned_html
+
+    record = PageRecord.from_crawl_result(result)
+    assert record['title'] == '安装 & 配置'
+    tree = SiteTree('https://example.com')
+    assert tree.add_navigation(record['navigation_content'], url) == 2
+    assert tree.navigation_links()[1]['level'] == 1
+
+
+def test_router_escalation(auto_mode):
+    """同一模板两次需要渲染后直接走浏览器；没有静态页面时整个站点切换到浏览器"""
+    router = FetchRouter(template_threshold=2, site_threshold=3)
+    assert router.use_http('https://example.com/app/1')
+    assert router.check('https://example.com/app/1', SPA) == 'framework_root'
+    assert router.use_http('https://example.com/app/2')
+    router.check('https://example.com/app/2', SPA)
+    assert not router.use_http('https://example.com/app/3')
+    assert router.use_http('https://example.com/docs')
+
+    router.check('https://example.com/other', SHELL)
+    assert router.mode == 'browser'
+    assert router.stats()['escalations'] == {'framework_root': 2, 'empty_body': 1}
+
+    # 连接错误交给浏览器，但不影响模板和站点的判断
+    router = FetchRouter(template_threshold=1, site_threshold=1)
+    router.escalate('https://example.com/flaky', 'transport')
+    assert router.mode == 'auto' and router.use_http('https://example.com/flaky')
+
+    assert FetchRouter.from_config({'wait_for': 'css:.content'}).mode == 'browser'
+    assert FetchRouter.from_config({}).mode == 'auto'
+    with pytest.raises(ValueError):
+        FetchRouter('fast')
+
+
+def test_parse_prefetched_response():
+    """增量抓取的条件请求已读取的响应直接解析，判断与 fetch() 一致"""
+    router = FetchRouter()
+    fetcher = fetch_engine.HttpFetcher('https://example.com', router)
+    url = 'https://example.com/docs/install'
+    result = fetcher.from_response(url, 200, {}, 'text/html', 'utf-8', STATIC.encode('utf-8'), url + '/')
+    assert result.success and result.url == url and result.metadata['title'] == '安装 & 配置'
+    assert fetcher.from_response(url, 404, {}, 'text/html', None, b'').status_code == 404
+    assert fetcher.from_response(url, 200, {}, 'application/pdf', None, b'%PDF') is None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    pages = {'/': STATIC, '/app': SPA}
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        if self.path == '/file.pdf':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+            payload = b'%PDF-1.4'
+        else:
+            self.send_response(200 if body else 404)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            payload = (body or 'missing').encode('utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_fetcher(auto_mode):
+    pytest.importorskip('aiohttp')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    async def run():
+        router = FetchRouter()
+        fetcher = fetch_engine.HttpFetcher(base, router)
+        try:
+            return (
+                await fetcher.fetch(base + '/'),
+                await fetcher.fetch(base + '/app'),
+                await fetcher.fetch(base + '/file.pdf'),
+                await fetcher.fetch(base + '/missing'),
+                await fetcher.fetch('http://127.0.0.1:1/'),
+                router,
+            )
+        finally:
+            await fetcher.close()
+
+    try:
+        page, spa, pdf, missing, refused, router = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert page.success and page.metadata['title'] == '安装 & 配置'
+    assert spa is None and pdf is None and refused is None
+    assert not missing.success and missing.status_code == 404
+    assert router.stats()['escalations'] == {'framework_root': 1, 'content_type': 1, 'transport': 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
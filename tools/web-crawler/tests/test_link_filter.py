@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+链接过滤器测试
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.link_filter import LinkFilter
+
+
+def test_filter_rules_in_one_batch():
+    """一次调用按规则过滤整个页面的链接，保持原有顺序"""
+    link_filter = LinkFilter(
+        'https://example.com/docs',
+        exclude_domains=['ads.example.com'],
+        exclude_patterns=['*.zip', '*/admin/*'],
+    )
+    links = [
+        'https://example.com/docs/intro',
+        'mailto:team@example.com',
+        '/relative/path',
+        'https://other.com/page',
+        'https://EXAMPLE.com/docs/guide?x=1#top',
+        'https://example.com/static/app.js?v=2',
+        'https://example.com/files/release.ZIP',
+        'https://example.com/data.json',
+        'https://example.com/admin/users',
+        '',
+        None,
+    ]
+    assert link_filter.filter(links) == [
+        'https://example.com/docs/intro',
+        'https://EXAMPLE.com/docs/guide?x=1#top',
+        'https://example.com/data.json',
+    ]
+
+    stats = link_filter.stats()
+    assert stats['scheme'] == {'checked': 9, 'accepted': 7, 'rejected': 2, 'time_ms': stats['scheme']['time_ms']}
+    assert stats['same_host']['rejected'] == 1
+    assert stats['extension']['rejected'] == 2
+    assert stats['pattern']['rejected'] == 1
+    assert 'blocked_domain' in stats
+
+
+def test_blocked_domains_include_subdomains():
+    """排除的域名同时排除其子域名"""
+    link_filter = LinkFilter(
+        'https://example.com',
+        exclude_domains=['tracker.net'],
+        internal_only=False,
+        skip_extensions=(),
+    )
+    assert link_filter.accepts('https://example.com/a')
+    assert not link_filter.accepts('https://tracker.net/a')
+    assert not link_filter.accepts('https://cdn.tracker.net:8443/a')
+    assert link_filter.accepts('https://nottracker.net/a')
+    assert set(link_filter.stats()) == {'scheme', 'blocked_domain'}
+
+
+def test_from_config():
+    """根据任务配置创建，可覆盖默认扩展名列表"""
+    config = {'filters': {'exclude_domains': [], 'exclude_patterns': ['*/print/*'], 'skip_extensions': ['pdf']}}
+    link_filter = LinkFilter.from_config(config, 'https://example.com/')
+    assert link_filter.skip_extensions == frozenset(['pdf'])
+    assert link_filter.filter([
+        'https://example.com/logo.png',
+        'https://example.com/manual.pdf',
+        'https://example.com/print/page',
+    ]) == ['https://example.com/logo.png']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
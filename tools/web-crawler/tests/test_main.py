@@ -3,6 +3,7 @@
 主要功能测试
 """
 
+import subprocess
 import sys
 import pytest
 from pathlib import Path
@@ -51,5 +52,30 @@ def test_website_crawler():
     except Exception as e:
         pytest.fail(f"网站爬虫测试失败: {e}")
 
+def test_startup_defers_heavy_imports():
+    """依赖检查只查找模块，启动和命令行爬虫不加载 Web 服务和浏览器依赖"""
+    code = (
+        "import sys, main; main.check_dependencies('web'); import src.crawler; "
+        "print(sorted(m for m in ('flask', 'flask_socketio', 'crawl4ai', 'bs4', 'aiohttp') if m in sys.modules))"
+    )
+    process = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True
+    )
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.splitlines()[-1] == '[]'
+
+
+def test_http_cli_does_not_require_crawl4ai(monkeypatch):
+    """命令行模式 --fetch http 不检查 crawl4ai，其他抓取引擎仍需要"""
+    import importlib.util
+    import main
+
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name: None if name == 'crawl4ai' else find_spec('sys'))
+    assert main.check_dependencies('cli', 'http')
+    assert not main.check_dependencies('cli', 'auto')
+
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
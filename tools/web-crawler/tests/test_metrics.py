@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+指标测试
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.metrics import CrawlMetrics, MetricsRegistry, failure_reason
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    responses = registry.counter('responses_total', '响应数', ('status',))
+    phases = registry.histogram('phase_seconds', '阶段耗时', ('phase',), buckets=(0.1, 1.0))
+    registry.gauge('queue_depth', '队列长度', lambda: 3)
+    registry.gauge('browser_memory', '浏览器内存', lambda: None)
+    registry.gauge('broken', '出错的仪表', lambda: 1 / 0)
+
+    responses.inc('200')
+    responses.inc('200')
+    responses.inc('404')
+    for value in (0.05, 0.5, 2.0):
+        phases.observe(value, 'fetch')
+
+    assert responses.value('200') == 2 and phases.count('fetch') == 3
+    lines = registry.render().splitlines()
+    assert lines[:4] == [
+        '# HELP responses_total 响应数',
+        '# TYPE responses_total counter',
+        'responses_total{status="200"} 2',
+        'responses_total{status="404"} 1',
+    ]
+    # 桶计数是累积的，+Inf 桶等于总次数
+    assert 'phase_seconds_bucket{phase="fetch",le="0.1"} 1' in lines
+    assert 'phase_seconds_bucket{phase="fetch",le="1"} 2' in lines
+    assert 'phase_seconds_bucket{phase="fetch",le="+Inf"} 3' in lines
+    assert 'phase_seconds_sum{phase="fetch"} 2.55' in lines
+    assert 'phase_seconds_count{phase="fetch"} 3' in lines
+    assert 'queue_depth 3' in lines
+    # 返回 None 的仪表只输出说明，回调出错的仪表整体跳过
+    assert not any(line.startswith('browser_memory ') for line in lines)
+    assert not any('broken' in line for line in lines)
+
+    with pytest.raises(ValueError):
+        registry.counter('responses_total', '重复注册')
+
+
+def test_crawl_metrics():
+    assert failure_reason(SimpleNamespace(status_code=503, error_message='')) == 'http_5xx'
+    assert failure_reason(SimpleNamespace(status_code=None, error_message='Page.goto: Timeout 30000ms')) == 'timeout'
+    assert failure_reason(error=TimeoutError()) == 'timeout'
+    assert failure_reason(error=RuntimeError()) == 'exception'
+
+    metrics = CrawlMetrics()
+    pool = SimpleNamespace(stats=lambda: {'browsers': 2, 'active_leases': 1}, max_browsers=4, memory_usage_mb=lambda: None)
+    metrics.register_runtime(pool, SimpleNamespace(queue_depth=5, running=2), SimpleNamespace(backlog=7))
+
+    started = metrics.observe('fetch', time.perf_counter())
+    metrics.observe('extract', started)
+    metrics.response(200)
+    metrics.failure(error=RuntimeError())
+    metrics.page('http')
+
+    text = metrics.registry.render()
+    assert 'crawler_page_phase_seconds_count{phase="fetch"} 1' in text
+    assert 'crawler_responses_total{status="200"} 1' in text
+    assert 'crawler_failures_total{reason="exception"} 1' in text
+    assert 'crawler_pages_total{source="http"} 1' in text
+    assert 'crawler_browser_pool_utilization 0.25' in text
+    assert 'crawler_task_queue_depth 5' in text
+    assert 'crawler_socket_emit_backlog 7' in text
+    # 取不到浏览器内存时只输出 HELP/TYPE，没有样本
+    assert not any(line.startswith('crawler_browser_memory_bytes ') for line in text.splitlines())
+    assert metrics.summary() == {'pages': {'http': 1}, 'failures': {'exception': 1}}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+增强导航提取器测试
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import navigation
+from src.navigation import EnhancedNavigationExtractor
+
+PAGE = """
+<html><head><script>var nav = "<nav><a href='/fake'>x</a></nav>";</script></head>
+<body>
+<header><a href="/login">登录</a></header>
+<nav class="sidebar">
+  <ul>
+    <li><a href="/docs/"><span class="icon"></span><span>文档</span> 首页</a>
+      <ul>
+        <li><a href="guide">指南</a></li>
+        <li><a href="https://github.com/example">GitHub</a></li>
+        <li><a href="/docs/api#auth" aria-label="API 参考"><img src="api.png"></a></li>
+        <li><a href="javascript:void(0)">展开</a></li>
+      </ul>
+    </li>
+    <li><a href='/blog?tag=a&amp;page=2'>博客 &amp; 动态</a></li>
+  </ul>
+</nav>
+<div class="content"><a href="/docs/">正文链接</a></div>
+</body></html>
+"""
+
+# 注释、CDATA、未加引号或跨行的属性、属性值中的 >
+TRICKY = """
+<!-- <nav><a href="/commented">注释</a></nav> -->
+<script><![CDATA[ document.write('<nav><a href="/scripted">脚本</a></nav>'); ]]></script>
+<nav data-note="a > b"
+     class=menu>
+  <ul>
+    <li><a href=/plain title="x > y">无引号</a></li>
+    <li><a
+         href="/multi"
+         >跨行</a></li>
+    <!-- <li><a href="/hidden">隐藏</a></li> -->
+  </ul>
+</nav>
+"""
+
+
+@pytest.fixture(params=['lxml', 'html.parser'], autouse=True)
+def backend(request, monkeypatch):
+    """两种解析后端对同一输入给出相同结果"""
+    if request.param == 'lxml':
+        if not navigation.LXML_AVAILABLE:
+            pytest.skip('lxml 未安装')
+    else:
+        monkeypatch.setattr(navigation, 'LXML_AVAILABLE', False)
+    return request.param
+
+
+def test_extracts_nested_links_with_hierarchy():
+    """只提取导航区域内的同站链接，嵌套标签的文本和层级都保留"""
+    extractor = EnhancedNavigationExtractor("https://example.com")
+    links = extractor.extract_links(PAGE, "https://example.com/docs/")
+
+    assert [(link['title'], link['url'], link['level']) for link in links] == [
+        ('文档 首页', 'https://example.com/docs/', 0),
+        ('指南', 'https://example.com/docs/guide', 1),
+        ('API 参考', 'https://example.com/docs/api', 1),
+        ('博客 & 动态', 'https://example.com/blog?tag=a&page=2', 0),
+    ]
+
+    tree = extractor.extract(PAGE, "https://example.com/docs/")
+    assert [node['title'] for node in tree] == ['文档 首页', '博客 & 动态']
+    assert [child['title'] for child in tree[0]['children']] == ['指南', 'API 参考']
+
+
+def test_comments_scripts_and_attribute_syntax():
+    """注释和脚本中的标签不解析，未加引号、跨行和含 > 的属性值正常解析"""
+    extractor = EnhancedNavigationExtractor("https://example.com")
+    links = extractor.extract_links(TRICKY, "https://example.com/")
+    assert [(link['title'], link['url'], link['level']) for link in links] == [
+        ('无引号', 'https://example.com/plain', 0),
+        ('跨行', 'https://example.com/multi', 0),
+    ]
+
+
+def test_fragment_and_markdown_input():
+    """没有导航区域的片段提取全部链接，Markdown 按缩进计算层级"""
+    extractor = EnhancedNavigationExtractor("https://example.com")
+
+    fragment = '<li><a href="/a">A</a></li><li><a href="/b"><b>B</b></a></li>'
+    assert [link['url'] for link in extractor.extract_links(fragment)] == [
+        'https://example.com/a', 'https://example.com/b',
+    ]
+
+    markdown = "- [首页](/)\n  - [文档](/docs \"docs\")\n- [外部](https://other.com/)"
+    assert [(link['title'], link['level']) for link in extractor.extract_links(markdown)] == [
+        ('首页', 0), ('文档', 1),
+    ]
+
+
+def test_custom_selectors():
+    """选择器支持 tag、.class、#id 和属性条件"""
+    extractor = EnhancedNavigationExtractor("https://example.com", ["div#menu", "[data-nav='main']"])
+    html = (
+        '<nav><a href="/ignored">忽略</a></nav>'
+        '<div id="menu"><div><a href="/one">一</a></div></div>'
+        '<section data-nav="main"><a href="/two">二</a></section>'
+    )
+    assert [link['title'] for link in extractor.extract_links(html)] == ['一', '二']
+
+    with pytest.raises(ValueError):
+        EnhancedNavigationExtractor("https://example.com", ["nav > a"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+近似重复检测测试
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.near_duplicates import NearDuplicateIndex, hamming_distance, page_text, simhash
+
+
+def make_page(rng, words=800):
+    vocabulary = [f'term{i}' for i in range(2000)]
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def test_simhash_similarity():
+    """模板相同、只有少量文字不同的页面指纹接近，不同页面指纹相差很大"""
+    rng = random.Random(7)
+    body = make_page(rng)
+    listing = f'<nav>首页 文档</nav><main>{body}</main><footer>第 1 页</footer><script>var x = 1;</script>'
+    next_page = listing.replace('第 1 页', '第 2 页')
+
+    assert page_text(listing).split()[:2] == ['首页', '文档']
+    assert 'var' not in page_text(listing)
+    assert simhash(page_text(listing)) == simhash(page_text(listing))
+    assert hamming_distance(simhash(page_text(listing)), simhash(page_text(next_page))) <= 3
+    assert hamming_distance(simhash(body), simhash(make_page(rng))) > 10
+    assert simhash('') is None and simhash(page_text('<img src="a.png">')) is None
+    assert simhash('one two') != 0
+
+
+@pytest.mark.parametrize('max_distance', [0, 3, 6])
+def test_index_finds_fingerprints_within_distance(max_distance):
+    """汉明距离不超过阈值的指纹一定能通过分段桶找到"""
+    rng = random.Random(max_distance)
+    index = NearDuplicateIndex(max_distance)
+    originals = [rng.getrandbits(64) for _ in range(500)]
+    for number, fingerprint in enumerate(originals):
+        assert index.check(f'https://example.com/{number}', fingerprint) is None
+
+    for number, fingerprint in enumerate(originals[:100]):
+        near = fingerprint
+        for bit in rng.sample(range(64), max_distance):
+            near ^= 1 << bit
+        assert index.find(near) == f'https://example.com/{number}'
+
+    assert index.check('https://example.com/copy', originals[0]) == 'https://example.com/0'
+    assert index.duplicates == 1
+
+
+def test_from_config():
+    assert NearDuplicateIndex.from_config(None) is None
+    assert NearDuplicateIndex.from_config(False) is None
+    assert NearDuplicateIndex.from_config(True).max_distance == 3
+    index = NearDuplicateIndex.from_config({'max_distance': 5, 'drop_links': True})
+    assert index.max_distance == 5 and index.drop_links
+    assert not NearDuplicateIndex.from_config(True).drop_links
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(40)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+页面记录测试
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.page_record import CONTENT_LIMIT, LINK_LIMIT, PageRecord, count_words
+
+
+def make_result(html, extracted=None, links=None):
+    return SimpleNamespace(
+        url='https://example.com/docs',
+        metadata={'title': '文档', 'description': '说明'},
+        cleaned_html=html,
+        extracted_content=extracted,
+        links={'internal': links or []},
+        success=True,
+    )
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'one',
+    '  leading and trailing  ',
+    'a\tb\nc　d  e',
+    'a\x1cb\u2028c\x85d\xa0e',
+    'word ' * 50 + 'x' * 30 + ' tail',
+])
+def test_count_words_matches_split(text):
+    """逐个匹配统计与 str.split 结果一致"""
+    assert count_words(text) == len(text.split())
+
+
+def test_record_matches_previous_dict_layout():
+    """映射接口与原来的结果字典字段一致，可直接序列化"""
+    links = [{'href': f'https://example.com/p{i}', 'text': f'P{i}', 'base_domain': 'example.com'} for i in range(80)]
+    html = '<p>' + 'word ' * 2000 + '</p>'
+    extracted = json.dumps({'navigation': '<nav></nav>', 'navigation_links': ['首页']})
+    record = PageRecord.from_crawl_result(make_result(html, extracted, links))
+
+    data = json.loads(json.dumps(dict(record), ensure_ascii=False))
+    assert list(data) == [
+        'url', 'title', 'description', 'content', 'word_count', 'timestamp', 'success',
+        'navigation_content', 'navigation_links', 'links',
+    ]
+    assert data['content'] == html[:CONTENT_LIMIT]
+    assert data['word_count'] == len(html.split())
+    assert data['links'][0] == {'href': 'https://example.com/p0', 'text': 'P0', 'title': ''}
+    assert len(data['links']) == LINK_LIMIT
+    assert record.get('navigation_content') == '<nav></nav>'
+    assert record.get('unchanged') is None
+    assert isinstance(record.crawled_at, int)
+    assert not hasattr(record, '__dict__')
+
+
+def test_from_dict_round_trip():
+    """检查点和增量缓存保存的 JSON 记录可以还原"""
+    record = PageRecord.from_crawl_result(make_result('hello world'))
+    record.unchanged = True
+    data = dict(record)
+    restored = PageRecord.from_dict(json.loads(json.dumps(data)))
+    assert dict(restored) == data
+    assert restored['unchanged'] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+抓取前沿与流式管线测试
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.frontier import CrawlFrontier
+from src.utils.pipeline import CrawlPipeline
+
+# 模拟站点：页面 -> 页面中的链接
+SITE = {
+    '/': ['/a', '/b', '/'],
+    '/a': ['/a/1', '/a/2', '/b'],
+    '/b': ['/b/1', '/'],
+    '/a/1': ['/a/1/x'],
+    '/a/2': [],
+    '/b/1': ['/a'],
+    '/a/1/x': [],
+}
+
+
+def crawl(frontier, concurrency=3):
+    fetched = []
+
+    async def crawl_page(url, depth):
+        fetched.append(url)
+        await asyncio.sleep(0.001 * len(url))
+        return SITE.get(url, [])
+
+    frontier.add('/')
+    pipeline = CrawlPipeline(frontier, crawl_page, concurrency=concurrency)
+    asyncio.run(pipeline.run())
+    return fetched, pipeline
+
+
+def test_every_page_fetched_exactly_once():
+    """每个页面只抓取一次，发现的链接直接进入前沿"""
+    fetched, pipeline = crawl(CrawlFrontier(max_depth=5, max_pages=100))
+    assert sorted(fetched) == sorted(SITE)
+    assert pipeline.pages_done == len(SITE)
+
+
+def test_depth_and_page_limits():
+    """遵守最大深度和最大页面数"""
+    fetched, _ = crawl(CrawlFrontier(max_depth=1, max_pages=100))
+    assert sorted(fetched) == ['/', '/a', '/b']
+
+    fetched, _ = crawl(CrawlFrontier(max_depth=5, max_pages=4))
+    assert len(fetched) == 4
+
+
+def test_frontier_order():
+    """bfs 先进先出，dfs 后进先出"""
+    bfs = CrawlFrontier(strategy='bfs')
+    dfs = CrawlFrontier(strategy='dfs')
+    for frontier in (bfs, dfs):
+        for url in ('/1', '/2', '/3'):
+            frontier.add(url)
+        assert not frontier.add('/1')
+    assert [bfs.pop()[0] for _ in range(3)] == ['/1', '/2', '/3']
+    assert [dfs.pop()[0] for _ in range(3)] == ['/3', '/2', '/1']
+    assert bfs.pop() is None
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
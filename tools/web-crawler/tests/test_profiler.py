@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+性能剖析测试
+"""
+
+import asyncio
+import marshal
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.profiler import ProfileCapture
+
+
+def busy_work(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def allocate(keep):
+    keep.extend(bytearray(1024) for _ in range(200))
+
+
+@pytest.fixture
+def loop_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop, thread
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def test_sampling_only_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,))
+    worker.start()
+    try:
+        capture = ProfileCapture(seconds=0.3, thread_id=worker.ident, interval=0.002).start()
+        assert capture.wait(5)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert capture.error is None and capture.samples > 0
+    lines = capture.data.decode('utf-8').splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert all('busy_work (' in line for line in lines)
+    assert not any('_capture_samples' in line for line in lines)
+    assert capture.filename == 'profile-cpu.folded'
+
+
+def test_pstats_on_event_loop(loop_thread):
+    loop, thread = loop_thread
+
+    async def crawl():
+        await asyncio.sleep(0.01)
+        sum(range(1000))
+
+    capture = ProfileCapture(output='pstats', seconds=0.3, loop=loop, thread_id=thread.ident).start()
+    for _ in range(5):
+        asyncio.run_coroutine_threadsafe(crawl(), loop).result(5)
+    assert capture.wait(5) and capture.error is None
+
+    stats = marshal.loads(capture.data)
+    assert any(name == 'crawl' for _, _, name in stats)
+
+
+def test_allocations_and_single_capture():
+    keep = []
+    capture = ProfileCapture(mode='alloc', seconds=5).start()
+    with pytest.raises(RuntimeError):
+        ProfileCapture(seconds=1).start()  # 同一时间只允许一个剖析
+    while not tracemalloc.is_tracing():
+        time.sleep(0.01)
+    allocate(keep)
+    capture.stop()
+    assert capture.wait(5) and capture.error is None
+
+    folded = capture.data.decode('utf-8')
+    allocated = sum(
+        int(line.rsplit(' ', 1)[1]) for line in folded.splitlines()
+        if 'test_profiler.py' in line.rsplit(' ', 1)[0].split(';')[-1]
+    )
+    assert allocated >= 200 * 1024
+
+    # 上一个剖析结束后可以开始新的剖析，stop_when 返回真时提前结束
+    assert ProfileCapture(seconds=30, stop_when=lambda: True).start().wait(5)
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        ProfileCapture(mode='io')
+    with pytest.raises(ValueError):
+        ProfileCapture(mode='alloc', output='pstats')
+    with pytest.raises(ValueError):
+        ProfileCapture(output='pstats')  # 没有事件循环
+    with pytest.raises(ValueError):
+        ProfileCapture(seconds=0)
+    for seconds in (float('nan'), float('inf')):
+        with pytest.raises(ValueError):
+            ProfileCapture(seconds=seconds)  # 否则剖析没有截止时间
+
+
+def test_profile_store_is_bounded():
+    """已完成的剖析按数量上限和保留时间删除，进行中的剖析保留"""
+    pytest.importorskip('flask')
+    from src.web.profile_api import ProfileStore
+
+    def finished(age):
+        capture = ProfileCapture(seconds=1)
+        capture.finished_at = time.time() - age
+        capture.done.set()
+        return capture
+
+    running = ProfileCapture(seconds=1)
+    store = ProfileStore(max_profiles=3, ttl_seconds=60)
+    store.put('running', running)
+    store.put('a', finished(0))
+    store.put('b', finished(0))
+    store.get('a')
+    store.put('c', finished(0))
+    assert [task_id for task_id in ('running', 'a', 'b', 'c') if store.get(task_id)] == ['running', 'a', 'c']
+
+    store.put('old', finished(120))
+    assert store.get('old') is None and len(store) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+按主机限速器测试
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.rate_limiter import HostRateLimiter, parse_retry_after
+
+
+def timed_acquires(limiter, urls):
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(url) for url in urls))
+        return time.monotonic() - start
+
+    return asyncio.run(scenario())
+
+
+def test_burst_passes_without_waiting():
+    """突发数以内的请求不等待"""
+    limiter = HostRateLimiter(default_rate=1.0, default_burst=5, respect_robots=False)
+    elapsed = timed_acquires(limiter, ['https://example.com/p%d' % i for i in range(5)])
+    assert elapsed < 0.1
+
+
+def test_rate_limits_requests_beyond_burst():
+    """超过突发数后按速率放行"""
+    limiter = HostRateLimiter(default_rate=20.0, default_burst=1, respect_robots=False)
+    elapsed = timed_acquires(limiter, ['https://example.com/p%d' % i for i in range(5)])
+    assert 0.15 < elapsed < 0.5
+
+
+def test_hosts_are_limited_independently():
+    """不同主机使用各自的令牌桶"""
+    limiter = HostRateLimiter(default_rate=1.0, default_burst=1, respect_robots=False)
+    elapsed = timed_acquires(limiter, ['https://a.example.com/', 'https://b.example.com/'])
+    assert elapsed < 0.1
+
+
+def test_crawl_delay_and_retry_after():
+    """Crawl-delay 降低速率，429 响应的 Retry-After 暂停主机"""
+    limiter = HostRateLimiter(default_rate=10.0, default_burst=4, respect_robots=False)
+    limiter.set_crawl_delay('example.com', 2)
+    bucket = limiter.bucket_for('https://example.com/')
+    assert bucket.rate == 0.5 and bucket.burst == 1
+
+    limiter.handle_response('https://example.com/', 429, {'Retry-After': '3'})
+    assert bucket.blocked_until - time.monotonic() > 2.5
+    assert limiter.handle_response('https://example.com/', 200, {}) is None
+
+
+def test_configure_host_keeps_crawl_delay():
+    """任务设置的速率不超过 Crawl-delay，非正速率直接拒绝"""
+    limiter = HostRateLimiter(default_rate=10.0, default_burst=4, respect_robots=False)
+    limiter.set_crawl_delay('example.com', 2)
+    limiter.configure_host('example.com', rate=20.0, burst=8)
+    bucket = limiter.bucket_for('https://example.com/')
+    assert bucket.rate == 0.5 and bucket.burst == 1
+
+    for rate in (0, -1, float('nan')):
+        with pytest.raises(ValueError):
+            limiter.configure_host('a.com', rate=rate, burst=1)
+    with pytest.raises(ValueError):
+        limiter.configure_host('a.com', burst=0)
+
+    # 共享限速器上只能收紧速率
+    limiter.configure_host('b.com', rate=1.0, stricter_only=True)
+    limiter.configure_host('b.com', rate=5.0, burst=10, stricter_only=True)
+    bucket = limiter.bucket_for('https://b.com/')
+    assert bucket.rate == 1.0 and bucket.burst == 4
+
+
+def test_parse_retry_after():
+    """解析秒数和 HTTP 日期格式的 Retry-After"""
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
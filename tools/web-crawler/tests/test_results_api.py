@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+结果接口测试
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+flask = pytest.importorskip("flask")
+
+from src.utils.site_tree import SiteTree
+from src.web.results_api import navigation_response, results_response
+from src.web.status_api import TaskChangeLog
+from src.web.task_registry import TaskRegistry
+
+
+def make_client(task):
+    app = flask.Flask(__name__)
+
+    @app.route('/results')
+    def results():
+        return results_response(task, flask.request.args, flask.request.headers.get('Accept', ''))
+
+    return app.test_client()
+
+
+def make_task(count, status='completed'):
+    return SimpleNamespace(
+        results=[{'url': f'https://example.com/{i}'} for i in range(count)],
+        navigation=[{'url': 'https://example.com/'}],
+        stats={'crawled': count},
+        status=status,
+    )
+
+
+def test_legacy_shape_without_cursor():
+    """不带分页参数时返回全部结果、导航和统计"""
+    data = make_client(make_task(3)).get('/results').get_json()
+    assert [r['seq'] for r in data['results']] == [1, 2, 3]
+    assert data['navigation'] and data['stats'] == {'crawled': 3}
+
+
+def test_cursor_pagination():
+    """after/limit 游标分页，最后一页 next_after 为 null"""
+    client = make_client(make_task(5))
+    first = client.get('/results?limit=2').get_json()
+    assert [r['seq'] for r in first['results']] == [1, 2]
+    assert first['next_after'] == 2 and 'navigation' not in first
+
+    last = client.get('/results?after=4&limit=2').get_json()
+    assert [r['seq'] for r in last['results']] == [5]
+    assert last['next_after'] is None
+
+    assert client.get('/results?limit=0').status_code == 400
+
+
+def test_ndjson_stream():
+    """NDJSON 模式每行一条记录"""
+    response = make_client(make_task(3)).get('/results?after=1', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['seq'] for line in lines] == [2, 3]
+
+
+def test_navigation_of_spilled_task(tmp_path):
+    """写入磁盘的任务由保存的导航链接和页面列表重建站点结构"""
+    site_tree = SiteTree('https://example.com')
+    site_tree.add_page('https://example.com/docs/install', '安装')
+    site_tree.add_page('https://example.com/blog', '博客')
+    task = SimpleNamespace(
+        task_id='t1', config={}, status='completed', progress=100, status_text='完成', stats={}, error=None,
+        start_time=None, end_time=None, results=[], changes=TaskChangeLog(), site_tree=site_tree,
+        navigation=site_tree.navigation_links() + site_tree.pages(),
+    )
+    registry = TaskRegistry(tmp_path, max_tasks=1)
+    registry.add(task)
+    registry.add(SimpleNamespace(task_id='t2', status='running'))
+    assert registry.stats()['spilled'] == 1
+
+    app = flask.Flask(__name__)
+    with app.test_request_context():
+        data = navigation_response(registry.get('t1'), 'https://example.com').get_json()
+    assert data['page_count'] == 2
+    assert data['tree'] == site_tree.tree()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
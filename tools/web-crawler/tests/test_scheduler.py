@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+任务调度器测试
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.web.scheduler import TaskScheduler
+
+
+class FakeTask:
+    """模拟爬虫任务，运行直到被放行"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.started = threading.Event()
+        self.release = None
+
+    async def run(self):
+        self.release = asyncio.Event()
+        self.started.set()
+        await self.release.wait()
+
+    def finish(self):
+        self.loop.call_soon_threadsafe(self.release.set)
+
+
+def start_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    return loop
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_runs_tasks_concurrently_up_to_limit():
+    """同时运行的任务数不超过上限，其余任务排队"""
+    loop = start_loop()
+    scheduler = TaskScheduler(loop, max_concurrent=2)
+    tasks = [FakeTask(loop) for _ in range(3)]
+    for task in tasks:
+        scheduler.submit(task)
+
+    assert tasks[0].started.wait(1) and tasks[1].started.wait(1)
+    assert not tasks[2].started.is_set()
+    assert scheduler.stats()['running'] == 2
+    assert scheduler.stats()['queue_depth'] == 1
+
+    tasks[0].finish()
+    assert tasks[2].started.wait(1)
+    assert wait_until(lambda: scheduler.completed == 1)
+
+    for task in tasks[1:]:
+        task.finish()
+    assert wait_until(lambda: scheduler.completed == 3)
+    assert scheduler.stats()['running'] == 0
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_task_starts_immediately_when_capacity_free():
+    """有空闲名额时任务在毫秒级内开始"""
+    loop = start_loop()
+    scheduler = TaskScheduler(loop, max_concurrent=1)
+    task = FakeTask(loop)
+    scheduler.submit(task)
+
+    assert task.started.wait(1)
+    assert scheduler.stats()['wait_time_ms']['last'] < 100
+    task.finish()
+    assert wait_until(lambda: scheduler.completed == 1)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
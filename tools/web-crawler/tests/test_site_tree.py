@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+站点结构树测试
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.site_tree import SiteTree
+
+BASE = 'https://example.com/'
+NAV = '''
+<nav><ul>
+  <li><a href="/docs">文档</a><ul><li><a href="/docs/install">安装</a></li></ul></li>
+  <li><a href="/blog">博客</a></li>
+</ul></nav>
+'''
+
+
+def test_pages_are_ordered_by_level_and_path():
+    """页面按路径层级逐层输出，不需要排序全部结果"""
+    tree = SiteTree(BASE)
+    for url, title in [
+        ('https://example.com/docs/guide/b', 'B'),
+        ('https://example.com/', '首页'),
+        ('https://example.com/docs/guide/a', 'A'),
+        ('https://example.com/blog', '博客'),
+        ('https://example.com/docs', '文档'),
+    ]:
+        tree.add_page(url, title)
+
+    assert [(page['path'], page['level']) for page in tree.pages()] == [
+        ('/', 0), ('/blog', 1), ('/docs', 1), ('/docs/guide/a', 3), ('/docs/guide/b', 3),
+    ]
+    assert tree.page_count == 5
+
+    [root] = tree.tree()
+    assert root['title'] == '首页'
+    docs = root['children'][1]
+    assert docs['url'] == 'https://example.com/docs'
+    guide = docs['children'][0]
+    assert guide['url'] is None and guide['title'] == 'guide'
+    assert [child['title'] for child in guide['children']] == ['A', 'B']
+
+
+def test_navigation_is_parsed_once_per_distinct_content():
+    """多个页面的相同导航内容只解析一次，链接按 URL 去重"""
+    tree = SiteTree(BASE)
+    assert tree.add_navigation(NAV, 'https://example.com/docs') == 3
+    assert tree.add_navigation(NAV, 'https://example.com/blog') == 0
+    assert tree.add_navigation(None, 'https://example.com/blog') == 0
+    links = tree.navigation_links()
+    assert [link['title'] for link in links] == ['文档', '安装', '博客']
+    assert links[1]['level'] == 1
+
+    # 导航链接也进入路径树，之后抓取到的页面复用同一节点
+    tree.add_page('https://example.com/docs/install', '安装指南')
+    docs = tree.tree()[1]
+    assert docs['children'][0]['title'] == '安装'
+    assert tree.pages()[0]['title'] == '安装指南'
+
+
+def test_rebuild_from_saved_navigation():
+    tree = SiteTree(BASE)
+    tree.add_navigation(NAV, BASE)
+    tree.add_page('https://example.com/docs/api', 'API')
+    saved = tree.navigation_links() + tree.pages()
+
+    rebuilt = SiteTree.from_navigation(BASE, saved)
+    assert rebuilt.tree() == tree.tree()
+    assert rebuilt.page_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Socket.IO 推送测试
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.web.socket_hub import TaskEventEmitter
+
+
+class FakeSocketIO:
+    """记录推送的事件，不启动后台任务"""
+
+    def __init__(self):
+        self.sent = []
+
+    def emit(self, event, data, to=None):
+        self.sent.append((event, to, data))
+
+    def start_background_task(self, target):
+        pass
+
+
+def test_status_updates_are_coalesced():
+    """同一刷新周期内的进度更新只推送最新值"""
+    socketio = FakeSocketIO()
+    emitter = TaskEventEmitter(socketio)
+    for progress in (10, 20, 30):
+        emitter.emit_status('t1', {'task_id': 't1', 'progress': progress})
+    assert emitter.backlog == 1
+
+    emitter.flush()
+    assert socketio.sent == [('task_update', 't1', {'task_id': 't1', 'progress': 30})]
+    assert emitter.backlog == 0
+
+
+def test_logs_and_results_batched_per_room():
+    """日志和结果按任务房间合并成批次"""
+    socketio = FakeSocketIO()
+    emitter = TaskEventEmitter(socketio)
+    emitter.emit_log('t1', {'message': 'a'})
+    emitter.emit_log('t1', {'message': 'b'})
+    emitter.emit_result('t1', 1, {'url': 'https://example.com/'})
+    emitter.emit_log('t2', {'message': 'c'})
+    emitter.flush()
+
+    sent = {(event, room): data for event, room, data in socketio.sent}
+    assert [log['message'] for log in sent[('log_batch', 't1')]['logs']] == ['a', 'b']
+    assert sent[('result_batch', 't1')]['results'] == [{'seq': 1, 'result': {'url': 'https://example.com/'}}]
+    assert [log['message'] for log in sent[('log_batch', 't2')]['logs']] == ['c']
+
+
+def test_backlog_is_bounded():
+    """积压超过上限时丢弃最旧的日志，不阻塞写入方"""
+    emitter = TaskEventEmitter(FakeSocketIO(), max_pending=3)
+    for i in range(5):
+        emitter.emit_log('t1', {'message': str(i)})
+    assert emitter.backlog == 3 and emitter.dropped == 2
+
+
+def test_results_are_bounded():
+    """没有日志可丢弃时丢弃最旧的结果，单个房间的缓冲也有上限"""
+    socketio = FakeSocketIO()
+    emitter = TaskEventEmitter(socketio, max_pending=100, max_room_events=4)
+    for seq in range(1, 7):
+        emitter.emit_result('t1', seq, {'url': f'https://example.com/{seq}'})
+    assert emitter.backlog == 4 and emitter.dropped == 2
+
+    emitter = TaskEventEmitter(socketio, max_pending=3)
+    emitter.emit_log('t1', {'message': 'a'})
+    for seq in range(1, 5):
+        emitter.emit_result('t1', seq, {})
+    assert emitter.backlog == 3 and emitter.dropped == 2
+    emitter.flush()
+    batch = [data for event, _, data in socketio.sent if event == 'result_batch'][-1]
+    assert [item['seq'] for item in batch['results']] == [2, 3, 4]
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
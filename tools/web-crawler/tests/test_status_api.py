@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+状态接口测试
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+flask = pytest.importorskip("flask")
+
+from src.web.status_api import TaskChangeLog, status_response
+
+
+class FakeTask(SimpleNamespace):
+    """只实现状态接口需要的字段"""
+
+    def __init__(self):
+        super().__init__(
+            task_id='t1', status='running', progress=10, status_text='抓取中',
+            stats={'crawled': 0}, error=None, start_time=datetime.now(), end_time=None,
+            results=[], navigation=[], changes=TaskChangeLog(),
+        )
+
+    def add_result(self, result):
+        self.results.append(result)
+        self.changes.record_result()
+
+
+def make_client(task):
+    app = flask.Flask(__name__)
+
+    @app.route('/status')
+    def status():
+        return status_response(task, flask.request.args, flask.request.headers.get('If-None-Match', ''))
+
+    return app.test_client()
+
+
+def test_change_log_deltas():
+    """按版本返回新增的结果下标和日志"""
+    changes = TaskChangeLog()
+    changes.record_log({'message': 'a'})
+    changes.record_result()
+    version = changes.bump()
+    changes.record_result()
+    changes.record_log({'message': 'b'})
+
+    assert changes.result_range_since(0) == (0, 2)
+    assert changes.result_range_since(version) == (1, 2)
+    assert changes.logs_since(version) == [{'message': 'b'}]
+
+
+def test_status_document_is_lightweight():
+    """默认状态文档不包含结果和导航"""
+    task = FakeTask()
+    task.add_result({'url': 'https://example.com/'})
+    data = make_client(task).get('/status').get_json()
+    assert 'results' not in data and 'navigation' not in data
+    assert data['result_count'] == 1 and data['version'] == task.changes.version
+
+
+def test_since_delta_and_not_modified():
+    """since 只返回新增结果，版本未变化时返回 304"""
+    task = FakeTask()
+    client = make_client(task)
+    task.add_result({'url': 'https://example.com/a'})
+    first = client.get('/status?since=0')
+    version = first.get_json()['version']
+
+    task.add_result({'url': 'https://example.com/b'})
+    delta = client.get(f'/status?since={version}')
+    body = delta.get_json()
+    assert [r['url'] for r in body['results']] == ['https://example.com/b']
+    assert body['results'][0]['seq'] == 2
+
+    # 带上一次响应的 ETag 按新版本号轮询，状态未变化时第一次就返回 304
+    again = client.get(f'/status?since={body["version"]}', headers={'If-None-Match': delta.headers['ETag']})
+    assert again.status_code == 304
+
+    task.add_result({'url': 'https://example.com/c'})
+    changed = client.get(f'/status?since={body["version"]}', headers={'If-None-Match': delta.headers['ETag']})
+    assert changed.status_code == 200 and changed.headers['ETag'] != delta.headers['ETag']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
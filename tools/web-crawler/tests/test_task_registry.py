@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+任务注册表测试
+"""
+
+import gzip
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.blob_store import BlobStore
+from src.web.status_api import TaskChangeLog
+from src.web.task_registry import SpilledTask, TaskRegistry
+
+
+class FakeTask:
+    """具有状态接口所需字段的任务"""
+
+    def __init__(self, task_id, status='completed', results=None):
+        self.task_id = task_id
+        self.config = {'start_url': 'https://example.com'}
+        self.status = status
+        self.progress = 100 if status == 'completed' else 10
+        self.status_text = '完成'
+        self.stats = {'crawled': len(results or [])}
+        self.error = None
+        self.start_time = datetime(2024, 1, 1, 12, 0, 0)
+        self.end_time = datetime(2024, 1, 1, 12, 5, 0)
+        self.navigation = [{'title': '首页', 'url': 'https://example.com/'}]
+        self.results = []
+        self.changes = TaskChangeLog()
+        for result in results or []:
+            self.results.append(result)
+            self.changes.record_result()
+
+
+def test_lru_spill_and_transparent_reload(tmp_path):
+    """超过任务数上限时淘汰最久未访问的已结束任务，访问时从磁盘加载"""
+    registry = TaskRegistry(tmp_path, max_tasks=2, ttl_seconds=3600)
+    registry.add(FakeTask('a', results=[{'url': 'https://example.com/a', 'title': '页面'}]))
+    registry.add(FakeTask('b'))
+    registry.get('a')
+    registry.add(FakeTask('c', status='running'))
+
+    assert registry.stats()['spilled'] == 1
+    assert (tmp_path / 'b.ndjson.gz').exists()
+    assert 'b' in registry
+
+    task = registry.get('b')
+    assert isinstance(task, SpilledTask)
+    assert task.navigation[0]['title'] == '首页'
+    assert task.start_time == datetime(2024, 1, 1, 12, 0, 0)
+
+    # 加载 b 后内存中的任务数再次超限，a 被淘汰
+    assert registry.stats()['spill_count'] == 2
+    task = registry.get('a')
+    assert task.results == [{'url': 'https://example.com/a', 'title': '页面'}]
+    assert task.changes.version == 1
+
+
+def test_running_tasks_are_never_evicted(tmp_path):
+    """运行中的任务不受任务数和结果大小限制"""
+    registry = TaskRegistry(tmp_path, max_tasks=1, max_result_bytes=1)
+    registry.add(FakeTask('a', status='running', results=[{'content': 'x' * 100}]))
+    registry.add(FakeTask('b', status='pending'))
+
+    assert registry.stats() == {
+        'in_memory': 2, 'spilled': 0, 'result_bytes': 0, 'spill_count': 0, 'load_count': 0, 'expired_count': 0,
+        'collected_blobs': 0,
+    }
+
+
+def test_ttl_and_byte_limit(tmp_path):
+    """已结束任务超过 TTL 或结果总大小超过上限时被淘汰，重启后仍可列出"""
+    registry = TaskRegistry(tmp_path, max_result_bytes=150)
+    registry.add(FakeTask('a', results=[{'content': 'x' * 100}]))
+    registry.add(FakeTask('b', results=[{'content': 'y' * 100}]))
+    assert registry.stats()['spilled'] == 1
+
+    registry.ttl_seconds = 0
+    registry.enforce()
+    assert registry.stats()['in_memory'] == 0
+
+    reopened = TaskRegistry(tmp_path)
+    assert sorted(item['task_id'] for item in reopened.summaries()) == ['a', 'b']
+    assert reopened.get('b').results == [{'content': 'y' * 100}]
+
+
+def test_status_since_after_reload(tmp_path):
+    """从磁盘加载的任务，旧版本号之后的结果全部视为新增"""
+    registry = TaskRegistry(tmp_path, ttl_seconds=0)
+    registry.add(FakeTask('a', results=[{'n': 1}, {'n': 2}]))
+    registry.enforce()
+
+    task = registry.get('a')
+    assert task.changes.result_range_since(0) == (0, 2)
+    assert task.changes.result_range_since(task.changes.version) == (2, 2)
+
+
+def test_reloaded_task_expires_again(tmp_path):
+    """从磁盘加载的任务同样受 TTL 限制"""
+    registry = TaskRegistry(tmp_path, ttl_seconds=0)
+    registry.add(FakeTask('a', results=[{'n': 1}]))
+    assert registry.get('a').results == [{'n': 1}]
+    registry.enforce()
+    assert registry.stats()['in_memory'] == 0 and registry.stats()['spilled'] == 1
+
+
+def test_sweep_removes_old_spill_files(tmp_path):
+    """sweep() 删除超过保留时间的任务文件，新文件保留"""
+    registry = TaskRegistry(tmp_path, ttl_seconds=0, spill_retention_seconds=60)
+    registry.add(FakeTask('old'))
+    registry.add(FakeTask('new'))
+    registry.enforce()
+    old_path = tmp_path / 'old.ndjson.gz'
+    past = time.time() - 120
+    os.utime(old_path, (past, past))
+
+    registry.sweep()
+    assert not old_path.exists() and 'old' not in registry
+    assert (tmp_path / 'new.ndjson.gz').exists() and 'new' in registry
+    assert registry.stats()['expired_count'] == 1
+
+
+def test_sweep_collects_blobs_of_expired_tasks(tmp_path):
+    """删除过期任务文件后回收只被这些任务引用的内容，其他任务和 blob_refs() 引用的内容保留"""
+    store = BlobStore(tmp_path / 'blobs')
+    shared = store.put('<footer>共享</footer>')
+    only_old = store.put('<p>旧任务</p>')
+    running = store.put('<p>运行中</p>')
+    cached = store.put('<p>验证器缓存</p>')
+    registry = TaskRegistry(
+        tmp_path / 'tasks', ttl_seconds=0, spill_retention_seconds=60,
+        blob_store=store, blob_refs=lambda: [cached['key']], blob_min_age_seconds=0,
+    )
+    registry.add(FakeTask('old', results=[{'bodies': {'html': only_old, 'footer': shared}}]))
+    registry.add(FakeTask('new', results=[{'bodies': {'footer': shared}}]))
+    registry.add(FakeTask('running', status='running', results=[{'bodies': {'html': running}}]))
+    registry.enforce()
+    past = time.time() - 120
+    os.utime(tmp_path / 'tasks' / 'old.ndjson.gz', (past, past))
+
+    registry.sweep()
+    assert only_old['key'] not in store
+    assert all(ref['key'] in store for ref in (shared, running, cached))
+    assert registry.stats()['collected_blobs'] == 1
+
+    # 没有任务文件过期时不扫描内容存储
+    orphan = store.put('<p>无引用</p>')
+    registry.sweep()
+    assert orphan['key'] in store
+
+
+def test_spill_writes_outside_lock(tmp_path, monkeypatch):
+    """写入磁盘期间其他线程仍可读取注册表"""
+    registry = TaskRegistry(tmp_path, max_tasks=1)
+    writing = threading.Event()
+    proceed = threading.Event()
+    original_open = gzip.open
+
+    def slow_open(*args, **kwargs):
+        if 'w' in args[1]:
+            writing.set()
+            proceed.wait(5)
+        return original_open(*args, **kwargs)
+
+    monkeypatch.setattr(gzip, 'open', slow_open)
+    registry.add(FakeTask('running', status='running'))
+    spiller = threading.Thread(target=registry.add, args=(FakeTask('done'),))
+    spiller.start()
+    assert writing.wait(5)
+
+    reader = threading.Thread(target=lambda: registry.get('running'))
+    reader.start()
+    reader.join(2)
+    assert not reader.is_alive()
+    assert registry.get('done') is not None  # 写入完成前仍在内存中
+
+    proceed.set()
+    spiller.join(5)
+    assert registry.stats()['spilled'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
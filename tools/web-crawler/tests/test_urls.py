@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+URL 规范化与指纹去重测试
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.frontier import CrawlFrontier
+from src.utils.urls import FingerprintSet, UrlCanonicalizer, url_fingerprint
+
+
+def test_default_rules_collapse_variants():
+    """片段、末尾斜杠、默认端口、大小写、参数顺序和跟踪参数不产生新页面"""
+    canonicalizer = UrlCanonicalizer()
+    variants = [
+        'https://Example.com/docs',
+        'https://example.com/docs/',
+        'https://example.com:443/docs#intro',
+        'https://example.com/docs?utm_source=x&utm_medium=email',
+        'https://example.com/docs?gclid=abc',
+    ]
+    assert {canonicalizer.canonicalize(url) for url in variants} == {'https://example.com/docs'}
+
+    assert canonicalizer.canonicalize('https://example.com') == 'https://example.com/'
+    assert canonicalizer.canonicalize('https://example.com/?b=2&a=1&fbclid=z') == 'https://example.com/?a=1&b=2'
+    assert canonicalizer.canonicalize('http://example.com:8080/Docs') == 'http://example.com:8080/Docs'
+
+
+def test_configurable_rules():
+    """规则可以逐项关闭或调整"""
+    canonicalizer = UrlCanonicalizer.from_config({
+        'drop_fragment': False,
+        'trailing_slash': 'add',
+        'sort_query': False,
+        'strip_params': ['ref'],
+        'lowercase_path': True,
+    })
+    assert canonicalizer.canonicalize('https://example.com/Docs?b=2&ref=x&a=1#top') == \
+        'https://example.com/docs/?b=2&a=1#top'
+    assert canonicalizer.canonicalize('https://example.com/file.pdf') == 'https://example.com/file.pdf'
+
+    with pytest.raises(ValueError):
+        UrlCanonicalizer(trailing_slash='always')
+
+
+def test_fingerprint_set_matches_builtin_set():
+    """指纹集合扩容后行为与内置 set 一致"""
+    rng = random.Random(7)
+    fingerprints = [rng.getrandbits(64) for _ in range(5000)] + [0]
+    fingerprints += fingerprints[:100]
+
+    compact, reference = FingerprintSet(capacity=16), set()
+    for fingerprint in fingerprints:
+        assert compact.add(fingerprint) == (fingerprint not in reference)
+        reference.add(fingerprint)
+
+    assert len(compact) == len(reference)
+    assert all(fingerprint in compact for fingerprint in reference)
+    assert rng.getrandbits(64) not in compact
+    assert compact.nbytes / len(compact) < 32
+
+
+def test_frontier_dedups_canonical_urls():
+    """前沿按规范化URL去重，并以规范化后的URL出队"""
+    frontier = CrawlFrontier(max_pages=10)
+    assert frontier.add('https://example.com/docs#intro')
+    assert not frontier.add('https://example.com/docs/?utm_source=x', depth=1)
+    assert frontier.add('https://example.com/docs?page=2', depth=1)
+
+    assert url_fingerprint('https://example.com/docs') in frontier.seen
+    assert frontier.pop() == ('https://example.com/docs', 0)
+    assert frontier.scheduled == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+验证器缓存测试
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.urls import UrlCanonicalizer
+from src.utils.validator_cache import ValidatorCache, content_hash
+
+
+def test_keys_match_frontier_canonicalization(tmp_path):
+    """缓存键与抓取前沿使用同一规范化规则"""
+    cache = ValidatorCache(tmp_path / 'validators.db')
+    assert cache.key('HTTPS://Example.COM:443/docs/?utm_source=x#top') == 'https://example.com/docs'
+    keep = UrlCanonicalizer(trailing_slash='keep')
+    assert cache.key('https://example.com/docs/', keep) == 'https://example.com/docs/'
+
+    cache.put('https://example.com/guide/?b=2&a=1', None, None, 'abc', {'url': 'x'})
+    assert cache.get('https://example.com/guide?a=1&b=2').content_hash == 'abc'
+    cache.close()
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    """按规范化URL保存和读取验证器与处理结果"""
+    cache = ValidatorCache(tmp_path / 'validators.db')
+    record = {'url': 'https://example.com/docs', 'title': '文档'}
+    cache.put('https://EXAMPLE.com/docs#intro', '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT',
+              content_hash(b'<html></html>'), record, ['https://example.com/a'])
+
+    entry = cache.get('https://example.com/docs')
+    assert entry.record == record
+    assert entry.links == ['https://example.com/a']
+    assert entry.content_hash == content_hash(b'<html></html>')
+    assert entry.conditional_headers() == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    }
+    assert cache.get('https://example.com/other') is None
+    assert cache.records() == [record]
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """缓存保存在磁盘上，重启后仍可读取"""
+    path = tmp_path / 'validators.db'
+    cache = ValidatorCache(path)
+    cache.put('https://example.com/', None, None, 'abc', {'url': 'https://example.com/'})
+    cache.close()
+
+    reopened = ValidatorCache(path)
+    assert len(reopened) == 1
+    assert reopened.get('https://example.com/').content_hash == 'abc'
+    reopened.close()
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
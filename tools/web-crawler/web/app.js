@@ -8,8 +8,13 @@ class CrawlerApp {
         this.isRunning = false;
         this.currentTask = null;
         this.results = [];
+        this.bodyCache = new Map();  // 内容存储中按 key 缓存的正文
+        this.navigationRefreshedAt = 0;
+        this.resultSeqs = new Set();
         this.logs = [];
         this.startTime = null;
+        this.statusVersion = 0;
+        this.statusEtag = null;
         
         this.initializeEventListeners();
         this.initializeForm();
@@ -84,19 +89,25 @@ class CrawlerApp {
             
             this.socket.on('connect', () => {
                 this.addLog('WebSocket连接已建立', 'info');
+                // 重连后重新订阅当前任务
+                this.subscribeTask(this.currentTask);
             });
             
+            // 服务器按任务房间推送，进度只推送最新值，日志和结果按批次推送
             this.socket.on('task_update', (data) => {
+                if (data.task_id !== this.currentTask) return;
                 this.updateProgress(data);
                 this.updateStats(data);
             });
             
-            this.socket.on('log', (data) => {
-                this.addLog(data.message, data.level);
+            this.socket.on('log_batch', (data) => {
+                if (data.task_id !== this.currentTask) return;
+                data.logs.forEach(log => this.addLog(log.message, log.level));
             });
             
-            this.socket.on('result', (data) => {
-                this.addResult(data.result);
+            this.socket.on('result_batch', (data) => {
+                if (data.task_id !== this.currentTask) return;
+                data.results.forEach(item => this.addResult(item.result, item.seq));
             });
             
             this.socket.on('disconnect', () => {
@@ -126,7 +137,10 @@ class CrawlerApp {
         this.isRunning = true;
         this.startTime = Date.now();
         this.results = [];
+        this.resultSeqs = new Set();
         this.logs = [];
+        this.statusVersion = 0;
+        this.statusEtag = null;
         
         // 更新UI状态
         this.updateUIState(true);
@@ -150,6 +164,7 @@ class CrawlerApp {
             const result = await response.json();
             
             if (result.success) {
+                this.subscribeTask(result.task_id, this.currentTask);
                 this.currentTask = result.task_id;
                 this.addLog(`爬取任务已启动，任务ID: ${result.task_id}`, 'success');
                 this.pollTaskStatus();
@@ -165,15 +180,48 @@ class CrawlerApp {
         }
     }
 
+    subscribeTask(taskId, previousTaskId = null) {
+        if (!this.socket || !this.socket.connected) return;
+        if (previousTaskId && previousTaskId !== taskId) {
+            this.socket.emit('unsubscribe', { task_id: previousTaskId });
+        }
+        if (taskId) {
+            this.socket.emit('subscribe', { task_id: taskId });
+        }
+    }
+
     async pollTaskStatus() {
         if (!this.currentTask || !this.isRunning) return;
 
         try {
-            const response = await fetch(`/api/status/${this.currentTask}`);
+            // 只请求上次版本之后的增量，状态未变化时服务器返回 304
+            const headers = this.statusEtag ? { 'If-None-Match': this.statusEtag } : {};
+            const response = await fetch(
+                `/api/status/${this.currentTask}?since=${this.statusVersion}`,
+                { headers }
+            );
+
+            if (response.status === 304) {
+                setTimeout(() => this.pollTaskStatus(), 1000);
+                return;
+            }
+
             const data = await response.json();
+            this.statusEtag = response.headers.get('ETag');
+            this.statusVersion = data.version;
+
+            (data.results || []).forEach(result => this.addResult(result, result.seq));
+
+            // WebSocket 已连接时日志由推送送达，避免重复显示
+            if (!(this.socket && this.socket.connected)) {
+                (data.logs || []).forEach(log => this.addLog(log.message, log.level));
+            }
 
             this.updateProgress(data);
             this.updateStats(data);
+            if (data.status === 'running') {
+                this.refreshNavigation();
+            }
 
             if (data.status === 'completed') {
                 this.handleTaskCompletion(data);
@@ -210,7 +258,7 @@ class CrawlerApp {
         }
     }
 
-    handleTaskCompletion(data) {
+    async handleTaskCompletion(data) {
         this.isRunning = false;
         this.updateUIState(false);
         this.hideProgress();
@@ -221,11 +269,19 @@ class CrawlerApp {
         // 更新最终统计
         this.updateStats(data);
         
-        // 加载结果
-        this.loadResults(data.results);
-        
-        // 生成导航结构
-        this.generateNavigationTree(data.navigation);
+        // 状态接口不再携带完整结果，完成后一次性加载结果和导航结构
+        try {
+            const response = await fetch(`/api/results/${this.currentTask}`);
+            const resultsData = await response.json();
+            
+            // 加载结果
+            this.loadResults(resultsData.results);
+            
+            // 显示最终的站点结构
+            await this.refreshNavigation(true);
+        } catch (error) {
+            this.addLog(`结果加载失败: ${error.message}`, 'error');
+        }
     }
 
     handleTaskFailure(data) {
@@ -419,13 +475,20 @@ class CrawlerApp {
         logsContainer.scrollTop = logsContainer.scrollHeight;
     }
 
-    addResult(result) {
+    addResult(result, seq) {
+        // 推送和轮询可能送达同一条结果，按序号去重
+        if (seq !== undefined) {
+            if (this.resultSeqs.has(seq)) return;
+            this.resultSeqs.add(seq);
+            result.seq = seq;
+        }
         this.results.push(result);
         this.renderResults();
     }
 
     loadResults(results) {
         this.results = results || [];
+        this.resultSeqs = new Set(this.results.map(result => result.seq));
         this.renderResults();
     }
 
@@ -465,10 +528,26 @@ class CrawlerApp {
         `).join('');
     }
 
-    generateNavigationTree(navigation) {
+    async refreshNavigation(force = false) {
+        // 站点结构由服务器在抓取过程中增量维护，运行中每隔几秒刷新一次
+        if (!this.currentTask) return;
+        if (!force && Date.now() - this.navigationRefreshedAt < 3000) return;
+        this.navigationRefreshedAt = Date.now();
+
+        try {
+            const response = await fetch(`/api/tasks/${this.currentTask}/navigation`);
+            if (!response.ok) return;
+            const data = await response.json();
+            this.generateNavigationTree(data.tree);
+        } catch (error) {
+            this.addLog(`导航结构加载失败: ${error.message}`, 'warning');
+        }
+    }
+
+    generateNavigationTree(tree) {
         const navTree = document.getElementById('navigationTree');
         
-        if (!navigation || navigation.length === 0) {
+        if (!tree || tree.length === 0) {
             navTree.innerHTML = `
                 <div style="text-align: center; color: #999; padding: 40px;">
                     <i class="fas fa-sitemap" style="font-size: 3rem; margin-bottom: 15px;"></i>
@@ -478,38 +557,9 @@ class CrawlerApp {
             return;
         }
 
-        // 构建导航树
-        const tree = this.buildNavigationTree(navigation);
         navTree.innerHTML = this.renderNavigationTree(tree);
     }
 
-    buildNavigationTree(navigation) {
-        // 这里实现导航结构的层级分析
-        // 根据URL路径和页面标题构建树形结构
-        const tree = [];
-        
-        navigation.forEach(item => {
-            const pathParts = new URL(item.url).pathname.split('/').filter(part => part);
-            let currentLevel = tree;
-            
-            pathParts.forEach((part, index) => {
-                let existing = currentLevel.find(node => node.name === part);
-                if (!existing) {
-                    existing = {
-                        name: part,
-                        url: index === pathParts.length - 1 ? item.url : null,
-                        title: index === pathParts.length - 1 ? item.title : part,
-                        children: []
-                    };
-                    currentLevel.push(existing);
-                }
-                currentLevel = existing.children;
-            });
-        });
-        
-        return tree;
-    }
-
     renderNavigationTree(tree, level = 0) {
         return `
             <ul style="list-style: none; padding-left: ${level * 20}px;">
@@ -556,8 +606,20 @@ class CrawlerApp {
         }
     }
 
-    viewDetails(index) {
+    async loadBody(result, name) {
+        // 正文按需从内容存储读取，结果中只有引用
+        const ref = result.bodies && result.bodies[name];
+        if (!ref || !result.seq) return '';
+        if (!this.bodyCache.has(ref.key)) {
+            const response = await fetch(`/api/results/${this.currentTask}/${result.seq}/${name}`);
+            this.bodyCache.set(ref.key, response.ok ? await response.text() : '');
+        }
+        return this.bodyCache.get(ref.key);
+    }
+
+    async viewDetails(index) {
         const result = this.results[index];
+        const markdown = await this.loadBody(result, 'markdown');
         this.showModal('页面详情', `
             <h3>${result.title || '无标题'}</h3>
             <p><strong>URL:</strong> <a href="${result.url}" target="_blank">${result.url}</a></p>
@@ -570,17 +632,18 @@ class CrawlerApp {
             
             <h4>主要内容预览</h4>
             <div style="max-height: 300px; overflow-y: auto; background: #f5f5f5; padding: 15px; border-radius: 8px;">
-                <pre style="white-space: pre-wrap; font-size: 13px;">${result.markdown ? result.markdown.substring(0, 1000) + (result.markdown.length > 1000 ? '...' : '') : '无内容'}</pre>
+                <pre style="white-space: pre-wrap; font-size: 13px;">${markdown ? markdown.substring(0, 1000) + (markdown.length > 1000 ? '...' : '') : '无内容'}</pre>
             </div>
         `);
     }
 
-    viewMarkdown(index) {
+    async viewMarkdown(index) {
         const result = this.results[index];
+        const markdown = await this.loadBody(result, 'markdown');
         this.showModal('Markdown 内容', `
             <h3>${result.title || '无标题'}</h3>
             <div style="max-height: 500px; overflow-y: auto;">
-                <pre><code class="language-markdown">${result.markdown || '无Markdown内容'}</code></pre>
+                <pre><code class="language-markdown">${markdown || '无Markdown内容'}</code></pre>
             </div>
         `);
     }
@@ -5,27 +5,41 @@
 """
 
 import asyncio
+import base64
 import json
 import os
+import sys
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
 import threading
-import queue
-import time
 
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import logging
 
+# 共享的爬虫组件位于项目根目录的 src 包中
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.utils.blob_store import BlobStore
+from src.utils.frontier import CrawlFrontier
+from src.utils.link_filter import LinkFilter
+from src.utils.pipeline import CrawlPipeline
+from src.utils.rate_limiter import HostRateLimiter, host_of
+from src.utils.site_tree import SiteTree
+from src.utils.disk_frontier import DiskFrontier
+from src.utils.urls import UrlCanonicalizer
+from src.web.scheduler import TaskScheduler
+from src.web.results_api import body_response, navigation_response, results_response
+from src.web.status_api import TaskChangeLog, status_response
+from src.web.socket_hub import TaskEventEmitter
+from src.web.task_registry import TaskRegistry
+
 # 爬虫相关导入
 try:
     from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
     from crawl4ai.extraction_strategy import JsonCssExtractionStrategy, LLMExtractionStrategy
-    from crawl4ai.deep_crawling import BFSDeepCrawlStrategy, DFSDeepCrawlStrategy
-    from crawl4ai.deep_crawling.filters import DomainFilter, URLPatternFilter, FilterChain
     from crawl4ai import LLMConfig
     CRAWL4AI_AVAILABLE = True
 except ImportError:
@@ -45,10 +59,39 @@ app.config['SECRET_KEY'] = 'your-secret-key'
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# 全局变量
-tasks: Dict[str, Dict] = {}  # 存储任务状态
-task_queue = queue.Queue()   # 任务队列
-results_storage: Dict[str, List] = {}  # 结果存储
+# 任务事件按房间缓冲，后台按固定频率批量推送给订阅该任务的客户端
+emitter = TaskEventEmitter(
+    socketio,
+    flush_interval=float(os.environ.get('CRAWLER_SOCKET_FLUSH_INTERVAL', 0.25))
+)
+
+# 任务注册表：内存中只保留有限数量的任务，已结束的任务按 TTL/LRU 写入磁盘。
+# 内容存储目录可能与 src.web.server 共用，其中的验证器缓存和检查点也引用内容，
+# 这里不知道这些引用，因此不回收内容，只删除过期的任务文件
+tasks = TaskRegistry(
+    spill_dir=os.environ.get('CRAWLER_TASK_SPILL_DIR', 'crawl_results/tasks'),
+    max_tasks=int(os.environ.get('CRAWLER_MAX_TASKS_IN_MEMORY', 100)),
+    max_result_bytes=int(float(os.environ.get('CRAWLER_MAX_RESULT_MB', 256)) * 1024 * 1024),
+    ttl_seconds=float(os.environ.get('CRAWLER_TASK_TTL', 3600)),
+    spill_retention_seconds=float(os.environ.get('CRAWLER_TASK_SPILL_RETENTION', 7 * 24 * 3600))
+)
+# 后台定期淘汰过期任务并删除超过保留时间的任务文件，不依赖 API 访问触发
+tasks.start_sweeper(float(os.environ.get('CRAWLER_TASK_SWEEP_INTERVAL', 60)))
+
+# 按主机限速器：所有任务共享，替代批次之间的固定延迟
+rate_limiter = HostRateLimiter(
+    default_rate=float(os.environ.get('CRAWLER_HOST_RATE', 2.0)),
+    default_burst=int(os.environ.get('CRAWLER_HOST_BURST', 4)),
+    respect_robots=os.environ.get('CRAWLER_RESPECT_ROBOTS', '1') != '0'
+)
+
+# 内容寻址存储：Markdown、截图和 PDF 按哈希压缩保存，结果中只保留引用，相同内容跨任务只保存一份
+blob_store = BlobStore(os.environ.get('CRAWLER_BLOB_DIR', 'crawl_results/blobs'))
+
+# 磁盘抓取前沿：max_pages 达到阈值或任务配置 frontier: "disk" 时使用，
+# 待抓取队列和已发现URL保存在 SQLite 中，内存占用不随站点规模增长
+FRONTIER_DIR = os.environ.get('CRAWLER_FRONTIER_DIR', 'crawl_results/frontier')
+DISK_FRONTIER_MIN_PAGES = int(os.environ.get('CRAWLER_DISK_FRONTIER_MIN_PAGES', 10000))
 
 
 class CrawlerTask:
@@ -67,13 +110,18 @@ class CrawlerTask:
         }
         self.results = []
         self.navigation = []
+        self.site_tree = SiteTree(config.get('target_url', ''))  # 随结果增量更新的站点结构
         self.error = None
         self.start_time = None
         self.end_time = None
+        self.changes = TaskChangeLog()  # 版本号及新增结果、日志记录
         
         # 存储发现的URL和内容
-        self.discovered_urls = set()
+        self.frontier: Optional[CrawlFrontier] = None
         self.crawled_content = {}
+        self._crawler = None
+        self._run_config = None
+        self.link_filter: Optional[LinkFilter] = None
 
     def update_status(self, status: str, progress: int = None, status_text: str = None):
         """更新任务状态"""
@@ -82,9 +130,10 @@ class CrawlerTask:
             self.progress = progress
         if status_text:
             self.status_text = status_text
+        self.changes.bump()
             
-        # 通过WebSocket发送更新
-        socketio.emit('task_update', {
+        # 通过WebSocket发送更新（同一刷新周期内只推送最新进度）
+        emitter.emit_status(self.task_id, {
             'task_id': self.task_id,
             'status': self.status,
             'progress': self.progress,
@@ -99,39 +148,50 @@ class CrawlerTask:
             'message': message,
             'level': level
         }
+        self.changes.record_log(log_entry)
         
-        socketio.emit('log', log_entry)
+        emitter.emit_log(self.task_id, log_entry)
         logger.info(f"[{self.task_id}] {message}")
 
     def add_result(self, result: Dict):
         """添加结果"""
         self.results.append(result)
         self.stats['crawled'] = len(self.results)
+        self._update_site_tree(result)
+        seq = self.changes.record_result()
         
-        socketio.emit('result', {
-            'task_id': self.task_id,
-            'result': result
-        })
+        emitter.emit_result(self.task_id, seq, result)
+
+    def _update_site_tree(self, result: Dict):
+        """页面按URL路径加入站点结构，提取到的导航栏内容只在第一次出现时解析"""
+        extracted_content = result.get('extracted_content', {})
+        nav_content = None
+        if isinstance(extracted_content, list) and len(extracted_content) > 0:
+            nav_content = extracted_content[0].get('navigation', '')
+        elif isinstance(extracted_content, dict):
+            nav_content = extracted_content.get('navigation', '')
+        
+        self.site_tree.add_navigation(nav_content, result['url'])
+        self.site_tree.add_page(result['url'], result['title'])
 
     async def run(self):
         """执行爬虫任务"""
         if not CRAWL4AI_AVAILABLE:
             self.status = 'failed'
             self.error = 'crawl4ai 未安装'
+            self.changes.bump()
             return
 
         try:
             self.start_time = datetime.now()
             self.update_status('running', 0, '初始化爬虫...')
             self.add_log('开始执行爬虫任务')
+            self._configure_rate_limit()
 
-            # 第一步：发现网站结构
-            await self.discover_website_structure()
-            
-            # 第二步：抓取所有内容
+            # 第一步：边发现边抓取所有内容
             await self.crawl_all_content()
             
-            # 第三步：生成导航结构
+            # 第二步：生成导航结构
             self.generate_navigation_structure()
             
             # 完成
@@ -145,217 +205,135 @@ class CrawlerTask:
             self.add_log(f'任务执行失败: {str(e)}', 'error')
             logger.error(f"任务 {self.task_id} 失败: {str(e)}", exc_info=True)
 
-    async def discover_website_structure(self):
-        """发现网站结构"""
-        self.update_status('running', 10, '发现网站结构...')
-        self.add_log('开始发现网站结构')
-        
+    async def crawl_all_content(self):
+        """抓取所有内容
+
+        从目标URL开始，由抓取前沿驱动：每个页面抓取完成后立即处理结果，
+        页面中发现的内部链接直接进入前沿，每个页面只抓取、渲染一次。
+        """
         config = self.config
-        browser_config = self._create_browser_config()
-        
-        # 配置过滤器
-        filters = []
-        if config['filters']['exclude_domains']:
-            domain_filter = DomainFilter(
-                blocked_domains=config['filters']['exclude_domains']
-            )
-            filters.append(domain_filter)
-        
-        if config['filters']['exclude_patterns']:
-            pattern_filter = URLPatternFilter(
-                excluded_patterns=config['filters']['exclude_patterns']
-            )
-            filters.append(pattern_filter)
-        
-        # 总是创建 FilterChain，即使没有过滤器也创建空的
-        filter_chain = FilterChain(filters)
+        self.update_status('running', 10, '开始抓取...')
+        self.add_log('开始抓取网站内容')
         
-        # 配置深度爬取策略
-        deep_crawl_strategy = None
-        if config['crawl_strategy'] == 'bfs':
-            deep_crawl_strategy = BFSDeepCrawlStrategy(
-                max_depth=config['max_depth'],
-                include_external=False,
-                max_pages=config['max_pages'],
-                filter_chain=filter_chain
-            )
-        elif config['crawl_strategy'] == 'dfs':
-            deep_crawl_strategy = DFSDeepCrawlStrategy(
-                max_depth=config['max_depth'],
-                include_external=False,
-                max_pages=config['max_pages'],
-                filter_chain=filter_chain
-            )
+        browser_config = self._create_browser_config()
+        self.link_filter = LinkFilter.from_config(config, config['target_url'])
         
-        # 配置爬取参数
-        run_config = CrawlerRunConfig(
+        # 所有页面共用同一份抓取配置，发现链接与抓取内容在同一次渲染中完成
+        self._run_config = CrawlerRunConfig(
             cache_mode=getattr(CacheMode, config['cache_mode']),
-            deep_crawl_strategy=deep_crawl_strategy,
+            extraction_strategy=self._create_extraction_strategy(),
             exclude_external_links=config['filters']['exclude_external'],
             exclude_social_media_links=config['filters']['exclude_social'],
             exclude_external_images=config['filters']['exclude_images'],
             process_iframes=config['filters']['process_iframes'],
             word_count_threshold=config['word_threshold'],
             wait_for=config['wait_for'],
-            stream=True
-        )
-        
-        discovered_urls = [config['target_url']]
-        
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            try:
-                if deep_crawl_strategy:
-                    # 使用深度爬取
-                    async for result in await crawler.arun(
-                        url=config['target_url'],
-                        config=run_config
-                    ):
-                        if result.success:
-                            current_url = result.url
-                            discovered_urls.append(current_url)
-                            self.discovered_urls.add(current_url)
-                            
-                            # 提取内部链接
-                            internal_links = result.links.get("internal", [])
-                            for link in internal_links:
-                                link_url = link.get("href", "")
-                                if link_url and self._is_valid_url(link_url, config['target_url']):
-                                    discovered_urls.append(link_url)
-                                    self.discovered_urls.add(link_url)
-                            
-                            self.add_log(f'发现页面: {current_url} (内部链接: {len(internal_links)})')
-                        else:
-                            self.add_log(f'页面发现失败: {result.url}', 'warning')
-                else:
-                    # 仅抓取首页链接
-                    result = await crawler.arun(url=config['target_url'], config=run_config)
-                    if result.success:
-                        internal_links = result.links.get("internal", [])
-                        for link in internal_links:
-                            link_url = link.get("href", "")
-                            if link_url and self._is_valid_url(link_url, config['target_url']):
-                                discovered_urls.append(link_url)
-                                self.discovered_urls.add(link_url)
-                        
-                        self.add_log(f'在首页发现 {len(internal_links)} 个内部链接')
-                    
-            except Exception as e:
-                self.add_log(f'网站结构发现出错: {str(e)}', 'error')
-                raise
-        
-        # 去重并排序
-        unique_urls = list(set(discovered_urls))
-        unique_urls.sort()
-        
-        self.stats['discovered'] = len(unique_urls)
-        self.update_status('running', 30, f'发现 {len(unique_urls)} 个页面')
-        self.add_log(f'网站结构发现完成，共发现 {len(unique_urls)} 个页面')
-        
-        return unique_urls
-
-    async def crawl_all_content(self):
-        """抓取所有内容"""
-        urls = list(self.discovered_urls)
-        if not urls:
-            urls = [self.config['target_url']]
-        
-        self.update_status('running', 40, f'开始抓取 {len(urls)} 个页面的内容...')
-        self.add_log(f'开始批量抓取内容，共 {len(urls)} 个页面')
-        
-        browser_config = self._create_browser_config()
-        extraction_strategy = self._create_extraction_strategy()
-        
-        run_config = CrawlerRunConfig(
-            cache_mode=getattr(CacheMode, self.config['cache_mode']),
-            extraction_strategy=extraction_strategy,
-            exclude_external_links=self.config['filters']['exclude_external'],
-            exclude_social_media_links=self.config['filters']['exclude_social'],
-            word_count_threshold=self.config['word_threshold'],
-            screenshot='screenshot' in self.config['output_formats'],
-            pdf='pdf' in self.config['output_formats']
+            screenshot='screenshot' in config['output_formats'],
+            pdf='pdf' in config['output_formats']
         )
         
-        successful_crawls = 0
-        failed_crawls = 0
-        batch_size = self.config['batch_size']
+        # 配置抓取前沿
+        frontier = self.frontier = self._create_frontier()
+        frontier.add(config['target_url'])
         
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            for i in range(0, len(urls), batch_size):
-                batch_urls = urls[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                total_batches = (len(urls) + batch_size - 1) // batch_size
-                
-                progress = 40 + int((i / len(urls)) * 50)
-                self.update_status('running', progress, f'处理批次 {batch_num}/{total_batches}')
-                self.add_log(f'处理批次 {batch_num}/{total_batches}')
-                
-                try:
-                    results = await crawler.arun_many(urls=batch_urls, config=run_config)
-                    
-                    for result in results:
-                        if result.success:
-                            content_data = self._process_crawl_result(result)
-                            self.add_result(content_data)
-                            successful_crawls += 1
-                            self.add_log(f'成功抓取: {result.url}')
-                        else:
-                            failed_crawls += 1
-                            self.add_log(f'抓取失败: {result.url}', 'warning')
-                
-                except Exception as e:
-                    self.add_log(f'批次处理出错: {str(e)}', 'error')
-                    failed_crawls += len(batch_urls)
-                
-                # 短暂延迟
-                await asyncio.sleep(self.config['delay'])
-        
-        self.stats['crawled'] = successful_crawls
-        self.stats['failed'] = failed_crawls
+        try:
+            async with AsyncWebCrawler(config=browser_config) as crawler:
+                self._crawler = crawler
+                pipeline = CrawlPipeline(
+                    frontier,
+                    self._crawl_page,
+                    concurrency=config['batch_size'],
+                    on_page_done=lambda url: self._on_page_done(frontier, pipeline, url)
+                )
+                await pipeline.run()
+                self._crawler = None
+        finally:
+            if isinstance(frontier, DiskFrontier):
+                frontier.destroy()
         
         self.update_status('running', 90, '处理抓取结果...')
-        self.add_log(f'内容抓取完成! 成功: {successful_crawls}, 失败: {failed_crawls}')
+        self.add_log(f'内容抓取完成! 成功: {self.stats["crawled"]}, 失败: {self.stats["failed"]}')
+        rejected = {rule: stat['rejected'] for rule, stat in self.link_filter.stats().items() if stat['rejected']}
+        if rejected:
+            self.add_log(f'链接过滤: {rejected}')
 
-    def generate_navigation_structure(self):
-        """生成导航结构"""
-        self.add_log('生成导航结构...')
-        
-        # 提取真实的导航栏内容
-        navigation = []
-        navigation_items = set()  # 用于去重
-        
-        for result in self.results:
-            # 从提取的内容中获取导航栏信息
-            extracted_content = result.get('extracted_content', {})
+    async def _crawl_page(self, url: str, depth: int) -> List[str]:
+        """抓取单个页面，处理结果并返回页面中的内部链接"""
+        try:
+            await rate_limiter.acquire(url)
+            result = await self._crawler.arun(url=url, config=self._run_config)
+            rate_limiter.handle_response(url, result.status_code, result.response_headers)
+            
+            if not result.success:
+                self.stats['failed'] += 1
+                self.add_log(f'抓取失败: {url}', 'warning')
+                return []
+            
+            content_data = self._process_crawl_result(result)
+            self.add_result(content_data)
             
-            # 处理导航栏内容
-            nav_content = None
-            if isinstance(extracted_content, list) and len(extracted_content) > 0:
-                nav_content = extracted_content[0].get('navigation', '')
-            elif isinstance(extracted_content, dict):
-                nav_content = extracted_content.get('navigation', '')
+            # 批量过滤内部链接
+            internal_links = result.links.get("internal", [])
+            links = self.link_filter.filter(link.get("href") for link in internal_links)
             
-            # 如果有导航栏内容，解析其中的链接
-            if nav_content:
-                nav_links = self._extract_navigation_links(nav_content, result['url'])
-                for link in nav_links:
-                    link_key = f"{link['title']}|{link['url']}"
-                    if link_key not in navigation_items:
-                        navigation_items.add(link_key)
-                        navigation.append(link)
+            self.add_log(f'成功抓取: {url} (内部链接: {len(internal_links)})')
+            return links
             
-            # 同时保留基于URL路径的导航项
-            nav_item = {
-                'url': result['url'],
-                'title': result['title'] or '无标题',
-                'path': result['url'].replace(self.config['target_url'], ''),
-                'level': result['url'].count('/') - 2,  # 估算层级
-                'type': 'page'  # 标记为页面类型
-            }
-            navigation.append(nav_item)
+        except Exception as e:
+            self.stats['failed'] += 1
+            self.add_log(f'抓取出错: {url} - {str(e)}', 'error')
+            return []
+
+    def _on_page_done(self, frontier: CrawlFrontier, pipeline: CrawlPipeline, url: str):
+        """页面完成后更新统计和进度，页面可能乱序完成"""
+        self.stats['discovered'] = len(frontier.seen)
+        
+        # 前沿仍在增长，进度按已知页面数估算并保持单调
+        progress = 10 + int((pipeline.pages_done / max(frontier.scheduled, 1)) * 80)
+        self.update_status(
+            'running',
+            max(self.progress, progress),
+            f'已抓取 {pipeline.pages_done}/{frontier.scheduled} 个页面'
+        )
+
+    def _create_frontier(self) -> CrawlFrontier:
+        """创建抓取前沿：bfs/dfs 决定出队顺序，其他策略仅抓取首页链接"""
+        config = self.config
+        strategy = config['crawl_strategy']
+        options = dict(
+            strategy=strategy if strategy in ('bfs', 'dfs') else 'bfs',
+            max_depth=config['max_depth'] if strategy in ('bfs', 'dfs') else 1,
+            max_pages=config['max_pages'],
+            canonicalizer=UrlCanonicalizer.from_config(config.get('url_rules'))
+        )
         
-        # 按照层级和路径排序
-        navigation.sort(key=lambda x: (x.get('level', 0), x.get('path', x['url'])))
-        self.navigation = navigation
+        kind = config.get('frontier') or (
+            'disk' if config['max_pages'] >= DISK_FRONTIER_MIN_PAGES else 'memory'
+        )
+        if kind == 'disk':
+            path = Path(FRONTIER_DIR) / f'{self.task_id}.db'
+            self.add_log(f'使用磁盘抓取前沿: {path}')
+            return DiskFrontier(path, **options)
+        return CrawlFrontier(**options)
+
+    def generate_navigation_structure(self):
+        """生成导航结构：导航链接和页面层级在抓取过程中已增量维护，这里只输出当前结构"""
+        self.add_log('生成导航结构...')
+        self.navigation = self.site_tree.navigation_links() + self.site_tree.pages()
+
+    def _configure_rate_limit(self):
+        """根据任务配置设置目标站点的令牌桶
+
+        rate_limit 显式给出速率和突发数；否则把界面上的批次延迟换算为
+        每秒 batch_size / delay 个请求，突发数为一个批次。
+        """
+        host = host_of(self.config['target_url'])
+        rate_limit = self.config.get('rate_limit')
+        if rate_limit:
+            rate_limiter.configure_host(host, rate=rate_limit.get('rate'), burst=rate_limit.get('burst'))
+        elif self.config.get('delay'):
+            batch_size = max(1, self.config['batch_size'])
+            rate_limiter.configure_host(host, rate=batch_size / self.config['delay'], burst=batch_size)
 
     def _create_browser_config(self) -> BrowserConfig:
         """创建浏览器配置"""
@@ -400,11 +378,21 @@ class CrawlerTask:
             'description': '',
             'timestamp': datetime.now().isoformat(),
             'status_code': result.status_code,
-            'markdown': str(result.markdown) if result.markdown else '',
             'links_count': len(result.links.get('internal', [])),
-            'extracted_content': {}
+            'extracted_content': {},
+            'bodies': {}
         }
         
+        # Markdown、截图和 PDF 保存到内容存储，结果中只保留引用
+        if result.markdown:
+            content_data['bodies']['markdown'] = blob_store.put(str(result.markdown))
+        if getattr(result, 'screenshot', None):
+            content_data['bodies']['screenshot'] = blob_store.put(
+                base64.b64decode(result.screenshot), compress=False
+            )
+        if getattr(result, 'pdf', None):
+            content_data['bodies']['pdf'] = blob_store.put(result.pdf)
+        
         # 处理提取的结构化内容
         if result.extracted_content:
             try:
@@ -425,64 +413,6 @@ class CrawlerTask:
         
         return content_data
 
-    def _extract_navigation_links(self, nav_content: str, base_url: str) -> List[Dict]:
-        """从导航栏内容中提取链接"""
-        import re
-        from urllib.parse import urljoin, urlparse
-        
-        nav_links = []
-        
-        # 使用正则表达式提取链接
-        # 匹配 markdown 链接格式 [text](url)
-        markdown_links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', nav_content)
-        for text, url in markdown_links:
-            full_url = urljoin(base_url, url)
-            if self._is_valid_url(full_url, self.config['target_url']):
-                nav_links.append({
-                    'title': text.strip(),
-                    'url': full_url,
-                    'type': 'navigation',
-                    'level': 0
-                })
-        
-        # 匹配 HTML 链接格式 <a href="url">text</a>
-        html_links = re.findall(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*>([^<]+)</a>', nav_content, re.IGNORECASE)
-        for url, text in html_links:
-            full_url = urljoin(base_url, url)
-            if self._is_valid_url(full_url, self.config['target_url']):
-                nav_links.append({
-                    'title': text.strip(),
-                    'url': full_url,
-                    'type': 'navigation',
-                    'level': 0
-                })
-        
-        # 去重
-        unique_links = []
-        seen = set()
-        for link in nav_links:
-            key = f"{link['title']}|{link['url']}"
-            if key not in seen:
-                seen.add(key)
-                unique_links.append(link)
-        
-        return unique_links
-
-    def _is_valid_url(self, url: str, base_url: str) -> bool:
-        """检查URL是否有效"""
-        try:
-            from urllib.parse import urlparse
-            base_parsed = urlparse(base_url)
-            url_parsed = urlparse(url)
-            
-            return (
-                url_parsed.netloc == base_parsed.netloc and
-                url_parsed.scheme in ['http', 'https'] and
-                not any(ext in url.lower() for ext in ['.pdf', '.jpg', '.png', '.gif', '.css', '.js'])
-            )
-        except:
-            return False
-
     def to_dict(self) -> Dict:
         """转换为字典"""
         return {
@@ -499,29 +429,25 @@ class CrawlerTask:
         }
 
 
-def task_worker():
-    """任务工作线程"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    while True:
-        try:
-            task = task_queue.get(timeout=1)
-            if task is None:  # 退出信号
-                break
-            
-            # 运行异步任务
-            loop.run_until_complete(task.run())
-            
-        except queue.Empty:
-            continue
-        except Exception as e:
-            logger.error(f"任务工作线程错误: {str(e)}", exc_info=True)
+# 爬虫事件循环：与 src.web.server 相同，所有任务在一个长期存在的循环上执行，
+# 共享的按主机限速器只绑定这一个事件循环
+crawler_loop = asyncio.new_event_loop()
+
+
+def _run_crawler_loop():
+    """爬虫事件循环线程"""
+    asyncio.set_event_loop(crawler_loop)
+    crawler_loop.run_forever()
 
 
-# 启动工作线程
-worker_thread = threading.Thread(target=task_worker, daemon=True)
-worker_thread.start()
+loop_thread = threading.Thread(target=_run_crawler_loop, daemon=True)
+loop_thread.start()
+
+# 任务调度器：同时运行的任务数不超过 CRAWLER_MAX_TASKS，其余任务按提交顺序排队
+scheduler = TaskScheduler(
+    crawler_loop,
+    max_concurrent=int(os.environ.get('CRAWLER_MAX_TASKS', 2))
+)
 
 
 @app.route('/')
@@ -549,10 +475,10 @@ def start_crawl():
         # 创建任务
         task_id = str(uuid.uuid4())
         task = CrawlerTask(task_id, config)
-        tasks[task_id] = task
+        tasks.add(task)
         
-        # 添加到队列
-        task_queue.put(task)
+        # 提交到调度器
+        scheduler.submit(task)
         
         return jsonify({
             'success': True,
@@ -567,42 +493,48 @@ def start_crawl():
 
 @app.route('/api/status/<task_id>')
 def get_task_status(task_id):
-    """获取任务状态"""
+    """获取任务状态，?since=<version> 时附带该版本之后新增的结果和日志"""
     task = tasks.get(task_id)
     if not task:
         return jsonify({'error': '任务不存在'}), 404
     
-    return jsonify(task.to_dict())
+    return status_response(task, request.args, request.headers.get('If-None-Match', ''))
 
 
 @app.route('/api/results/<task_id>')
 def get_task_results(task_id):
-    """获取任务结果"""
+    """获取任务结果，支持 ?after=&limit= 游标分页和 NDJSON 流式输出"""
+    task = tasks.get(task_id)
+    if not task:
+        return jsonify({'error': '任务不存在'}), 404
+    
+    return results_response(task, request.args, request.headers.get('Accept', ''))
+
+
+@app.route('/api/results/<task_id>/<int:seq>/<name>')
+def get_result_body(task_id, seq, name):
+    """从内容存储中流式输出第 seq 条结果的 Markdown、截图或 PDF"""
+    task = tasks.get(task_id)
+    if not task:
+        return jsonify({'error': '任务不存在'}), 404
+    
+    return body_response(task, seq, name, blob_store)
+
+
+@app.route('/api/tasks/<task_id>/navigation')
+def get_task_navigation(task_id):
+    """获取任务当前的站点结构，抓取过程中也可调用"""
     task = tasks.get(task_id)
     if not task:
         return jsonify({'error': '任务不存在'}), 404
     
-    return jsonify({
-        'results': task.results,
-        'navigation': task.navigation,
-        'stats': task.stats
-    })
+    return navigation_response(task, task.config.get('target_url', ''))
 
 
 @app.route('/api/tasks')
 def list_tasks():
     """列出所有任务"""
-    task_list = []
-    for task_id, task in tasks.items():
-        task_list.append({
-            'task_id': task_id,
-            'status': task.status,
-            'progress': task.progress,
-            'stats': task.stats,
-            'start_time': task.start_time.isoformat() if task.start_time else None
-        })
-    
-    return jsonify({'tasks': task_list})
+    return jsonify({'tasks': tasks.summaries()})
 
 
 @socketio.on('connect')
@@ -617,6 +549,25 @@ def handle_disconnect():
     print('客户端断开连接')
 
 
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """订阅任务房间，只接收该任务的事件"""
+    task_id = (data or {}).get('task_id')
+    if task_id not in tasks:
+        emit('subscribe_error', {'task_id': task_id, 'error': '任务不存在'})
+        return
+    join_room(task_id)
+    emit('subscribed', {'task_id': task_id})
+
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """退订任务房间"""
+    task_id = (data or {}).get('task_id')
+    if task_id:
+        leave_room(task_id)
+
+
 if __name__ == '__main__':
     print("🚀 启动智能网站爬虫 Web 服务器...")
     print("📱 Web界面: http://localhost:5000")